@@ -0,0 +1,71 @@
+"""
+Benchmark : nombre de téléchargements simultanés fixe ou ajusté au débit
+mesuré (AdaptiveConcurrency, qui part de MAX_CONCURRENT_DOWNLOADS).
+
+Le serveur local plafonne le débit de chaque connexion et le débit total du
+lien : trop peu de workers laissent le lien sous-utilisé, trop de workers
+n'apportent rien et divisent le débit par élément.
+
+    python benchmarks/bench_adaptive.py [nb_fichiers] [taille_Mio] [Mio_s_par_connexion] [Mio_s_lien]
+"""
+
+import queue
+import sys
+import tempfile
+import time
+
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor, wait_for_events)
+
+
+from nexus_core import MAX_CONCURRENT_DOWNLOADS
+
+
+def run(mode, count, size, output_dir):
+    import nexus_core as core
+    ui_queue = queue.Queue()
+    workers = MAX_CONCURRENT_DOWNLOADS if mode == "adaptive" else int(mode)
+    engine = core.DownloadEngine(ui_queue, max_workers=workers,
+                                 per_host_limit=core.ADAPTIVE_MAX_WORKERS * 2)
+    controller = (core.AdaptiveConcurrency(engine, max_workers=16, ).start()
+                  if mode == "adaptive" else None)
+    items = [core.DownloadItem(bench_url(f"aimd-{mode}-{i}", size), output_dir=output_dir)
+             for i in range(count)]
+    t0 = time.perf_counter()
+    for item in items:
+        engine.enqueue(item)
+    wait_for_events(ui_queue, items)
+    elapsed = time.perf_counter() - t0
+    final = engine.max_workers
+    if controller is not None:
+        controller.stop()
+    engine.stop()
+    failed = [i for i in items if i.status != core.DownloadItem.STATUS_DONE]
+    if failed:
+        raise RuntimeError(f"Échec : {failed[0].error_msg}")
+    return elapsed, final, engine.metrics.counters
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    size = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 4 * 1024 * 1024
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    link = float(sys.argv[4]) if len(sys.argv) > 4 else 12.0
+    mib = 1024 * 1024
+    with LocalMediaServer(rate=rate * mib, link_rate=link * mib) as server, \
+            install_fake_extractor(make_fake_extractor(server)):
+        print(f"{count} fichiers de {size / mib:.1f} Mio, {rate:.1f} Mio/s par "
+              f"connexion, lien à {link:.1f} Mio/s")
+        print(f"{'workers':<10}{'durée (s)':>12}{'débit (Mio/s)':>16}{'final':>8}{'±':>8}")
+        for mode in (str(MAX_CONCURRENT_DOWNLOADS), "8", "adaptive"):
+            with tempfile.TemporaryDirectory() as tmp:
+                elapsed, final, counters = run(mode, count, size, tmp)
+            changes = (f"+{counters.get('concurrency_increase', 0)}"
+                       f"/-{counters.get('concurrency_decrease', 0)}"
+                       if mode == "adaptive" else "")
+            print(f"{mode:<10}{elapsed:>12.2f}{count * size / mib / elapsed:>16.2f}"
+                  f"{final:>8}{changes:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark : soumission de N URLs par l'API HTTP/JSON locale (ControlServer)
+et suivi de leur fin via le flux SSE /events.
+
+Mesure le temps de soumission (par lots) et le débit de bout en bout avec le
+serveur média local et l'extracteur factice.
+
+    python benchmarks/bench_api.py [nb_urls] [taille_lot]
+"""
+
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor)
+
+
+def post_jobs(port, urls, output_dir):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps({"urls": urls, "format": "video_best",
+                       "output_dir": output_dir})
+    conn.request("POST", "/jobs", body, {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    payload = json.loads(resp.read())
+    conn.close()
+    if resp.status != 201:
+        raise RuntimeError(payload.get("error"))
+    return payload
+
+
+def follow_events(port, expected, finished, ready):
+    """Lit /events jusqu'à `expected` événements terminaux."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", "/events")
+    resp = conn.getresponse()
+    ready.set()
+    event = None
+    while len(finished) < expected:
+        line = resp.fp.readline().decode("utf-8").rstrip("\n")
+        if not line and resp.fp.closed:
+            break
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: ") and event in ("done", "error", "cancelled"):
+            finished[json.loads(line[len("data: "):])["id"]] = event
+    conn.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    import nexus_core as core
+    with LocalMediaServer() as media, \
+            install_fake_extractor(make_fake_extractor(media)), \
+            tempfile.TemporaryDirectory() as tmp:
+        history = core.HistoryStore(os.path.join(tmp, "history.sqlite3"))
+        runner = core.HeadlessRunner(history=history, log=lambda line: None,
+                                     max_workers=8, per_host_limit=8)
+        server = core.ControlServer(runner, port=0, output_dir=tmp).start()
+        port = server.address[1]
+        stop = threading.Event()
+
+        def pump():
+            while not stop.is_set():
+                runner.pump(0.05)
+        threading.Thread(target=pump, daemon=True).start()
+
+        finished, ready = {}, threading.Event()
+        follower = threading.Thread(target=follow_events,
+                                    args=(port, count, finished, ready),
+                                    daemon=True)
+        follower.start()
+        ready.wait(5)
+
+        urls = [bench_url(f"api{i}", size=16 * 1024) for i in range(count)]
+        t0 = time.perf_counter()
+        added = 0
+        for start in range(0, count, batch):
+            added += len(post_jobs(port, urls[start:start + batch], tmp)["added"])
+        submitted = time.perf_counter() - t0
+        follower.join(300)
+        total = time.perf_counter() - t0
+
+        stop.set()
+        server.close()
+        runner.stop()
+        history.close()
+        errors = sum(1 for e in finished.values() if e != "done")
+        print(f"{added} URL(s) soumises par lots de {batch} "
+              f"en {submitted * 1000:.0f} ms")
+        print(f"{len(finished)} terminée(s) ({errors} erreur(s)) en {total:.2f} s "
+              f"— {len(finished) / total:.0f} éléments/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Microbenchmark : coût par appel du hook de progression et de la résolution
+des options de format.
+
+Compare l'ancien code (regex ANSI recompilée à chaque appel, `shutil.which`
+et chaîne de if/elif à chaque élément) aux helpers précompilés et à la
+table de formats résolue une fois.
+
+    python benchmarks/bench_hot_path.py [nb_appels]
+"""
+
+import os
+import queue
+import re
+import shutil
+import sys
+import timeit
+
+# nexus_core.py est importé depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import nexus_core as core
+
+
+class LegacyEngine(core.DownloadEngine):
+    def _clean_ansi(self, text):
+        if not text: return ""
+        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+        return ansi_escape.sub('', text)
+
+
+def legacy_fmt_key_to_ytdlp(fmt_key):
+    """Ancienne résolution : PATH parcouru et options reconstruites à chaque appel."""
+    opts = {}
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    if fmt_key == "video_best":
+        if has_ffmpeg:
+            opts["format"] = "bestvideo+bestaudio/best"
+            opts["merge_output_format"] = "mp4"
+        else:
+            opts["format"] = "best[ext=mp4]/best"
+    elif fmt_key.startswith("video_"):
+        height = fmt_key[len("video_"):]
+        if has_ffmpeg:
+            opts["format"] = f"bestvideo[height<={height}]+bestaudio/best[height<={height}]"
+            opts["merge_output_format"] = "mp4"
+        else:
+            opts["format"] = f"b[height<={height}][ext=mp4]/best"
+    elif fmt_key in ("audio_mp3", "audio_mp3_128"):
+        opts["format"] = "bestaudio/best"
+        if has_ffmpeg:
+            quality = "320" if fmt_key == "audio_mp3" else "128"
+            opts["postprocessors"] = [{"key": "FFmpegExtractAudio",
+                                       "preferredcodec": "mp3",
+                                       "preferredquality": quality}]
+    elif fmt_key == "audio_m4a":
+        opts["format"] = "bestaudio[ext=m4a]/bestaudio/best"
+    elif fmt_key == "audio_opus":
+        opts["format"] = "bestaudio[ext=opus]/bestaudio/best"
+    else:
+        opts["format"] = "best"
+    return opts
+
+
+def per_call_us(func, number):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    hook = {"status": "downloading", "downloaded_bytes": 1 << 20,
+            "total_bytes": 50 << 20, "speed": 12.34 * (1 << 20), "eta": 42,
+            "_speed_str": " 12.34MiB/s ", "_eta_str": "00:42"}
+    colored = dict(hook, _speed_str="\x1b[0;32m 12.34MiB/s\x1b[0m")
+    print(f"{'mesure':<34}{'avant (µs)':>12}{'après (µs)':>12}")
+    for label, sample in (("hook de progression", hook),
+                          ("hook (vitesse colorée ANSI)", colored)):
+        timings = []
+        for cls in (LegacyEngine, core.DownloadEngine):
+            engine = cls(queue.Queue(), max_workers=1, post_workers=1)
+            item = core.DownloadItem("https://example.com/watch?v=1")
+            item.status = core.DownloadItem.STATUS_DOWNLOADING
+            timings.append(per_call_us(
+                lambda: engine._handle_progress(item, sample), number))
+            engine.stop()
+        print(f"{label:<34}{timings[0]:>12.2f}{timings[1]:>12.2f}")
+    core.format_table()  # résolution unique (sonde ffmpeg) hors mesure
+    before = per_call_us(lambda: legacy_fmt_key_to_ytdlp("audio_mp3"), number // 10)
+    after = per_call_us(lambda: core.fmt_key_to_ytdlp("audio_mp3"), number // 10)
+    print(f"{'options de format':<34}{before:>12.2f}{after:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark : mémoire occupée par élément de file (DownloadItem + QueueModel)
+pour une file de N éléments, mesurée avec tracemalloc.
+
+Compare l'ancien DownloadItem (attributs dans un __dict__, vitesse / ETA /
+heure d'ajout stockées en texte, dictionnaire de widgets par élément) à la
+version actuelle (__slots__, champs numériques, statut enum).
+
+    python benchmarks/bench_item_memory.py [nb_elements]
+"""
+
+import datetime
+import gc
+import os
+import sys
+import tracemalloc
+import uuid
+
+# nexus_core.py est importé depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import nexus_core as core
+
+
+class LegacyItem:
+    """Ancien DownloadItem, reproduit à l'identique pour la mesure."""
+
+    def __init__(self, url, fmt="video_best", output_dir=""):
+        self.id         = uuid.uuid4().hex
+        self.url        = url
+        self.fmt        = fmt
+        self.output_dir = output_dir
+        self.status     = "En attente"
+        self.title      = url[:55] + "…" if len(url) > 55 else url
+        self.progress   = 0.0
+        self.speed      = ""
+        self.eta        = ""
+        self.error_msg  = ""
+        self.filepath   = ""
+        self.partial_path = ""
+        self.added_at   = datetime.datetime.now().strftime("%H:%M:%S")
+        self._widgets   = {}
+
+
+def measure(cls, urls):
+    """Octets alloués par élément pour remplir un QueueModel de `urls`."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    model = core.QueueModel()
+    for url in urls:
+        model.add(cls(url))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del model
+    return used
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    urls = [f"https://www.youtube.com/watch?v=id{i:09d}" for i in range(count)]
+    print(f"File de {count} éléments")
+    print(f"{'mode':<10}{'octets/élément':>16}{'total (Mio)':>14}")
+    for name, cls in (("legacy", LegacyItem), ("slots", core.DownloadItem)):
+        used = measure(cls, urls)
+        print(f"{name:<10}{used / count:>16.0f}{used / (1 << 20):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark : délai avant le premier fichier terminé et durée totale pour une
+playlist paginée (chaque page coûte un aller-retour simulé).
+
+Compare l'ancien traitement (un seul élément : yt-dlp résout toutes les
+pages puis télécharge les entrées une à une) à l'expansion progressive de
+DownloadEngine (entrées publiées par lots et téléchargées en parallèle).
+
+    python benchmarks/bench_playlist.py [nb_entrées] [délai_page_s] [débit_Mio_s]
+
+Les fichiers (1 Mio) sont servis à débit plafonné par connexion (4 Mio/s
+par défaut, 0 = illimité) pour que le transfert pèse comme sur un vrai CDN.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from common import (LocalMediaServer, bench_playlist_url, install_fake_extractor,
+                    make_fake_extractor, make_fake_playlist_extractor)
+
+
+def run_legacy(url, output_dir):
+    """Reproduit l'ancien _process : un seul process_ie_result pour tout."""
+    import yt_dlp
+    t0 = time.perf_counter()
+    first = []
+
+    def hook(d):
+        if d["status"] == "finished" and not first:
+            first.append(time.perf_counter() - t0)
+
+    opts = {"outtmpl": os.path.join(output_dir, "legacy-%(id)s.%(ext)s"),
+            "quiet": True, "no_warnings": True, "noprogress": True,
+            "format": "best", "progress_hooks": [hook]}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        ydl.process_ie_result(info, download=True)
+    return first[0], time.perf_counter() - t0
+
+
+def run_engine(url, output_dir):
+    import nexus_core as core
+    first = []
+    t0 = time.perf_counter()
+    history = core.HistoryStore(os.path.join(output_dir, "history.sqlite3"))
+
+    def listener(msg):
+        if msg["event"] == "done" and msg["item"].filepath and not first:
+            first.append(time.perf_counter() - t0)
+
+    runner = core.HeadlessRunner(history=history, log=lambda line: None,
+                                 info_cache=None)
+    runner.add_listener(listener)
+    runner.submit([url], "video_best", output_dir)
+    runner.run_until_idle()
+    total = time.perf_counter() - t0
+    runner.stop()
+    history.close()
+    failed = runner.stats["error"]
+    if failed:
+        raise RuntimeError(f"{failed} échec(s)")
+    return first[0], total
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 4.0
+    with LocalMediaServer(rate=rate * 1024 * 1024 or None) as server:
+        video_ie = make_fake_extractor(server)
+        playlist_ie = make_fake_playlist_extractor(page_delay=delay)
+        with install_fake_extractor(video_ie, playlist_ie):
+            print(f"Playlist de {count} entrées, {delay:.2f} s par page de 50")
+            print(f"{'mode':<10}{'1er fichier (s)':>17}{'total (s)':>12}")
+            for name, runner in (("legacy", run_legacy), ("engine", run_engine)):
+                with tempfile.TemporaryDirectory() as tmp:
+                    first, total = runner(bench_playlist_url(name, count, 1024 * 1024), tmp)
+                print(f"{name:<10}{first:>17.2f}{total:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
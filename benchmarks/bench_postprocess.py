@@ -0,0 +1,99 @@
+"""
+Benchmark : recouvrement réseau / conversion.
+
+Chaque élément est téléchargé (débit plafonné par connexion) puis converti
+par un post-traitement factice qui, comme ffmpeg, occupe un processus
+externe lié au CPU. Compare la conversion dans le worker réseau (ancien
+comportement) à l'étage de post-traitement séparé de DownloadEngine.
+
+    python benchmarks/bench_postprocess.py [nb_elements] [conversion_s]
+"""
+
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor, wait_for_events)
+
+_BUSY = "import time, sys\nend = time.process_time() + float(sys.argv[1])\n" \
+        "while time.process_time() < end: pass\n"
+
+
+def register_fake_transcoder():
+    """Post-traitement « NexusBenchTranscode » : un processus fils occupe le
+    CPU pendant `seconds` s, comme une conversion ffmpeg."""
+    import yt_dlp.postprocessor as pp_mod
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class NexusBenchTranscodePP(PostProcessor):
+        def __init__(self, downloader=None, seconds=0.5):
+            super().__init__(downloader)
+            self._seconds = seconds
+
+        def run(self, info):
+            subprocess.run([sys.executable, "-c", _BUSY, str(self._seconds)],
+                           check=True)
+            return [], info
+
+    pp_mod.postprocessors.value["NexusBenchTranscodePP"] = NexusBenchTranscodePP
+
+
+class _InlineStage:
+    """Remplace la file de l'étage de conversion : le travail est exécuté
+    tout de suite, dans le worker réseau qui l'a soumis."""
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def put(self, job):
+        if job is not None:
+            self._engine._postprocess(*job)
+
+    def qsize(self):
+        return 0
+
+
+def run(mode, count, seconds, output_dir):
+    import nexus_core as core
+    core.fmt_key_to_ytdlp = lambda key: {
+        "format": "best",
+        "postprocessors": [{"key": "NexusBenchTranscode", "seconds": seconds}],
+    }
+    ui_queue = queue.Queue()
+    engine = core.DownloadEngine(ui_queue, max_workers=3, per_host_limit=3)
+    if mode == "inline":
+        engine._post_queue = _InlineStage(engine)
+    items = [core.DownloadItem(bench_url(f"{mode}{i}", 1024 * 1024),
+                               output_dir=output_dir) for i in range(count)]
+    t0 = time.perf_counter()
+    for item in items:
+        engine.enqueue(item)
+    wait_for_events(ui_queue, items)
+    elapsed = time.perf_counter() - t0
+    stages = engine.stage_stats()
+    engine.stop()
+    failed = [i for i in items if i.status != core.DownloadItem.STATUS_DONE]
+    if failed:
+        raise RuntimeError(f"Échec : {failed[0].error_msg}")
+    return elapsed, stages["download"]["busy_seconds"]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    register_fake_transcoder()
+    with LocalMediaServer(rate=2 * 1024 * 1024) as server:
+        with install_fake_extractor(make_fake_extractor(server)):
+            print(f"{count} éléments de 1 Mio à 2 Mio/s, conversion {seconds:.2f} s CPU")
+            print(f"{'mode':<12}{'durée (s)':>12}{'workers réseau occupés (s)':>30}")
+            for mode in ("inline", "pipelined"):
+                with tempfile.TemporaryDirectory() as tmp:
+                    elapsed, busy = run(mode, count, seconds, tmp)
+                print(f"{mode:<12}{elapsed:>12.2f}{busy:>30.1f}")
+
+
+if __name__ == "__main__":
+    main()
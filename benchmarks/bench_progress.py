@@ -0,0 +1,137 @@
+"""
+Benchmark : événements de progression envoyés à l'UI et temps passé sur le
+thread principal, pour N téléchargements simultanés simulés.
+
+Compare l'ancien comportement (un événement "progress" par bloc yt-dlp, une
+carte rafraîchie par événement) au regroupement de DownloadEngine
+(`progress_batch` + `drain_progress`, une carte rafraîchie une fois par tick).
+
+    python benchmarks/bench_progress.py [nb_downloads] [durée_s]
+
+Si un affichage est disponible, de vraies URLCard Tk sont rafraîchies ;
+sinon un rafraîchissement simulé est utilisé.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+# nexus_core.py et downloader.py sont importés depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import downloader
+from nexus_core import DownloadEngine, DownloadItem, format_eta, format_speed
+
+POLL_INTERVAL = 0.080   # période de _poll_ui_queue
+CHUNK_INTERVAL = 0.002  # un appel du hook toutes les 2 ms par téléchargement
+
+
+class LegacyEngine(DownloadEngine):
+    """Un événement par appel du hook, comme avant le regroupement."""
+
+    def _notify_progress(self, item, force=False):
+        self._notify("progress", item)
+
+
+class _StubCard:
+    def __init__(self, item):
+        self.item = item
+        self.text = ""
+
+    def refresh(self):
+        i = self.item
+        self.text = (f"{i.title} {i.progress:.1f}% {i.status.label} "
+                     f"{format_speed(i.speed)} ETA {format_eta(i.eta)}")
+
+
+def _make_cards(items):
+    try:
+        root = downloader.tk.Tk()
+    except downloader.tk.TclError:
+        return None, [_StubCard(i) for i in items]
+    root.withdraw()
+    cards = []
+    for item in items:
+        card = downloader.URLCard(root, item)
+        card.pack()
+        cards.append(card)
+    return root, cards
+
+
+def _simulate_download(engine, item, duration, stop):
+    total = 50 * 1024 * 1024
+    start = time.monotonic()
+    while not stop.is_set():
+        elapsed = time.monotonic() - start
+        if elapsed >= duration:
+            break
+        done = int(total * elapsed / duration)
+        engine._handle_progress(item, {
+            "status": "downloading",
+            "downloaded_bytes": done,
+            "total_bytes": total,
+            "speed": 12.3 * 1024 * 1024,
+            "eta": 3,
+        })
+        time.sleep(CHUNK_INTERVAL)
+    engine._handle_progress(item, {"status": "finished", "filename": "x.mp4"})
+
+
+def run(engine_cls, count, duration):
+    ui_queue = queue.Queue()
+    engine = engine_cls(ui_queue, max_workers=1)
+    items = [DownloadItem(f"https://example.com/{i}") for i in range(count)]
+    root, cards = _make_cards(items)
+    stop = threading.Event()
+    threads = [threading.Thread(target=_simulate_download,
+                                args=(engine, item, duration, stop), daemon=True)
+               for item in items]
+    for t in threads:
+        t.start()
+
+    events = refreshes = 0
+    busy = 0.0
+    while any(t.is_alive() for t in threads) or not ui_queue.empty():
+        time.sleep(POLL_INTERVAL)
+        t0 = time.perf_counter()
+        dirty = {}
+        try:
+            while True:
+                msg = ui_queue.get_nowait()
+                events += 1
+                if msg["event"] == "progress_batch":
+                    for item in engine.drain_progress():
+                        dirty[next(c for c in cards if c.item is item)] = None
+                else:
+                    card = next(c for c in cards if c.item is msg["item"])
+                    card.refresh()
+                    refreshes += 1
+        except queue.Empty:
+            pass
+        for card in dirty:
+            card.refresh()
+            refreshes += 1
+        if root is not None:
+            root.update_idletasks()
+        busy += time.perf_counter() - t0
+    stop.set()
+    engine.stop()
+    if root is not None:
+        root.destroy()
+    return events, refreshes, busy, cards[0].__class__.__name__
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    print(f"{count} téléchargements simulés pendant {duration:.1f} s")
+    print(f"{'mode':<12}{'événements':>12}{'rafraîch.':>12}{'thread UI (ms)':>16}")
+    for name, cls in (("legacy", LegacyEngine), ("coalesced", DownloadEngine)):
+        events, refreshes, busy, card_kind = run(cls, count, duration)
+        print(f"{name:<12}{events:>12}{refreshes:>12}{busy * 1000:>16.1f}")
+    print(f"(cartes : {card_kind})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark : temps d'affichage et mémoire (RSS) de l'onglet file d'attente
+pour une file de N éléments.
+
+Compare l'ancienne liste (une URLCard par élément dans un Canvas défilant)
+à VirtualQueueList. Chaque mode tourne dans un processus séparé pour que
+les mesures de RSS ne se contaminent pas. Nécessite un affichage (sous
+Linux sans écran : `xvfb-run python benchmarks/bench_queue_view.py`).
+
+    python benchmarks/bench_queue_view.py [nb_elements]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+# downloader.py (processus enfants) est importé depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rss_mib() -> float:
+    """RSS courante du processus, en Mio (Linux, sinon psutil si présent)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return float("nan")
+
+
+def build_legacy(root, items):
+    import downloader as d
+    tk = d.tk
+    canvas = tk.Canvas(root, bg=d.COLORS["bg_dark"], highlightthickness=0)
+    canvas.pack(fill="both", expand=True)
+    inner = tk.Frame(canvas, bg=d.COLORS["bg_dark"])
+    canvas.create_window((0, 0), window=inner, anchor="nw")
+    for item in items:
+        d.URLCard(inner, item, on_remove=lambda c: None).pack(fill="x", pady=3, padx=2)
+
+
+def build_virtual(root, items):
+    import downloader as d
+    model = d.QueueModel()
+    for item in items:
+        model.add(item)
+    view = d.VirtualQueueList(root, model, on_remove=lambda c: None)
+    view.pack(fill="both", expand=True)
+    view.refresh()
+
+
+def child(mode, count):
+    import downloader as d
+    base = rss_mib()
+    t0 = time.perf_counter()
+    root = d.tk.Tk()
+    root.geometry("820x700")
+    items = [d.DownloadItem(f"https://example.com/watch?v={i}") for i in range(count)]
+    (build_legacy if mode == "legacy" else build_virtual)(root, items)
+    root.update()
+    elapsed = time.perf_counter() - t0
+    print(f"{mode} {elapsed:.3f} {rss_mib() - base:.1f}")
+    root.destroy()
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(sys.argv[2], int(sys.argv[3]))
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"File de {count} éléments")
+    print(f"{'mode':<10}{'affichage (s)':>15}{'RSS (Mio)':>12}")
+    for mode in ("legacy", "virtual"):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__),
+                              "--child", mode, str(count)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{mode:<10} échec : {out.stderr.strip().splitlines()[-1]}")
+            continue
+        _, elapsed, rss = out.stdout.split()
+        print(f"{mode:<10}{float(elapsed):>15.2f}{float(rss):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark : téléchargement d'un gros fichier HTTP progressif en une ou
+plusieurs connexions (requêtes Range).
+
+Le serveur local plafonne le débit de chaque connexion (comme un CDN qui
+bride les flux TCP individuels) : le débit obtenu croît avec le nombre de
+segments jusqu'à la limite du lien.
+
+    python benchmarks/bench_segmented.py [taille_Mio] [débit_Mio_s_par_connexion]
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import time
+
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor, wait_for_events)
+
+
+def run(segments, size, output_dir, server):
+    import nexus_core as core
+    ui_queue = queue.Queue()
+    engine = core.DownloadEngine(ui_queue, max_workers=1,
+                                 segments_per_item=segments)
+    item = core.DownloadItem(bench_url(f"seg{segments}", size),
+                             output_dir=output_dir)
+    requests_before = server.stats["requests"]
+    t0 = time.perf_counter()
+    engine.enqueue(item)
+    wait_for_events(ui_queue, [item])
+    elapsed = time.perf_counter() - t0
+    engine.stop()
+    if item.status != core.DownloadItem.STATUS_DONE:
+        raise RuntimeError(f"Échec : {item.error_msg}")
+    if os.path.getsize(item.filepath) != size:
+        raise RuntimeError("Taille du fichier incorrecte")
+    return elapsed, server.stats["requests"] - requests_before
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 64 * 1024 * 1024
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 8.0
+    with LocalMediaServer(rate=rate * 1024 * 1024) as server, \
+            install_fake_extractor(make_fake_extractor(server)):
+        print(f"Fichier de {size / 1024 / 1024:.0f} Mio, {rate:.0f} Mio/s par connexion")
+        print(f"{'connexions':<12}{'durée (s)':>12}{'débit (Mio/s)':>16}{'requêtes':>10}")
+        for segments in (1, 2, 4, 8):
+            with tempfile.TemporaryDirectory() as tmp:
+                elapsed, requests = run(segments, size, tmp, server)
+            print(f"{segments:<12}{elapsed:>12.2f}"
+                  f"{size / 1024 / 1024 / elapsed:>16.1f}{requests:>10}")
+
+
+if __name__ == "__main__":
+    main()
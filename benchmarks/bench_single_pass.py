@@ -0,0 +1,63 @@
+"""
+Benchmark : nombre d'invocations de l'extracteur par élément.
+
+Compare l'ancien enchaînement extract_info() + download() (deux résolutions
+de la page) avec le passage unique de DownloadEngine._process.
+
+    python benchmarks/bench_single_pass.py [nb_elements]
+"""
+
+import queue
+import sys
+import tempfile
+import time
+
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor, wait_for_events)
+
+
+def run_legacy(urls, output_dir):
+    """Reproduit l'ancien _process : extraction puis ydl.download()."""
+    import yt_dlp
+    for url in urls:
+        opts = {"outtmpl": f"{output_dir}/legacy-%(id)s.%(ext)s",
+                "quiet": True, "no_warnings": True, "noprogress": True,
+                "format": "best"}
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            ydl.extract_info(url, download=False)
+            ydl.download([url])
+
+
+def run_engine(urls, output_dir):
+    import nexus_core as core
+    ui_queue = queue.Queue()
+    engine = core.DownloadEngine(ui_queue, max_workers=1)
+    items = [core.DownloadItem(u, fmt="video_best", output_dir=output_dir)
+             for u in urls]
+    for item in items:
+        engine.enqueue(item)
+    wait_for_events(ui_queue, items)
+    engine.stop()
+    failed = [i for i in items if i.status != core.DownloadItem.STATUS_DONE]
+    if failed:
+        raise RuntimeError(f"Échec : {failed[0].error_msg}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with LocalMediaServer() as server:
+        ie_cls = make_fake_extractor(server)
+        with install_fake_extractor(ie_cls), \
+                tempfile.TemporaryDirectory() as tmp:
+            print(f"{'mode':<12}{'extractions/élément':>22}{'durée (s)':>12}")
+            for name, runner in (("legacy", run_legacy), ("engine", run_engine)):
+                urls = [bench_url(f"{name}{i}") for i in range(count)]
+                ie_cls.calls = 0
+                t0 = time.perf_counter()
+                runner(urls, tmp)
+                elapsed = time.perf_counter() - t0
+                print(f"{name:<12}{ie_cls.calls / count:>22.2f}{elapsed:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark : démarrage à froid de l'application graphique.
+
+Mesure, dans un processus neuf pour chaque essai :
+
+  - import  : `import downloader` (et donc nexus_core),
+  - rendu   : création de la fenêtre jusqu'au premier affichage
+              (`root.update()`), avec un dossier de données vide,
+  - total   : durée du processus, interpréteur compris.
+
+Compare l'ancien démarrage (yt-dlp importé d'emblée, les trois onglets
+construits avant l'affichage) au démarrage actuel (yt-dlp chargé en
+arrière-plan après l'affichage, onglets construits au premier passage).
+Sans affichage, seules les colonnes import et total sont mesurées (rendu
+vaut alors nan) ; sous Linux sans écran : `xvfb-run python
+benchmarks/bench_startup.py`.
+
+    python benchmarks/bench_startup.py [nb_essais]
+"""
+
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import common  # ajoute aussi la racine du dépôt au sys.path
+
+
+def child(mode):
+    t0 = time.perf_counter()
+    if mode == "eager":
+        # Ancien démarrage : yt-dlp importé avec le module
+        importlib.import_module("yt_dlp")
+    import downloader as d
+    imported = time.perf_counter() - t0
+    try:
+        root = d.tk.Tk()
+    except d.tk.TclError:
+        print(f"{imported:.4f} nan")
+        return
+    t1 = time.perf_counter()
+    app = d.NexusDownloaderApp(root)
+    if mode == "eager":
+        for key in ("queue", "history"):
+            app._tab_pages[key] = app._tab_builders[key](app._pages_container)
+    root.update()
+    print(f"{imported:.4f} {time.perf_counter() - t1:.4f}")
+    app._running = False
+    app._engine.stop()
+    root.destroy()
+
+
+def run(mode, data_dir):
+    env = dict(os.environ, APPDATA=data_dir)
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.abspath(__file__),
+                          "--child", mode],
+                         capture_output=True, text=True, env=env)
+    total = time.perf_counter() - t0
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    imported, paint = (float(v) for v in out.stdout.split())
+    return imported, paint, total
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+        return
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Bytecode compilé une fois pour tous les essais
+    subprocess.run([sys.executable, "-m", "compileall", "-q", common.ROOT],
+                   check=False)
+    print(f"Médiane sur {runs} démarrages")
+    print(f"{'mode':<10}{'import (ms)':>13}{'rendu (ms)':>12}{'total (ms)':>12}")
+    for mode in ("eager", "lazy"):
+        samples = []
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as data_dir:
+                samples.append(run(mode, data_dir))
+        imported, paint, total = (statistics.median(col) * 1000
+                                  for col in zip(*samples))
+        print(f"{mode:<10}{imported:>13.1f}{paint:>12.1f}{total:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
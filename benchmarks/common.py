@@ -0,0 +1,262 @@
+"""
+Outils partagés des benchmarks NEXUS : serveur média local et extracteur
+yt-dlp factice. Aucun accès réseau externe n'est nécessaire.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Les benchmarks importent nexus_core.py / downloader.py depuis la racine du dépôt
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BENCH_HOST = "nexus-bench.invalid"
+
+
+# ─────────────────────────────────────────────────────────────────
+#  SERVEUR MÉDIA LOCAL
+# ─────────────────────────────────────────────────────────────────
+class _MediaHandler(BaseHTTPRequestHandler):
+    """Sert des fichiers synthétiques : /media/<nom>?size=<octets>.
+
+    L'octet à la position n vaut n % PERIOD (voir `media_bytes`) : un fichier
+    reconstitué à partir de plages mal placées ou de zéros se détecte."""
+
+    protocol_version = "HTTP/1.1"
+    CHUNK = 64 * 1024
+    PERIOD = 251
+    _PATTERN = bytes(range(PERIOD)) * (CHUNK // PERIOD + 2)
+
+    def log_message(self, *args):
+        pass
+
+    def _size(self) -> int:
+        query = parse_qs(urlparse(self.path).query)
+        return int(query.get("size", ["1048576"])[0])
+
+    def _headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers(200, self._size())
+
+    def do_GET(self):
+        size = self._size()
+        start, end = 0, size - 1
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if m:
+            start = int(m.group(1))
+            end = min(int(m.group(2)) if m.group(2) else size - 1, size - 1)
+            self._headers(206, end - start + 1,
+                          {"Content-Range": f"bytes {start}-{end}/{size}"})
+        else:
+            self._headers(200, size)
+        self.server.stats["requests"] += 1
+        remaining, offset = end - start + 1, start
+        rate = self.server.rate
+        try:
+            while remaining > 0:
+                n = min(remaining, self.CHUNK)
+                phase = offset % self.PERIOD
+                self.wfile.write(self._PATTERN[phase:phase + n])
+                remaining -= n
+                offset += n
+                if rate:
+                    time.sleep(n / rate)  # débit plafonné par connexion
+                if self.server.link_rate:
+                    self.server.reserve_link(n)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def media_bytes(size: int) -> bytes:
+    """Contenu exact d'un fichier de `size` octets servi par LocalMediaServer."""
+    period = _MediaHandler.PERIOD
+    return (bytes(range(period)) * (size // period + 1))[:size]
+
+
+class LocalMediaServer:
+    """Serveur HTTP local (127.0.0.1, port libre) pour les fichiers de test.
+
+    `rate` plafonne le débit de chaque connexion (octets/s, None = illimité),
+    comme le bridage par connexion des CDN ; `link_rate` plafonne le débit
+    total partagé par toutes les connexions, comme un lien saturé."""
+
+    def __init__(self, rate: float = None, link_rate: float = None):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _MediaHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stats = {"requests": 0}
+        self._httpd.rate = rate
+        self._httpd.link_rate = link_rate
+        self._httpd.reserve_link = self._reserve_link
+        self._link_lock = threading.Lock()
+        self._link_free_at = 0.0
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        daemon=True)
+
+    def _reserve_link(self, size: int):
+        """Réserve `size` octets sur le lien partagé et attend son tour."""
+        with self._link_lock:
+            now = time.monotonic()
+            self._link_free_at = max(self._link_free_at, now) + size / self._httpd.link_rate
+            wait = self._link_free_at - now
+        time.sleep(wait)
+
+    @property
+    def stats(self) -> dict:
+        return self._httpd.stats
+
+    def url(self, name: str, size: int) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/media/{name}.mp4?size={size}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  EXTRACTEUR FACTICE
+# ─────────────────────────────────────────────────────────────────
+def bench_url(video_id: str, size: int = 256 * 1024) -> str:
+    """URL reconnue par l'extracteur factice."""
+    return f"https://{BENCH_HOST}/watch/{video_id}?size={size}"
+
+
+def make_fake_extractor(server: LocalMediaServer):
+    """Crée un extracteur yt-dlp qui compte ses invocations et pointe vers
+    le serveur local."""
+    from yt_dlp.extractor.common import InfoExtractor
+
+    class NexusBenchIE(InfoExtractor):
+        IE_NAME = "nexusbench"
+        _VALID_URL = (r"https?://nexus-bench\.invalid/watch/(?P<id>[\w-]+)"
+                      r"(?:\?size=(?P<size>\d+))?")
+        calls = 0
+        _calls_lock = threading.Lock()
+
+        def _real_extract(self, url):
+            with NexusBenchIE._calls_lock:
+                NexusBenchIE.calls += 1
+            m = self._match_valid_url(url)
+            video_id = m.group("id")
+            size = int(m.group("size") or 256 * 1024)
+            return {
+                "id":       video_id,
+                "title":    f"Bench {video_id}",
+                "duration": 10,
+                "formats": [{
+                    "format_id": "http-mp4",
+                    "url":       server.url(video_id, size),
+                    "ext":       "mp4",
+                    "vcodec":    "h264",
+                    "acodec":    "aac",
+                    "height":    720,
+                    "filesize":  size,
+                }],
+            }
+
+    return NexusBenchIE
+
+
+def bench_playlist_url(playlist_id: str, count: int, size: int = 256 * 1024) -> str:
+    """URL de playlist reconnue par l'extracteur de playlist factice."""
+    return f"https://{BENCH_HOST}/playlist/{playlist_id}?count={count}&size={size}"
+
+
+def make_fake_playlist_extractor(page_size: int = 50, page_delay: float = 0.5):
+    """Crée un extracteur de playlist paginé : chaque page de `page_size`
+    entrées coûte `page_delay` s, comme une API distante."""
+    import time
+    from yt_dlp.extractor.common import InfoExtractor
+
+    class NexusBenchPlaylistIE(InfoExtractor):
+        IE_NAME = "nexusbench:playlist"
+        _VALID_URL = (r"https?://nexus-bench\.invalid/playlist/(?P<id>[\w-]+)"
+                      r"\?count=(?P<count>\d+)&size=(?P<size>\d+)")
+
+        def _entries(self, playlist_id, count, size):
+            for start in range(0, count, page_size):
+                time.sleep(page_delay)
+                for i in range(start, min(start + page_size, count)):
+                    video_id = f"{playlist_id}-{i}"
+                    yield self.url_result(bench_url(video_id, size), "NexusBench",
+                                          video_id, f"Bench {video_id}")
+
+        def _real_extract(self, url):
+            m = self._match_valid_url(url)
+            playlist_id = m.group("id")
+            return self.playlist_result(
+                self._entries(playlist_id, int(m.group("count")),
+                              int(m.group("size"))),
+                playlist_id, f"Playlist {playlist_id}")
+
+    return NexusBenchPlaylistIE
+
+
+class install_fake_extractor:
+    """Remplace yt_dlp.YoutubeDL par une sous-classe qui enregistre les
+    extracteurs factices en tête de liste (restauré à la sortie)."""
+
+    def __init__(self, *ie_classes):
+        self._ie_classes = ie_classes
+        self._original = None
+
+    def __enter__(self):
+        import yt_dlp
+        ie_classes = self._ie_classes
+        self._original = original = yt_dlp.YoutubeDL
+
+        class BenchYoutubeDL(original):
+            def __init__(self, params=None, auto_init=True):
+                super().__init__(params, auto_init=False)
+                for ie_cls in ie_classes:
+                    self.add_info_extractor(ie_cls())
+                if auto_init:
+                    self.add_default_info_extractors()
+
+        yt_dlp.YoutubeDL = BenchYoutubeDL
+        return ie_classes[0]
+
+    def __exit__(self, *exc):
+        import yt_dlp
+        yt_dlp.YoutubeDL = self._original
+
+
+def wait_for_events(ui_queue, items, terminal=("done", "error", "cancelled"),
+                    timeout=120.0):
+    """Consomme la file d'événements jusqu'à ce que tous les éléments aient
+    atteint un état final. Retourne la liste des événements reçus."""
+    import queue
+    import time
+    remaining = {id(i) for i in items}
+    events = []
+    deadline = time.monotonic() + timeout
+    while remaining:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"{len(remaining)} élément(s) non terminé(s)")
+        try:
+            msg = ui_queue.get(timeout=left)
+        except queue.Empty:
+            continue
+        events.append(msg)
+        if msg["event"] in terminal and id(msg.get("item")) in remaining:
+            remaining.discard(id(msg["item"]))
+    return events
@@ -0,0 +1,282 @@
+"""
+Suite de benchmarks reproductible du moteur NEXUS (hors ligne).
+
+Pour chaque combinaison (workers, taille de file), un processus séparé
+démarre le serveur média local et l'extracteur factice, fait tourner
+DownloadEngine et une boucle d'événements identique à `_poll_ui_queue`
+(modèle de file, journal, historique, rafraîchissement des cartes), puis
+rapporte :
+
+  - débit (éléments/s, Mio/s),
+  - latence enqueue → fin perçue par l'UI (p50 / p90 / p99),
+  - RSS maximale du processus,
+  - temps passé sur le thread UI.
+
+Si un affichage est disponible, la vraie VirtualQueueList de l'application
+est rafraîchie (temps du thread principal Tk) ; sinon un rafraîchissement
+simulé est utilisé (colonne « ui »).
+
+    python benchmarks/suite.py [--workers 1,3,8] [--queue 20,200]
+                               [--size-kib 256] [--rate-mib 0]
+                               [--json resultats.json]
+                               [--compare reference.json] [--tolerance 0.15]
+
+Avec --compare, le code de sortie vaut 1 si une mesure se dégrade de plus
+de la tolérance par rapport au fichier de référence.
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor)
+
+POLL_INTERVAL = 0.080  # période de _poll_ui_queue
+# Mesures comparées avec --compare : (clé, sens de l'amélioration)
+COMPARED = (("items_per_s", "higher"), ("p50_ms", "lower"), ("p99_ms", "lower"),
+            ("peak_rss_mib", "lower"), ("ui_busy_ms", "lower"))
+
+
+def peak_rss_mib() -> float:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return float("nan")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class _StubCard:
+    """Rafraîchissement simulé d'une carte (sans affichage)."""
+
+    def __init__(self, core):
+        self.core = core
+        self.text = ""
+
+    def refresh(self, item):
+        self.text = (f"{item.title} {item.progress:.1f}% {item.status.label} "
+                     f"{self.core.format_speed(item.speed)} "
+                     f"ETA {self.core.format_eta(item.eta)}")
+
+
+class UiPipeline:
+    """Reproduit le travail du thread UI de NexusDownloaderApp : un tick
+    toutes les POLL_INTERVAL s qui vide la file d'événements, tient le modèle,
+    le journal et l'historique, puis rafraîchit les cartes modifiées."""
+
+    def __init__(self, core, engine, ui_queue, data_dir):
+        self.core = core
+        self.engine = engine
+        self.ui_queue = ui_queue
+        self.model = core.QueueModel()
+        self.journal = core.QueueJournal(os.path.join(data_dir, "queue.journal"))
+        self.history = core.HistoryStore(os.path.join(data_dir, "history.sqlite3"))
+        self.card = _StubCard(core)
+        self.busy = 0.0
+        self.finished_at = {}
+        self.root = self.view = None
+        try:
+            import downloader
+            self.root = downloader.tk.Tk()
+        except Exception:  # pas d'affichage (ou Tk absent) : cartes simulées
+            return
+        self.root.geometry("820x700")
+        self.view = downloader.VirtualQueueList(self.root, self.model,
+                                                on_remove=lambda card: None)
+        self.view.pack(fill="both", expand=True)
+        self.root.update()
+
+    @property
+    def kind(self) -> str:
+        return "tk" if self.view is not None else "simulé"
+
+    def close(self):
+        self.history.close()
+        if self.root is not None:
+            self.root.destroy()
+
+    def tick(self):
+        t0 = time.perf_counter()
+        dirty = {}
+        try:
+            while True:
+                msg = self.ui_queue.get_nowait()
+                self._handle(msg, dirty)
+        except queue.Empty:
+            pass
+        if self.view is not None:
+            self.view.refresh_items(dirty)
+            self.root.update()
+        else:
+            for item_id in dirty:
+                item = self.model.get(item_id)
+                if item is not None:
+                    self.card.refresh(item)
+        self.busy += time.perf_counter() - t0
+
+    def _handle(self, msg, dirty):
+        event = msg["event"]
+        if event == "progress_batch":
+            for item in self.engine.drain_progress():
+                dirty[item.id] = None
+            return
+        item = msg["item"]
+        dirty[item.id] = None
+        if event in ("done", "error", "cancelled"):
+            self.journal.remove(item)
+            self.finished_at[item.id] = time.perf_counter()
+            if event != "cancelled":
+                self.history.add(item)
+        elif item in self.model:
+            self.journal.record(item)
+
+
+def run_scenario(workers, count, size, rate):
+    """Exécuté dans un processus dédié : retourne les mesures du scénario."""
+    import nexus_core as core
+    with LocalMediaServer(rate=rate or None) as server, \
+            install_fake_extractor(make_fake_extractor(server)), \
+            tempfile.TemporaryDirectory() as tmp:
+        ui_queue = queue.Queue()
+        engine = core.DownloadEngine(ui_queue, max_workers=workers,
+                                     per_host_limit=workers, post_workers=1)
+        ui = UiPipeline(core, engine, ui_queue, tmp)
+        items = [core.DownloadItem(bench_url(f"s{workers}-{i}", size),
+                                   output_dir=tmp) for i in range(count)]
+        enqueued_at = {}
+        t0 = time.perf_counter()
+        for item in items:
+            ui.model.add(item)
+            ui.journal.record(item)
+            enqueued_at[item.id] = time.perf_counter()
+            engine.enqueue(item)
+        if ui.view is not None:
+            ui.view.refresh()
+        deadline = time.monotonic() + 600
+        while len(ui.finished_at) < count and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            ui.tick()
+        elapsed = time.perf_counter() - t0
+        engine.stop()
+        ui.close()
+        done = sum(1 for i in items if i.status == core.DownloadItem.STATUS_DONE)
+        latencies = [(ui.finished_at[i] - enqueued_at[i]) * 1000
+                     for i in ui.finished_at]
+        return {
+            "workers":      workers,
+            "queue":        count,
+            "done":         done,
+            "errors":       count - done,
+            "elapsed_s":    round(elapsed, 3),
+            "items_per_s":  round(done / elapsed, 2),
+            "mib_per_s":    round(done * size / elapsed / (1024 * 1024), 2),
+            "p50_ms":       round(percentile(latencies, 0.50), 1),
+            "p90_ms":       round(percentile(latencies, 0.90), 1),
+            "p99_ms":       round(percentile(latencies, 0.99), 1),
+            "peak_rss_mib": round(peak_rss_mib(), 1),
+            "ui_busy_ms":   round(ui.busy * 1000, 1),
+            "ui":           ui.kind,
+        }
+
+
+def compare(results, reference, tolerance) -> list:
+    """Mesures dégradées de plus de `tolerance` par rapport à la référence."""
+    baseline = {(r["workers"], r["queue"]): r for r in reference}
+    regressions = []
+    for result in results:
+        ref = baseline.get((result["workers"], result["queue"]))
+        if ref is None:
+            continue
+        for key, better in COMPARED:
+            old, new = ref.get(key), result.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (better == "higher" and change < -tolerance) or \
+                    (better == "lower" and change > tolerance):
+                regressions.append(f"workers={result['workers']} file={result['queue']} "
+                                   f"{key} : {old} → {new} ({change:+.0%})")
+    return regressions
+
+
+def _int_list(text):
+    return [int(v) for v in text.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks du moteur NEXUS")
+    parser.add_argument("--workers", type=_int_list, default=[1, 3, 8])
+    parser.add_argument("--queue", type=_int_list, default=[20, 200])
+    parser.add_argument("--size-kib", type=int, default=256)
+    parser.add_argument("--rate-mib", type=float, default=0.0,
+                        help="débit par connexion du serveur local (0 = illimité)")
+    parser.add_argument("--json", help="enregistre les résultats dans ce fichier")
+    parser.add_argument("--compare", help="fichier de référence (--json d'un run précédent)")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--child", nargs=2, type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    size = args.size_kib * 1024
+    rate = args.rate_mib * 1024 * 1024
+
+    if args.child:
+        print(json.dumps(run_scenario(*args.child, size, rate)))
+        return 0
+
+    header = (f"{'workers':>8}{'file':>6}{'élém/s':>9}{'Mio/s':>8}{'p50 ms':>9}"
+              f"{'p90 ms':>9}{'p99 ms':>9}{'RSS Mio':>9}{'UI ms':>8}{'err':>5}  ui")
+    print(header)
+    results = []
+    for workers in args.workers:
+        for count in args.queue:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__),
+                 "--size-kib", str(args.size_kib), "--rate-mib", str(args.rate_mib),
+                 "--child", str(workers), str(count)],
+                capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{workers:>8}{count:>6}  échec : "
+                      f"{(out.stderr.strip().splitlines() or ['?'])[-1]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(r)
+            print(f"{workers:>8}{count:>6}{r['items_per_s']:>9.1f}{r['mib_per_s']:>8.1f}"
+                  f"{r['p50_ms']:>9.0f}{r['p90_ms']:>9.0f}{r['p99_ms']:>9.0f}"
+                  f"{r['peak_rss_mib']:>9.1f}{r['ui_busy_ms']:>8.1f}{r['errors']:>5}  {r['ui']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"size_kib": args.size_kib, "rate_mib": args.rate_mib,
+                       "results": results}, f, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            reference = json.load(f)["results"]
+        regressions = compare(results, reference, args.tolerance)
+        for line in regressions:
+            print("RÉGRESSION  " + line)
+        if regressions:
+            return 1
+        print(f"Aucune régression (tolérance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,27 +13,36 @@
 ╚══════════════════════════════════════════════════════════════════╝
 """
 
+import sys
+
+# Mode sans interface : traité avant tout import de tkinter (démarrage
+# rapide, aucune dépendance graphique, utilisable sur un serveur)
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from nexus_core import main as headless_main
+    sys.exit(headless_main([a for a in sys.argv[1:] if a != "--headless"]))
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import queue
+import collections
 import os
-import re
 import json
 import datetime
 import time
 import ctypes
-import sys
 
-# ─────────────────────────────────────────────────────────────────
-#  VÉRIFICATION DÉPENDANCES
-# ─────────────────────────────────────────────────────────────────
-try:
-    import yt_dlp
-    YT_DLP_AVAILABLE = True
-except ImportError:
-    YT_DLP_AVAILABLE = False
+# Moteur, modèle et persistance (module sans interface)
+from nexus_core import (
+    YT_DLP_AVAILABLE, FORMATS, Status, DownloadItem, QueueModel, DownloadEngine,
+    HistoryStore, QueueJournal, InfoCache, DownloadIndex, DiskBudget,
+    AdaptiveConcurrency, UrlIngestor,
+    format_speed, format_eta, format_clock, preload_yt_dlp,
+)
 
+# Temps maximal passé par tick UI à verser les URLs importées dans la file (s)
+INGEST_TICK_BUDGET = 0.020
+INGEST_STEP = 100  # éléments traités entre deux contrôles du budget
 
 # ─────────────────────────────────────────────────────────────────
 #  PALETTE FUTURISTE — Thème Neon Cyber
@@ -72,211 +81,6 @@ FONTS = {
 }
 
 
-# ─────────────────────────────────────────────────────────────────
-#  MODÈLE DE DONNÉES
-# ─────────────────────────────────────────────────────────────────
-class DownloadItem:
-    """Représente un élément de la file de téléchargement."""
-    STATUS_PENDING   = "En attente"
-    STATUS_FETCHING  = "Récupération info..."
-    STATUS_DOWNLOADING = "Téléchargement"
-    STATUS_DONE      = "Terminé"
-    STATUS_ERROR     = "Erreur"
-    STATUS_CANCELLED = "Annulé"
-
-    def __init__(self, url, fmt="video_best", output_dir=""):
-        self.url        = url
-        self.fmt        = fmt
-        self.output_dir = output_dir
-        self.status     = self.STATUS_PENDING
-        self.title      = url[:55] + "…" if len(url) > 55 else url
-        self.progress   = 0.0        # 0.0 à 100.0
-        self.speed      = ""
-        self.eta        = ""
-        self.error_msg  = ""
-        self.filepath   = ""
-        self.added_at   = datetime.datetime.now().strftime("%H:%M:%S")
-        # Référence vers les widgets canvas pour mise à jour
-        self._widgets   = {}
-
-
-# ─────────────────────────────────────────────────────────────────
-#  FORMATS DISPONIBLES
-# ─────────────────────────────────────────────────────────────────
-FORMATS = {
-    "🎬  Vidéo Meilleure qualité":  "video_best",
-    "🎬  Vidéo 1080p (MP4)":        "video_1080",
-    "🎬  Vidéo 720p (MP4)":         "video_720",
-    "🎬  Vidéo 480p (MP4)":         "video_480",
-    "🎵  Audio MP3 (320 kbps)":     "audio_mp3",
-    "🎵  Audio MP3 (128 kbps)":     "audio_mp3_128",
-    "🎵  Audio M4A Meilleur":       "audio_m4a",
-    "🎵  Audio OPUS Meilleur":      "audio_opus",
-}
-
-import shutil
-
-def fmt_key_to_ytdlp(fmt_key: str) -> dict:
-    """Convertit la clé de format interne en options yt-dlp."""
-    opts = {}
-    has_ffmpeg = shutil.which("ffmpeg") is not None
-
-    if fmt_key == "video_best":
-        if has_ffmpeg:
-            opts["format"] = "bestvideo+bestaudio/best"
-            opts["merge_output_format"] = "mp4"
-        else:
-            opts["format"] = "best[ext=mp4]/best"
-    elif fmt_key == "video_1080":
-        if has_ffmpeg:
-            opts["format"] = "bestvideo[height<=1080]+bestaudio/best[height<=1080]"
-            opts["merge_output_format"] = "mp4"
-        else:
-            opts["format"] = "best[height<=1080][ext=mp4]/best"
-    elif fmt_key == "video_720":
-        if has_ffmpeg:
-            opts["format"] = "bestvideo[height<=720]+bestaudio/best[height<=720]"
-            opts["merge_output_format"] = "mp4"
-        else:
-            opts["format"] = "b[height<=720][ext=mp4]/best"
-    elif fmt_key == "video_480":
-        if has_ffmpeg:
-            opts["format"] = "bestvideo[height<=480]+bestaudio/best[height<=480]"
-            opts["merge_output_format"] = "mp4"
-        else:
-            opts["format"] = "b[height<=480][ext=mp4]/best"
-    elif fmt_key == "audio_mp3":
-        opts["format"] = "bestaudio/best"
-        if has_ffmpeg:
-            opts["postprocessors"] = [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "320"}]
-    elif fmt_key == "audio_mp3_128":
-        opts["format"] = "bestaudio/best"
-        if has_ffmpeg:
-            opts["postprocessors"] = [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "128"}]
-    elif fmt_key == "audio_m4a":
-        opts["format"] = "bestaudio[ext=m4a]/bestaudio/best"
-    elif fmt_key == "audio_opus":
-        opts["format"] = "bestaudio[ext=opus]/bestaudio/best"
-    else:
-        opts["format"] = "best"
-    return opts
-
-
-# ─────────────────────────────────────────────────────────────────
-#  MOTEUR DE TÉLÉCHARGEMENT (Thread séparé)
-# ─────────────────────────────────────────────────────────────────
-class DownloadEngine:
-    """Gère les téléchargements en arrière-plan via yt-dlp. Multi-threads."""
-
-    def __init__(self, ui_queue: queue.Queue):
-        self._ui_queue   = ui_queue  # Communication vers l'UI
-        self._active     = True
-        self._cancel_flags = {}  # item -> threading.Event()
-
-    def enqueue(self, item: DownloadItem):
-        self._cancel_flags[item] = threading.Event()
-        worker = threading.Thread(target=self._process, args=(item,), daemon=True)
-        worker.start()
-        self._notify("enqueued", item)
-
-    def cancel_item(self, item: DownloadItem):
-        if item in self._cancel_flags:
-            self._cancel_flags[item].set()
-
-    def cancel_all(self):
-        for flag in self._cancel_flags.values():
-            flag.set()
-
-    def stop(self):
-        self.cancel_all()
-        self._active = False
-
-    def stop(self):
-        self._active = False
-        self._work_queue.put(None)  # signal de fin
-
-    def _notify(self, event: str, item: DownloadItem, **kwargs):
-        self._ui_queue.put({"event": event, "item": item, **kwargs})
-
-    def _clean_ansi(self, text: str) -> str:
-        """Supprime les codes couleurs ANSI du terminal renvoyés par yt-dlp."""
-        if not text: return ""
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        return ansi_escape.sub('', text)
-
-    def _process(self, item: DownloadItem):
-        if not self._active: return
-        cancel_flag = self._cancel_flags.get(item)
-        if not YT_DLP_AVAILABLE:
-            item.status    = DownloadItem.STATUS_ERROR
-            item.error_msg = "yt-dlp non installé. Lancez : pip install yt-dlp"
-            self._notify("error", item)
-            return
-
-        item.status = DownloadItem.STATUS_FETCHING
-        self._notify("status_change", item)
-
-        fmt_opts = fmt_key_to_ytdlp(item.fmt)
-
-        def progress_hook(d):
-            if cancel_flag and cancel_flag.is_set():
-                raise yt_dlp.utils.DownloadError("Téléchargement annulé par l'utilisateur.")
-            if d["status"] == "downloading":
-                item.status = DownloadItem.STATUS_DOWNLOADING
-                # Calcul de la progression
-                total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-                downloaded = d.get("downloaded_bytes", 0)
-                if total > 0:
-                    item.progress = (downloaded / total) * 100
-                else:
-                    item.progress = 0
-                # Nettoyage des chaînes de vitesse et ETA
-                item.speed = self._clean_ansi(d.get("_speed_str", "").strip())
-                item.eta   = self._clean_ansi(d.get("_eta_str", "").strip())
-                self._notify("progress", item)
-            elif d["status"] == "finished":
-                item.progress  = 100.0
-                item.filepath  = d.get("filename", "")
-                self._notify("progress", item)
-
-        ydl_opts = {
-            "outtmpl":        os.path.join(item.output_dir, "%(title)s.%(ext)s"),
-            "progress_hooks": [progress_hook],
-            "quiet":          True,
-            "no_warnings":    True,
-            **fmt_opts,
-        }
-
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Récupération des infos (titre)
-                info = ydl.extract_info(item.url, download=False)
-                item.title = info.get("title", item.url)[:60]
-                self._notify("info_fetched", item)
-                # Téléchargement réel
-                ydl.download([item.url])
-
-            if cancel_flag and cancel_flag.is_set():
-                item.status = DownloadItem.STATUS_CANCELLED
-                self._notify("cancelled", item)
-            else:
-                item.status   = DownloadItem.STATUS_DONE
-                item.progress = 100.0
-                self._notify("done", item)
-
-        except Exception as exc:
-            if cancel_flag and cancel_flag.is_set():
-                item.status = DownloadItem.STATUS_CANCELLED
-                self._notify("cancelled", item)
-            else:
-                item.status    = DownloadItem.STATUS_ERROR
-                item.error_msg = self._clean_ansi(str(exc))[:120]
-                self._notify("error", item)
-        finally:
-            if item in self._cancel_flags:
-                del self._cancel_flags[item]
-
-
 # ─────────────────────────────────────────────────────────────────
 #  WIDGETS PERSONNALISÉS
 # ─────────────────────────────────────────────────────────────────
@@ -356,9 +160,51 @@ class NeonButton(tk.Frame):
         return f"#{r:02x}{g:02x}{b:02x}"
 
 
+class FrameClock:
+    """Horloge d'animation partagée : une seule boucle after() pilote toutes
+    les barres abonnées, au lieu d'une boucle par barre."""
+
+    INTERVAL = 50  # ms entre deux images
+
+    def __init__(self):
+        self._subscribers = {}  # barre -> None (ensemble ordonné)
+        self._root = None
+        self._job  = None
+
+    def subscribe(self, bar):
+        self._subscribers[bar] = None
+        if self._root is None:
+            self._root = bar.winfo_toplevel()
+        if self._job is None:
+            self._job = self._root.after(self.INTERVAL, self._tick)
+
+    def unsubscribe(self, bar):
+        self._subscribers.pop(bar, None)
+
+    def _tick(self):
+        self._job = None
+        for bar in list(self._subscribers):
+            try:
+                if bar.winfo_ismapped():  # seules les barres visibles sont animées
+                    bar.tick()
+            except tk.TclError:  # widget détruit entre-temps
+                self._subscribers.pop(bar, None)
+        if self._subscribers:
+            self._job = self._root.after(self.INTERVAL, self._tick)
+
+
+ANIMATION_CLOCK = FrameClock()
+
+
 class AnimatedProgressBar(tk.Frame):
     """Barre de progression neon compatible Python 3.13+.
-    Utilise un Canvas interne (pas de sous-classage direct)."""
+    Utilise un Canvas interne (pas de sous-classage direct).
+
+    Les éléments du canvas sont créés une fois puis déplacés (coords) ou
+    recolorés (itemconfig) ; rien n'est redessiné si l'état n'a pas changé."""
+
+    SHINE_W    = 24  # largeur du reflet animé
+    SHINE_STEP = 6   # déplacement du reflet par image
 
     def __init__(self, parent, width=400, height=8, **kw):
         super().__init__(parent,
@@ -368,6 +214,8 @@ class AnimatedProgressBar(tk.Frame):
         self.pack_propagate(False)
         self._value     = 0.0
         self._animating = False
+        self._phase     = 0
+        self._drawn     = None  # dernier état dessiné
         self._canvas    = tk.Canvas(self,
                                     width=width, height=height,
                                     bg=COLORS["progress_bg"],
@@ -375,6 +223,15 @@ class AnimatedProgressBar(tk.Frame):
         self._canvas.pack(fill="both", expand=True)
         self._pw = width
         self._ph = height
+        c, w, h = self._canvas, width, height
+        c.create_rectangle(0, 0, w, h, fill=COLORS["progress_bg"], outline="")
+        self._fill_id  = c.create_rectangle(0, 0, 0, h, fill="", outline="")
+        # Reflet haut
+        self._gloss_id = c.create_rectangle(0, 0, 0, max(1, h // 3),
+                                            fill="", outline="")
+        self._shine_id = c.create_rectangle(0, 0, 0, h, fill="", outline="")
+        c.create_rectangle(0, 0, w - 1, h - 1, fill="", outline=COLORS["border"])
+        self.bind("<Destroy>", lambda _: ANIMATION_CLOCK.unsubscribe(self))
         self._draw()
 
     def set_value(self, value: float):
@@ -384,36 +241,53 @@ class AnimatedProgressBar(tk.Frame):
     def start_shimmer(self):
         if not self._animating:
             self._animating = True
-            self._shimmer()
+            ANIMATION_CLOCK.subscribe(self)
 
     def stop_shimmer(self):
-        self._animating = False
-
-    def _shimmer(self):
-        if not self._animating:
-            return
+        if self._animating:
+            self._animating = False
+            ANIMATION_CLOCK.unsubscribe(self)
+            self._draw()
+
+    def tick(self):
+        """Image suivante de l'animation (appelée par ANIMATION_CLOCK)."""
+        self._phase += self.SHINE_STEP
         self._draw()
-        self._canvas.after(50, self._shimmer)
 
     def _draw(self):
-        c = self._canvas
-        c.delete("all")
         w, h = self._pw, self._ph
-        c.create_rectangle(0, 0, w, h, fill=COLORS["progress_bg"], outline="")
         fill_w = max(0, int((self._value / 100) * w))
-        if fill_w > 0:
-            if self._value < 30:
-                color = COLORS["accent_violet"]
-            elif self._value < 70:
-                color = COLORS["accent_cyan"]
-            else:
-                color = COLORS["accent_green"]
-            c.create_rectangle(0, 0, fill_w, h, fill=color, outline="")
-            # Reflet haut
+        if self._value < 30:
+            color = COLORS["accent_violet"]
+        elif self._value < 70:
+            color = COLORS["accent_cyan"]
+        else:
+            color = COLORS["accent_green"]
+        shine_x = None
+        if self._animating and fill_w > self.SHINE_W:
+            shine_x = self._phase % (fill_w + self.SHINE_W) - self.SHINE_W
+        state = (fill_w, color, shine_x)
+        if state == self._drawn:
+            return
+        c = self._canvas
+        if fill_w > 0 and (self._drawn is None or self._drawn[:2] != state[:2]):
+            c.coords(self._fill_id, 0, 0, fill_w, h)
+            c.itemconfig(self._fill_id, fill=color)
             if h > 2:
-                c.create_rectangle(0, 0, fill_w, max(1, h // 3),
-                                   fill="#FFFFFF33", outline="")
-        c.create_rectangle(0, 0, w - 1, h - 1, fill="", outline=COLORS["border"])
+                c.coords(self._gloss_id, 0, 0, fill_w, max(1, h // 3))
+                c.itemconfig(self._gloss_id, fill=NeonButton._dim(color, 0.35))
+        if self._drawn is None or (fill_w > 0) != (self._drawn[0] > 0):
+            shown = "normal" if fill_w > 0 else "hidden"
+            c.itemconfig(self._fill_id, state=shown)
+            c.itemconfig(self._gloss_id, state=shown if h > 2 else "hidden")
+        if shine_x is not None:
+            c.coords(self._shine_id, max(0, shine_x), 0,
+                     min(fill_w, shine_x + self.SHINE_W), h)
+            c.itemconfig(self._shine_id, state="normal",
+                         fill=NeonButton._dim(color, 0.6))
+        elif self._drawn is None or self._drawn[2] is not None:
+            c.itemconfig(self._shine_id, state="hidden")
+        self._drawn = state
 
 
 class URLCard(tk.Frame):
@@ -461,10 +335,11 @@ class URLCard(tk.Frame):
         # ── Ligne 2 : URL courte
         row2 = tk.Frame(self, bg=COLORS["bg_card"])
         row2.pack(fill="x", padx=10, pady=(0, 3))
-        url_short = self.item.url[:70] + ("…" if len(self.item.url) > 70 else "")
-        tk.Label(row2, text=url_short, bg=COLORS["bg_card"],
-                 fg=COLORS["text_secondary"], font=FONTS["code"],
-                 anchor="w").pack(side="left")
+        self.url_lbl = tk.Label(row2, text=self._short_url(self.item.url),
+                                bg=COLORS["bg_card"],
+                                fg=COLORS["text_secondary"], font=FONTS["code"],
+                                anchor="w")
+        self.url_lbl.pack(side="left")
 
         # ── Ligne 3 : barre de progression + stats
         row3 = tk.Frame(self, bg=COLORS["bg_card"])
@@ -480,17 +355,28 @@ class URLCard(tk.Frame):
         # ── Ligne 4 : info status
         row4 = tk.Frame(self, bg=COLORS["bg_card"])
         row4.pack(fill="x", padx=10, pady=(0, 8))
-        self.status_lbl = tk.Label(row4, text=self.item.status,
+        self.status_lbl = tk.Label(row4, text=self.item.status.label,
                                    bg=COLORS["bg_card"],
                                    fg=COLORS["text_secondary"],
                                    font=FONTS["small"], anchor="w")
         self.status_lbl.pack(side="left")
-        self.time_lbl = tk.Label(row4, text=f"Ajouté à {self.item.added_at}",
+        self.time_lbl = tk.Label(row4, text=f"Ajouté à {format_clock(self.item.added_at)}",
                                  bg=COLORS["bg_card"],
                                  fg=COLORS["text_muted"],
                                  font=FONTS["small"])
         self.time_lbl.pack(side="right")
 
+    @staticmethod
+    def _short_url(url: str) -> str:
+        return url[:70] + ("…" if len(url) > 70 else "")
+
+    def bind_item(self, item: DownloadItem):
+        """Associe la carte à un autre élément (recyclage par la liste virtualisée)."""
+        self.item = item
+        self.url_lbl.config(text=self._short_url(item.url))
+        self.time_lbl.config(text=f"Ajouté à {format_clock(item.added_at)}")
+        self.refresh()
+
     def refresh(self):
         """Met à jour l'affichage depuis self.item."""
         self.title_lbl.config(text=self.item.title)
@@ -498,8 +384,10 @@ class URLCard(tk.Frame):
         # Couleur et texte du badge selon le statut
         status_styles = {
             DownloadItem.STATUS_PENDING:     (COLORS["text_muted"],    "●"),
+            DownloadItem.STATUS_QUEUED:      (COLORS["text_secondary"], "◔"),
             DownloadItem.STATUS_FETCHING:    (COLORS["accent_orange"],  "◌"),
             DownloadItem.STATUS_DOWNLOADING: (COLORS["accent_cyan"],    "▶"),
+            DownloadItem.STATUS_POSTPROCESSING: (COLORS["accent_violet"], "⚙"),
             DownloadItem.STATUS_DONE:        (COLORS["accent_green"],   "✔"),
             DownloadItem.STATUS_ERROR:       (COLORS["accent_pink"],    "✗"),
             DownloadItem.STATUS_CANCELLED:   (COLORS["text_secondary"], "⊘"),
@@ -509,15 +397,22 @@ class URLCard(tk.Frame):
         self.badge.config(fg=color, text=f" {icon} ")
         self.status_lbl.config(
             fg=color,
-            text=self.item.status if not self.item.error_msg
+            text=self.item.status.label if not self.item.error_msg
                  else f"Erreur : {self.item.error_msg}"
         )
-        if self.item.speed or self.item.eta:
+        # Textes produits ici seulement (lignes visibles) à partir des
+        # valeurs numériques de l'élément
+        if self.item.note:
+            self.stats_lbl.config(text=self.item.note)
+        elif self.item.status == DownloadItem.STATUS_DOWNLOADING and (
+                self.item.speed or self.item.eta is not None):
             self.stats_lbl.config(
-                text=f"{self.item.speed}  ETA {self.item.eta}"
+                text=f"{format_speed(self.item.speed)}  ETA {format_eta(self.item.eta)}"
             )
         elif self.item.status == DownloadItem.STATUS_DONE:
             self.stats_lbl.config(text="100%")
+        else:
+            self.stats_lbl.config(text="")
         # Animation shimmer pendant le téléchargement
         if self.item.status == DownloadItem.STATUS_DOWNLOADING:
             self.progress_bar.start_shimmer()
@@ -525,6 +420,119 @@ class URLCard(tk.Frame):
             self.progress_bar.stop_shimmer()
 
 
+class VirtualQueueList(tk.Frame):
+    """Liste virtualisée de la file d'attente.
+
+    Seules les lignes visibles existent en tant que widgets : un petit pool
+    d'URLCard est positionné (place) dans la zone visible et réassocié aux
+    éléments du modèle au fil du défilement. Le coût en mémoire et en mise
+    en page ne dépend donc plus de la taille de la file."""
+
+    ROW_HEIGHT  = 108  # hauteur fixe d'une ligne, marges comprises
+    ROW_GAP     = 6
+    WHEEL_STEP  = 36   # pixels par cran de molette
+
+    def __init__(self, parent, model: QueueModel, on_remove=None, **kw):
+        super().__init__(parent, bg=COLORS["bg_dark"], **kw)
+        self._model     = model
+        self._on_remove = on_remove
+        self._offset    = 0   # défilement, en pixels depuis le haut
+        self._pool      = []  # cartes réutilisables
+        self._visible   = {}  # item.id -> carte affichée
+
+        self._scrollbar = tk.Scrollbar(self, orient="vertical",
+                                       command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        self._viewport = tk.Frame(self, bg=COLORS["bg_dark"])
+        self._viewport.pack(side="left", fill="both", expand=True)
+        self._viewport.bind("<Configure>", lambda _: self._layout())
+        self._bind_wheel(self._viewport)
+
+    # ── API ──
+    def refresh(self):
+        """À appeler quand des éléments sont ajoutés ou retirés du modèle."""
+        self._layout()
+
+    def refresh_items(self, item_ids):
+        """Rafraîchit les cartes visibles des éléments donnés (les autres
+        seront mises à jour lorsqu'elles redeviendront visibles)."""
+        for item_id in item_ids:
+            card = self._visible.get(item_id)
+            if card is not None:
+                card.refresh()
+
+    # ── Défilement ──
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)  # X11
+        widget.bind("<Button-5>", self._on_wheel)
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        else:
+            steps = -1 * (event.delta // 120)
+        self._scroll_to(self._offset + steps * self.WHEEL_STEP)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(value) * len(self._model) * self.ROW_HEIGHT)
+        elif action == "scroll":
+            step = (self._viewport.winfo_height() if unit == "pages"
+                    else self.WHEEL_STEP)
+            self._scroll_to(self._offset + int(value) * step)
+
+    def _scroll_to(self, offset):
+        self._offset = int(offset)
+        self._layout()
+
+    # ── Mise en page des lignes visibles ──
+    def _layout(self):
+        height = max(1, self._viewport.winfo_height())
+        count  = len(self._model)
+        total  = count * self.ROW_HEIGHT
+        self._offset = max(0, min(self._offset, total - height))
+        first = self._offset // self.ROW_HEIGHT
+        last  = min(count, (self._offset + height) // self.ROW_HEIGHT + 1)
+
+        # Les cartes déjà associées à un élément encore visible le gardent
+        wanted   = [self._model[i] for i in range(first, last)]
+        previous = self._visible
+        keep = {i.id: previous[i.id] for i in wanted if i.id in previous}
+        kept = {id(c) for c in keep.values()}
+        free = [c for c in self._pool if id(c) not in kept]
+
+        self._visible = {}
+        for index, item in zip(range(first, last), wanted):
+            card = keep.get(item.id)
+            if card is None:
+                if free:
+                    card = free.pop()
+                    card.bind_item(item)
+                else:
+                    card = URLCard(self._viewport, item,
+                                   on_remove=self._on_remove)
+                    card.refresh()
+                    self._bind_wheel(card)
+                    self._pool.append(card)
+            card.place(x=2, y=index * self.ROW_HEIGHT - self._offset,
+                       relwidth=1.0, width=-4,
+                       height=self.ROW_HEIGHT - self.ROW_GAP)
+            self._visible[item.id] = card
+        for card in free:
+            card.place_forget()
+
+        if total > height:
+            self._scrollbar.set(self._offset / total,
+                                (self._offset + height) / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+
 # ─────────────────────────────────────────────────────────────────
 #  APPLICATION PRINCIPALE
 # ─────────────────────────────────────────────────────────────────
@@ -532,19 +540,34 @@ class NexusDownloaderApp:
 
     def __init__(self, root: tk.Tk):
         self.root = root
-        self._items: list[DownloadItem] = []
-        self._cards: list[URLCard]      = []
-        self._history: list[dict]       = []
+        self._queue = QueueModel()
+        self._history   = HistoryStore()
+        self._hist_cursor    = None   # id de la dernière entrée affichée
+        self._hist_exhausted = False
+        self._hist_pending   = False  # chargement de page déjà programmé
         self._ui_queue  = queue.Queue()
-        self._engine    = DownloadEngine(self._ui_queue)
+        self._engine    = DownloadEngine(self._ui_queue, info_cache=InfoCache(),
+                                         download_index=DownloadIndex(),
+                                         disk_budget=DiskBudget())
+        # Nombre de téléchargements simultanés ajusté au débit mesuré
+        self._concurrency = AdaptiveConcurrency(self._engine).start()
         self._output_dir = os.path.join(os.path.expanduser("~"), "Downloads")
         self._running   = True  # Contrôle la boucle de polling UI
+        self._journal   = QueueJournal()
+        self._ingests   = {}    # UrlIngestor en cours -> [ajoutés, lot entamé]
+        # Widgets des onglets construits au premier affichage (_switch_tab)
+        self.queue_view = self.queue_count_lbl = self.stage_lbl = None
         self._setup_window()
         self._build_ui()
+        self._restore_queue()
         self._poll_ui_queue()
 
         if not YT_DLP_AVAILABLE:
             self.root.after(500, self._warn_no_ytdlp)
+        else:
+            # Import de yt-dlp en arrière-plan, une fois la fenêtre affichée
+            self.root.after_idle(lambda: threading.Thread(
+                target=preload_yt_dlp, daemon=True).start())
 
     # ── Configuration de la fenêtre ──────────────────────────────
     def _setup_window(self):
@@ -652,18 +675,22 @@ class NexusDownloaderApp:
             self._tab_btns[key] = btn
 
         # Container des pages
-        pages_container = tk.Frame(self._tab_frame, bg=COLORS["bg_dark"])
-        pages_container.pack(fill="both", expand=True)
-
-        # Pages
-        self._tab_pages["download"] = self._build_download_tab(pages_container)
-        self._tab_pages["queue"]    = self._build_queue_tab(pages_container)
-        self._tab_pages["history"]  = self._build_history_tab(pages_container)
+        self._pages_container = tk.Frame(self._tab_frame, bg=COLORS["bg_dark"])
+        self._pages_container.pack(fill="both", expand=True)
+
+        # Pages : chacune est construite au premier passage sur son onglet
+        self._tab_builders = {
+            "download": self._build_download_tab,
+            "queue":    self._build_queue_tab,
+            "history":  self._build_history_tab,
+        }
 
         # Activation onglet initial
         self._switch_tab("download")
 
     def _switch_tab(self, key: str):
+        if key not in self._tab_pages:
+            self._tab_pages[key] = self._tab_builders[key](self._pages_container)
         # Cacher toutes les pages
         for page in self._tab_pages.values():
             page.pack_forget()
@@ -733,6 +760,24 @@ class NexusDownloaderApp:
         self.url_text.config(yscrollcommand=txt_scroll.set)
         txt_scroll.pack(side="right", fill="y")
 
+        # Imports volumineux (presse-papiers, fichier) : lus en arrière-plan
+        import_row = tk.Frame(url_panel, bg=COLORS["bg_panel"])
+        import_row.pack(fill="x", padx=12, pady=(0, 8))
+        for text, handler in (("📄 Importer un fichier…", self._import_file),
+                              ("📋 Coller le presse-papiers", self._import_clipboard)):
+            btn = tk.Label(import_row, text=f" {text} ",
+                           bg=COLORS["bg_card"],
+                           fg=COLORS["accent_cyan"],
+                           font=FONTS["small"],
+                           cursor="hand2", padx=4, pady=2)
+            btn.pack(side="right", padx=(6, 0))
+            btn.bind("<Button-1>", handler)
+        self.ingest_lbl = tk.Label(import_row, text="",
+                                   bg=COLORS["bg_panel"],
+                                   fg=COLORS["text_secondary"],
+                                   font=FONTS["small"])
+        self.ingest_lbl.pack(side="left")
+
         # ── Options de téléchargement ────────────────────────────
         opts_frame = tk.Frame(page, bg=COLORS["bg_dark"])
         opts_frame.pack(fill="x", pady=(0, 10))
@@ -840,38 +885,24 @@ class NexusDownloaderApp:
             font=FONTS["label_bold"]
         )
         self.queue_count_lbl.pack(side="left")
-
-        # Canvas scrollable pour les cartes
-        canvas_container = tk.Frame(page, bg=COLORS["bg_dark"])
-        canvas_container.pack(fill="both", expand=True)
-
-        self.queue_canvas = tk.Canvas(canvas_container,
-                                      bg=COLORS["bg_dark"],
-                                      highlightthickness=0)
-        scrollbar = tk.Scrollbar(canvas_container, orient="vertical",
-                                 command=self.queue_canvas.yview)
-        self.queue_canvas.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
-        self.queue_canvas.pack(side="left", fill="both", expand=True)
-
-        self.queue_inner = tk.Frame(self.queue_canvas, bg=COLORS["bg_dark"])
-        self._queue_window = self.queue_canvas.create_window(
-            (0, 0), window=self.queue_inner, anchor="nw"
+        # Occupation des étages du moteur (téléchargement / conversion)
+        self.stage_lbl = tk.Label(
+            header,
+            text="",
+            bg=COLORS["bg_dark"],
+            fg=COLORS["text_secondary"],
+            font=FONTS["small"]
         )
-        self.queue_inner.bind("<Configure>", self._on_queue_configure)
-        self.queue_canvas.bind("<Configure>", self._on_canvas_configure)
-        # Scroll molette
-        self.queue_canvas.bind("<MouseWheel>",
-            lambda e: self.queue_canvas.yview_scroll(-1*(e.delta//120), "units"))
-
-        return page
+        self.stage_lbl.pack(side="right")
 
-    def _on_queue_configure(self, _):
-        self.queue_canvas.configure(
-            scrollregion=self.queue_canvas.bbox("all"))
+        # Liste virtualisée : seules les lignes visibles sont construites
+        self.queue_view = VirtualQueueList(page, self._queue,
+                                           on_remove=self._remove_card)
+        self.queue_view.pack(fill="both", expand=True)
+        self._refresh_queue_view()
+        self._refresh_stage_stats()
 
-    def _on_canvas_configure(self, event):
-        self.queue_canvas.itemconfig(self._queue_window, width=event.width)
+        return page
 
     # ── Onglet Historique ────────────────────────────────────────
     def _build_history_tab(self, parent) -> tk.Frame:
@@ -895,10 +926,10 @@ class NexusDownloaderApp:
         self.history_canvas = tk.Canvas(list_frame,
                                         bg=COLORS["bg_dark"],
                                         highlightthickness=0)
-        hist_scroll = tk.Scrollbar(list_frame, orient="vertical",
-                                   command=self.history_canvas.yview)
-        self.history_canvas.configure(yscrollcommand=hist_scroll.set)
-        hist_scroll.pack(side="right", fill="y")
+        self._hist_scroll = tk.Scrollbar(list_frame, orient="vertical",
+                                         command=self.history_canvas.yview)
+        self.history_canvas.configure(yscrollcommand=self._on_history_scroll)
+        self._hist_scroll.pack(side="right", fill="y")
         self.history_canvas.pack(side="left", fill="both", expand=True)
 
         self.history_inner = tk.Frame(self.history_canvas, bg=COLORS["bg_dark"])
@@ -916,37 +947,67 @@ class NexusDownloaderApp:
                 -1*(e.delta//120), "units"))
         return page
 
+    # Nombre d'entrées chargées à la fois dans l'onglet historique
+    HISTORY_PAGE_SIZE = 50
+
+    def _on_history_scroll(self, first, last):
+        self._hist_scroll.set(first, last)
+        # Page suivante chargée à l'approche du bas de la liste
+        if (float(last) > 0.95 and not self._hist_exhausted
+                and not self._hist_pending):
+            self._hist_pending = True
+            self.root.after_idle(self._load_history_page)
+
     def _refresh_history_view(self):
         for w in self.history_inner.winfo_children():
             w.destroy()
-        if not self._history:
+        self._hist_cursor    = None
+        self._hist_exhausted = False
+        self.history_canvas.yview_moveto(0)
+        self._load_history_page()
+        if self._hist_cursor is None:
             tk.Label(self.history_inner,
                      text="Aucun téléchargement terminé pour l'instant.",
                      bg=COLORS["bg_dark"],
                      fg=COLORS["text_muted"],
                      font=FONTS["label"]).pack(pady=20)
+
+    def _load_history_page(self):
+        self._hist_pending = False
+        if self._hist_exhausted:
             return
-        for entry in reversed(self._history):
-            row = tk.Frame(self.history_inner,
-                           bg=COLORS["bg_card"],
-                           highlightbackground=COLORS["border"],
-                           highlightthickness=1)
-            row.pack(fill="x", pady=3, padx=2)
-            icon = "✔" if entry["status"] == DownloadItem.STATUS_DONE else "✗"
-            color = (COLORS["accent_green"]
-                     if entry["status"] == DownloadItem.STATUS_DONE
-                     else COLORS["accent_pink"])
-            tk.Label(row, text=f" {icon} ", bg=COLORS["bg_card"],
-                     fg=color, font=FONTS["label_bold"]).pack(side="left",
-                                                               padx=(8, 0))
-            tk.Label(row, text=entry["title"],
-                     bg=COLORS["bg_card"],
-                     fg=COLORS["text_primary"],
-                     font=FONTS["label"]).pack(side="left", padx=4)
-            tk.Label(row, text=entry["time"],
-                     bg=COLORS["bg_card"],
-                     fg=COLORS["text_muted"],
-                     font=FONTS["small"]).pack(side="right", padx=8)
+        entries = self._history.page(before_id=self._hist_cursor,
+                                     limit=self.HISTORY_PAGE_SIZE)
+        if len(entries) < self.HISTORY_PAGE_SIZE:
+            self._hist_exhausted = True
+        for entry in entries:
+            self._add_history_row(entry)
+        if entries:
+            self._hist_cursor = entries[-1]["id"]
+
+    def _add_history_row(self, entry: dict):
+        row = tk.Frame(self.history_inner,
+                       bg=COLORS["bg_card"],
+                       highlightbackground=COLORS["border"],
+                       highlightthickness=1)
+        row.pack(fill="x", pady=3, padx=2)
+        done = Status.from_label(entry["status"]) == Status.DONE
+        icon = "✔" if done else "✗"
+        color = (COLORS["accent_green"]
+                 if done
+                 else COLORS["accent_pink"])
+        tk.Label(row, text=f" {icon} ", bg=COLORS["bg_card"],
+                 fg=color, font=FONTS["label_bold"]).pack(side="left",
+                                                           padx=(8, 0))
+        tk.Label(row, text=entry["title"],
+                 bg=COLORS["bg_card"],
+                 fg=COLORS["text_primary"],
+                 font=FONTS["label"]).pack(side="left", padx=4)
+        finished = datetime.datetime.fromtimestamp(entry["finished_at"])
+        tk.Label(row, text=finished.strftime("%d/%m %H:%M"),
+                 bg=COLORS["bg_card"],
+                 fg=COLORS["text_muted"],
+                 font=FONTS["small"]).pack(side="right", padx=8)
 
     # ── Footer ───────────────────────────────────────────────────
     def _build_footer(self):
@@ -1015,72 +1076,142 @@ class NexusDownloaderApp:
         )
 
     # ── Logique métier ───────────────────────────────────────────
-    def _parse_urls(self) -> list[str]:
-        """Extrait et valide les URLs depuis la zone de texte."""
+    def _add_urls(self):
+        """Ajoute les URLs de la zone de texte à la file, sans les lancer.
+        La validation se fait en arrière-plan (voir _ingest)."""
         raw = self.url_text.get("1.0", "end").strip()
-        lines = [l.strip() for l in raw.splitlines() if l.strip()]
-        valid = []
-        url_re = re.compile(r"^https?://", re.I)
-        for line in lines:
-            if line.startswith("https://www.youtube.com/watch?v=..."):
-                continue
-            if url_re.match(line):
-                valid.append(line)
-            else:
-                self._set_status(f"URL ignorée (format invalide) : {line[:60]}")
-        return list(dict.fromkeys(valid))  # dédoublonnage
+        if raw.startswith("https://www.youtube.com/watch?v=..."):
+            raw = ""  # texte d'exemple
+        self._ingest(text=raw, label="saisie")
+
+    def _import_file(self, _=None):
+        path = filedialog.askopenfilename(
+            title="Importer une liste d'URLs",
+            filetypes=[("Listes d'URLs", "*.txt *.csv *.list"), ("Tous les fichiers", "*.*")])
+        if path:
+            self._ingest(source=path, label=os.path.basename(path))
+
+    def _import_clipboard(self, _=None):
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            text = ""
+        self._ingest(text=text, label="presse-papiers")
+
+    def _ingest(self, source: str = None, text: str = None, label: str = ""):
+        """Lance la lecture d'une liste d'URLs dans un thread ; les éléments
+        arrivent dans la file par lots (_pump_ingests), sans figer la fenêtre."""
+        ingest = UrlIngestor(source, text=text,
+                             fmt=FORMATS[self.format_var.get()],
+                             output_dir=self.dir_var.get().strip() or self._output_dir,
+                             label=label)
+        self._ingests[ingest] = [0, collections.deque()]
+        ingest.start()
+
+    def _pump_ingests(self):
+        """Ajoute à la file (et au journal, une écriture par pas) les éléments
+        lus par les imports, dans la limite de INGEST_TICK_BUDGET par tick : le
+        reste attend le tick suivant. Met à jour l'indicateur de progression."""
+        deadline = time.perf_counter() + INGEST_TICK_BUDGET
+        added_any = False
+        for ingest, state in list(self._ingests.items()):
+            pending = state[1]
+            while time.perf_counter() < deadline:
+                if not pending:
+                    batch = ingest.next_batch()
+                    if batch is None:
+                        break
+                    pending.extend(batch)
+                fresh = []
+                for _ in range(min(INGEST_STEP, len(pending))):
+                    key, item = pending.popleft()
+                    if self._queue.add(item, key):
+                        fresh.append(item)
+                self._journal.record_many(fresh)
+                state[0] += len(fresh)
+                added_any = added_any or bool(fresh)
+            if not pending and ingest.finished:
+                self._finish_ingest(ingest, self._ingests.pop(ingest)[0])
+        if added_any:
+            self._refresh_queue_view()
+        if self._ingests:
+            added = sum(state[0] for state in self._ingests.values())
+            shown = [i.progress for i in self._ingests if i.progress is not None]
+            percent = f" ({min(shown) * 100:.0f} %)" if shown else ""
+            self.ingest_lbl.config(text=f"⏳ Import : {added} URL(s) ajoutée(s){percent}…")
+        else:
+            self.ingest_lbl.config(text="")
 
-    def _add_urls(self):
-        """Ajoute les URLs à la file d'attente sans les lancer."""
-        urls = self._parse_urls()
-        if not urls:
+    def _finish_ingest(self, ingest: UrlIngestor, added: int):
+        if ingest.error:
+            self._set_status(f"✗  Import impossible ({ingest.label}) : {ingest.error[:80]}")
+            return
+        if not ingest.count:
+            if ingest.invalid:
+                self._set_status(f"URL ignorée (format invalide) : {ingest.first_invalid[:60]}")
             messagebox.showinfo("Aucune URL",
                                 "Aucune URL valide détectée.\n"
                                 "Collez des URLs commençant par http:// ou https://")
             return
-        fmt_label = self.format_var.get()
-        fmt_key   = FORMATS[fmt_label]
-        output_dir = self.dir_var.get().strip() or self._output_dir
-
-        added = 0
-        for url in urls:
-            # Éviter les doublons dans la file
-            existing = [i.url for i in self._items]
-            if url in existing:
-                continue
-            item = DownloadItem(url, fmt=fmt_key, output_dir=output_dir)
-            self._items.append(item)
-            self._add_card(item)
-            added += 1
-
-        if added:
-            self._set_status(f"{added} URL(s) ajoutée(s) à la file.")
-            self._switch_tab("queue")
-            self._update_queue_count()
-        else:
+        if not added:
             self._set_status("Ces URLs sont déjà dans la file.")
+            return
+        ignored = ingest.invalid + ingest.duplicates + ingest.count - added
+        self._set_status(f"{added} URL(s) ajoutée(s) à la file."
+                         + (f" {ignored} ignorée(s) (invalides ou doublons)." if ignored else ""))
+        self._switch_tab("queue")
+
+    def _add_children(self, children: list):
+        """Entrées d'une playlist découvertes par le moteur : ajoutées à la
+        file et lancées aussitôt, pendant que la suite est encore résolue."""
+        fresh = [child for child in children if self._queue.add(child)]
+        self._journal.record_many(fresh)
+        for child in fresh:
+            self._engine.enqueue(child)
+        if fresh:
+            self._refresh_queue_view()
+
+    def _restore_queue(self):
+        """Rejoue le journal : les éléments en attente reviennent dans la file,
+        ceux qui étaient en cours sont relancés (yt-dlp reprend leur .part)."""
+        resume = []
+        for entry in self._journal.replay():
+            item = QueueJournal.to_item(entry)
+            if not self._queue.add(item):
+                continue
+            if Status.from_label(entry.get("status")) != Status.PENDING:
+                resume.append(item)
+        if not len(self._queue):
+            return
+        if resume and YT_DLP_AVAILABLE:
+            for item in resume:
+                self._engine.enqueue(item)
+        self._set_status(f"↻  File restaurée : {len(self._queue)} élément(s), "
+                         f"{len(resume)} reprise(s).")
 
-    def _add_card(self, item: DownloadItem):
-        card = URLCard(self.queue_inner, item,
-                       on_remove=self._remove_card)
-        card.pack(fill="x", pady=3, padx=2)
-        self._cards.append(card)
+    def _discard_item(self, item: DownloadItem):
+        self._queue.remove(item)
+        self._journal.remove(item)
+        self._refresh_queue_view()
 
     def _remove_card(self, card: URLCard):
+        item = card.item
+        if item.status == DownloadItem.STATUS_QUEUED:
+            # Pas encore pris par un worker : on le retire de la file moteur
+            self._engine.cancel_item(item)
+            self._discard_item(item)
         # Si le téléchargement est en cours, on l'annule
-        if card.item.status in (DownloadItem.STATUS_DOWNLOADING, DownloadItem.STATUS_FETCHING):
-            self._engine.cancel_item(card.item)
+        elif item.status in (DownloadItem.STATUS_DOWNLOADING, DownloadItem.STATUS_FETCHING,
+                             DownloadItem.STATUS_POSTPROCESSING):
+            self._engine.cancel_item(item)
             # On ne le supprime pas immédiatement de la liste pour laisser
             # l'événement d'erreur ou d'annulation remonter
         else:
-            self._items.remove(card.item)
-            self._cards.remove(card)
-            card.destroy()
-            self._update_queue_count()
+            self._discard_item(item)
 
     def _start_all(self):
         """Envoie tous les éléments en attente au moteur."""
-        pending = [i for i in self._items
+        pending = [i for i in self._queue
                    if i.status == DownloadItem.STATUS_PENDING]
         if not pending:
             messagebox.showinfo("Rien à faire",
@@ -1092,7 +1223,8 @@ class NexusDownloaderApp:
             return
         for item in pending:
             self._engine.enqueue(item)
-        self._set_status(f"▶  {len(pending)} téléchargement(s) lancé(s)…")
+        self._set_status(f"▶  {len(pending)} téléchargement(s) planifié(s) — "
+                         f"{self._engine.max_workers} simultané(s) max…")
         self._switch_tab("queue")
 
     def _cancel_all(self):
@@ -1100,60 +1232,78 @@ class NexusDownloaderApp:
         self._set_status("⊘  Annulation de tous les téléchargements en cours…")
 
     def _clear_all(self):
-        removable = [c for c in self._cards
-                     if c.item.status in (
-                         DownloadItem.STATUS_PENDING,
-                         DownloadItem.STATUS_DONE,
-                         DownloadItem.STATUS_ERROR,
-                         DownloadItem.STATUS_CANCELLED)]
-        for card in removable:
-            self._items.remove(card.item)
-            self._cards.remove(card)
-            card.destroy()
-        self._update_queue_count()
+        removable = (DownloadItem.STATUS_PENDING,
+                     DownloadItem.STATUS_DONE,
+                     DownloadItem.STATUS_ERROR,
+                     DownloadItem.STATUS_CANCELLED)
+        for item in self._queue.remove_where(lambda i: i.status in removable):
+            self._journal.remove(item)
+        self._refresh_queue_view()
         self._set_status("File partiellement vidée (téléchargements actifs conservés).")
 
     def _clear_history(self):
         self._history.clear()
         self._refresh_history_view()
 
+    def _refresh_queue_view(self):
+        """Redessine la liste et le compteur, si l'onglet file est construit."""
+        if self.queue_view is not None:
+            self.queue_view.refresh()
+            self._update_queue_count()
+
     def _update_queue_count(self):
-        count = len(self._items)
+        count = len(self._queue)
         self.queue_count_lbl.config(
             text=f"File d'attente — {count} élément(s)")
 
+    def _refresh_stage_stats(self):
+        """Boucle d'une seconde, démarrée avec l'onglet file d'attente."""
+        stages = self._engine.stage_stats()
+        dl, pp = stages["download"], stages["postprocess"]
+        self.stage_lbl.config(
+            text=f"↓ {dl['busy']}/{dl['workers']} actifs · {dl['queued']} en file"
+                 f"    ⚙ {pp['busy']}/{pp['workers']} · {pp['queued']} en file")
+        if self._running:
+            self.root.after(1000, self._refresh_stage_stats)
+
     # ── Polling des événements du moteur ─────────────────────────
     def _poll_ui_queue(self):
+        dirty = {}  # item.id à rafraîchir une seule fois à la fin du tick
         try:
             while True:
                 msg = self._ui_queue.get_nowait()
-                self._handle_engine_event(msg)
+                self._handle_engine_event(msg, dirty)
         except queue.Empty:
             pass
         finally:
+            if self.queue_view is not None:
+                self.queue_view.refresh_items(dirty)
+            if self._ingests:
+                self._pump_ingests()
             # Ne relancer la boucle que si l'application est toujours active
             if self._running:
                 self.root.after(80, self._poll_ui_queue)
 
-    def _handle_engine_event(self, msg: dict):
-        item:  DownloadItem = msg["item"]
-        event: str          = msg["event"]
-        # Trouver la carte correspondante
-        card = next((c for c in self._cards if c.item is item), None)
-
-        if event in ("status_change", "info_fetched", "progress"):
-            if card:
-                card.refresh()
+    def _handle_engine_event(self, msg: dict, dirty: dict):
+        event: str = msg["event"]
+        if event == "progress_batch":
+            for item in self._engine.drain_progress():
+                dirty[item.id] = None
+            return
 
-        elif event == "done":
-            if card:
-                card.refresh()
-            self._history.append({
-                "title":  item.title,
-                "status": item.status,
-                "time":   datetime.datetime.now().strftime("%d/%m %H:%M"),
-                "url":    item.url,
-            })
+        item: DownloadItem = msg["item"]
+        dirty[item.id] = None
+        if event == "children_found":
+            self._add_children(msg["children"])
+            return
+        # Journal : état courant des éléments actifs, retrait des terminés
+        if event in ("done", "error", "cancelled"):
+            self._journal.remove(item)
+        elif item in self._queue:
+            self._journal.record(item)
+
+        if event == "done":
+            self._history.add(item)
             self._set_status(f"✔  Terminé : {item.title}")
             
             # Joue un son Windows de notification
@@ -1163,19 +1313,10 @@ class NexusDownloaderApp:
                 pass
 
         elif event == "error":
-            if card:
-                card.refresh()
-            self._history.append({
-                "title":  item.title,
-                "status": item.status,
-                "time":   datetime.datetime.now().strftime("%d/%m %H:%M"),
-                "url":    item.url,
-            })
+            self._history.add(item)
             self._set_status(f"✗  Erreur : {item.error_msg[:80]}")
 
         elif event == "cancelled":
-            if card:
-                card.refresh()
             self._set_status(f"⊘  Annulé : {item.title}")
 
     # ── Fermeture propre ─────────────────────────────────────────
@@ -1184,6 +1325,7 @@ class NexusDownloaderApp:
                                "Quitter NEXUS Downloader ?\n"
                                "Les téléchargements en cours seront interrompus."):
             self._running = False
+            self._engine.stop()
             # os._exit() est un appel système direct. Impossible à bloquer.
             os._exit(0)
 
@@ -1202,5 +1344,8 @@ if __name__ == "__main__":
 
     root = tk.Tk()
     app = NexusDownloaderApp(root)
+    # Listes d'URLs passées en argument (fichiers, ou « - » pour stdin)
+    for source in sys.argv[1:]:
+        app._ingest(source=source, label=os.path.basename(source))
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
@@ -0,0 +1,3230 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║          NEXUS DOWNLOADER  —  Moteur (sans interface)           ║
+║          File, formats, téléchargements, persistance            ║
+║                                                                  ║
+║  Ce module n'importe jamais tkinter : il est partagé par        ║
+║  l'application graphique (downloader.py) et le mode headless.   ║
+║                                                                  ║
+║  Utilisation sans interface :                                    ║
+║    python downloader.py --headless urls.txt                      ║
+║    python nexus_core.py urls.txt                                 ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import queue
+import os
+import re
+import json
+import time
+import sys
+import itertools
+import sqlite3
+import hashlib
+import functools
+import collections
+import contextlib
+import copy
+import enum
+import errno
+import importlib
+import importlib.util
+import random
+import uuid
+import argparse
+import bisect
+import shutil
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qs
+
+# ─────────────────────────────────────────────────────────────────
+#  VÉRIFICATION DÉPENDANCES
+# ─────────────────────────────────────────────────────────────────
+# yt-dlp charge des centaines de modules d'extracteurs (~0,2 s) : sa présence
+# est vérifiée sans l'importer, l'import réel a lieu au premier usage (ou
+# en arrière-plan via preload_yt_dlp).
+YT_DLP_AVAILABLE = importlib.util.find_spec("yt_dlp") is not None
+
+
+class _LazyModule:
+    """Module importé au premier accès à l'un de ses attributs ; le nom
+    global est alors remplacé par le vrai module (accès suivants directs)."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._name] = module
+        return getattr(module, attr)
+
+
+yt_dlp = _LazyModule("yt_dlp")
+
+
+
+# ─────────────────────────────────────────────────────────────────
+#  MODÈLE DE DONNÉES
+# ─────────────────────────────────────────────────────────────────
+class Status(enum.IntEnum):
+    """État d'un élément. `label` est le texte affiché, et celui enregistré
+    dans l'historique, le journal et l'API."""
+    PENDING        = 0
+    QUEUED         = 1
+    FETCHING       = 2
+    DOWNLOADING    = 3
+    POSTPROCESSING = 4
+    DONE           = 5
+    ERROR          = 6
+    CANCELLED      = 7
+
+    @property
+    def label(self) -> str:
+        return _STATUS_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "Status":
+        """Statut enregistré sous `label` (PENDING si inconnu)."""
+        return _STATUS_BY_LABEL.get(label, cls.PENDING)
+
+
+_STATUS_LABELS = {
+    Status.PENDING:        "En attente",
+    Status.QUEUED:         "En file",
+    Status.FETCHING:       "Récupération info...",
+    Status.DOWNLOADING:    "Téléchargement",
+    Status.POSTPROCESSING: "Conversion",
+    Status.DONE:           "Terminé",
+    Status.ERROR:          "Erreur",
+    Status.CANCELLED:      "Annulé",
+}
+_STATUS_BY_LABEL = {label: status for status, label in _STATUS_LABELS.items()}
+
+
+class DownloadItem:
+    """Élément de la file de téléchargement.
+
+    Enregistrement compact (__slots__) aux champs numériques : octets reçus
+    et attendus, vitesse en octets/s, ETA en secondes, heure d'ajout en
+    secondes (epoch). Le texte affiché est produit au rendu des seules lignes
+    visibles (`format_speed`, `format_eta`, `format_clock`) ; `note` porte un
+    message d'état ponctuel (nouvel essai, entrées de playlist…)."""
+    STATUS_PENDING        = Status.PENDING
+    STATUS_QUEUED         = Status.QUEUED
+    STATUS_FETCHING       = Status.FETCHING
+    STATUS_DOWNLOADING    = Status.DOWNLOADING
+    STATUS_POSTPROCESSING = Status.POSTPROCESSING
+    STATUS_DONE           = Status.DONE
+    STATUS_ERROR          = Status.ERROR
+    STATUS_CANCELLED      = Status.CANCELLED
+
+    __slots__ = ("id", "url", "fmt", "output_dir", "status", "title", "progress",
+                 "bytes_done", "bytes_total", "speed", "eta", "note",
+                 "error_msg", "filepath", "added_at")
+
+    def __init__(self, url, fmt="video_best", output_dir=""):
+        self.id          = uuid.uuid4().hex  # identifiant stable de l'élément
+        self.url         = url
+        self.fmt         = fmt
+        self.output_dir  = output_dir
+        self.status      = Status.PENDING
+        self.title       = url[:55] + "…" if len(url) > 55 else url
+        self.progress    = 0.0        # 0.0 à 100.0
+        self.bytes_done  = 0
+        self.bytes_total = 0          # 0 = inconnu
+        self.speed       = 0.0        # octets/s
+        self.eta         = None       # secondes, None = inconnue
+        self.note        = ""
+        self.error_msg   = ""
+        self.filepath    = ""
+        self.added_at    = time.time()
+
+
+_SIZE_UNITS = ("o", "Kio", "Mio", "Gio", "Tio")
+
+
+def format_bytes(count: float) -> str:
+    """Taille lisible : 1.5 Mio."""
+    for unit in _SIZE_UNITS[:-1]:
+        if abs(count) < 1024:
+            return f"{count:.0f} {unit}" if unit == "o" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} {_SIZE_UNITS[-1]}"
+
+
+def format_speed(bytes_per_second: float) -> str:
+    return f"{format_bytes(bytes_per_second)}/s" if bytes_per_second else ""
+
+
+def format_eta(seconds) -> str:
+    """ETA en MM:SS (HH:MM:SS au-delà d'une heure) ; vide si inconnue."""
+    if seconds is None:
+        return ""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def format_clock(timestamp: float) -> str:
+    """Heure locale HH:MM:SS d'un instant (epoch)."""
+    return time.strftime("%H:%M:%S", time.localtime(timestamp))
+
+
+def normalize_url(url: str) -> str:
+    """Forme normalisée d'une URL pour la détection de doublons
+    (schéma et hôte en minuscules, sans « www. », ni fragment, ni « / » final)."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = f"{host}:{port}" if port else host
+    return urlunsplit((parts.scheme.lower(), netloc,
+                       parts.path.rstrip("/"), parts.query, ""))
+
+
+class QueueModel:
+    """File d'attente indexée : ordre d'affichage + accès O(1) par id
+    d'élément et par URL normalisée. Les index restent synchronisés lors
+    des ajouts, suppressions et vidages."""
+
+    def __init__(self):
+        self._order  = []  # éléments dans l'ordre d'ajout
+        self._by_id  = {}  # item.id -> item
+        self._by_url = {}  # URL normalisée -> item
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __getitem__(self, index):
+        return self._order[index]
+
+    def __contains__(self, item):
+        return item.id in self._by_id
+
+    def get(self, item_id: str):
+        return self._by_id.get(item_id)
+
+    def find_url(self, url: str):
+        return self._by_url.get(normalize_url(url))
+
+    def add(self, item: DownloadItem, key: str = None) -> bool:
+        """Ajoute l'élément ; False si son URL est déjà dans la file.
+        `key` : URL normalisée si elle est déjà connue."""
+        key = key or normalize_url(item.url)
+        if key in self._by_url or item.id in self._by_id:
+            return False
+        self._order.append(item)
+        self._by_id[item.id] = item
+        self._by_url[key] = item
+        return True
+
+    def remove(self, item: DownloadItem):
+        if self._by_id.pop(item.id, None) is None:
+            return
+        self._by_url.pop(normalize_url(item.url), None)
+        self._order.remove(item)
+
+    def remove_where(self, predicate) -> list:
+        """Retire (en une passe) les éléments pour lesquels predicate(item)
+        est vrai et les retourne."""
+        kept, removed = [], []
+        for item in self._order:
+            (removed if predicate(item) else kept).append(item)
+        if removed:
+            self._order = kept
+            for item in removed:
+                del self._by_id[item.id]
+                self._by_url.pop(normalize_url(item.url), None)
+        return removed
+
+
+# ─────────────────────────────────────────────────────────────────
+#  FORMATS DISPONIBLES
+# ─────────────────────────────────────────────────────────────────
+FORMATS = {
+    "🎬  Vidéo Meilleure qualité":  "video_best",
+    "🎬  Vidéo 1080p (MP4)":        "video_1080",
+    "🎬  Vidéo 720p (MP4)":         "video_720",
+    "🎬  Vidéo 480p (MP4)":         "video_480",
+    "🎵  Audio MP3 (320 kbps)":     "audio_mp3",
+    "🎵  Audio MP3 (128 kbps)":     "audio_mp3_128",
+    "🎵  Audio M4A Meilleur":       "audio_m4a",
+    "🎵  Audio OPUS Meilleur":      "audio_opus",
+}
+
+# Pas de fenêtre console pour les sondes ffmpeg (exécutable --windowed)
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def _probe(*args) -> str:
+    """Sortie standard d'un outil externe ("" en cas d'échec)."""
+    try:
+        return subprocess.run(args, capture_output=True, text=True, timeout=10,
+                              creationflags=_NO_WINDOW).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_capabilities() -> dict:
+    """Sonde ffmpeg/ffprobe une seule fois : chemins, version et encodeurs."""
+    caps = {
+        "ffmpeg":   shutil.which("ffmpeg"),
+        "ffprobe":  shutil.which("ffprobe"),
+        "version":  "",
+        "encoders": frozenset(),
+    }
+    if caps["ffmpeg"]:
+        m = re.match(r"ffmpeg version (\S+)",
+                     _probe(caps["ffmpeg"], "-hide_banner", "-version"))
+        caps["version"] = m.group(1) if m else ""
+        caps["encoders"] = frozenset(re.findall(
+            r"^\s*[VAS][A-Z.]{5}\s+([\w-]+)",
+            _probe(caps["ffmpeg"], "-hide_banner", "-encoders"), re.M))
+    return caps
+
+
+def _build_format_table(caps: dict) -> dict:
+    """Options yt-dlp de chaque clé de format pour les capacités données."""
+    merge = caps["ffmpeg"] is not None
+    # Encodeurs inconnus (sonde impossible) : on laisse ffmpeg essayer
+    mp3 = merge and (not caps["encoders"] or "libmp3lame" in caps["encoders"])
+
+    def video(height=None):
+        limit = f"[height<={height}]" if height else ""
+        if merge:
+            return {"format": f"bestvideo{limit}+bestaudio/best{limit}",
+                    "merge_output_format": "mp4"}
+        return {"format": f"best{limit}[ext=mp4]/best"}
+
+    def audio_mp3(quality):
+        opts = {"format": "bestaudio/best"}
+        if mp3:
+            opts["postprocessors"] = [{"key": "FFmpegExtractAudio",
+                                       "preferredcodec": "mp3",
+                                       "preferredquality": quality}]
+        return opts
+
+    return {
+        "video_best":    video(),
+        "video_1080":    video(1080),
+        "video_720":     video(720),
+        "video_480":     video(480),
+        "audio_mp3":     audio_mp3("320"),
+        "audio_mp3_128": audio_mp3("128"),
+        "audio_m4a":     {"format": "bestaudio[ext=m4a]/bestaudio/best"},
+        "audio_opus":    {"format": "bestaudio[ext=opus]/bestaudio/best"},
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def format_table() -> dict:
+    """Table des options par clé de format, résolue une fois par processus."""
+    return _build_format_table(ffmpeg_capabilities())
+
+
+def fmt_key_to_ytdlp(fmt_key: str) -> dict:
+    """Convertit la clé de format interne en options yt-dlp (copie de la
+    table précalculée ; les listes imbriquées sont partagées, ne pas modifier)."""
+    opts = format_table().get(fmt_key)
+    return dict(opts) if opts is not None else {"format": "best"}
+
+
+# ─────────────────────────────────────────────────────────────────
+#  LIMITATION DE DÉBIT PAR HÔTE
+# ─────────────────────────────────────────────────────────────────
+# Alias d'hôtes regroupés sur la même plateforme
+HOST_ALIASES = {
+    "youtu.be":          "youtube.com",
+    "youtube-nocookie.com": "youtube.com",
+    "vm.tiktok.com":     "tiktok.com",
+    "fb.watch":          "facebook.com",
+    "x.com":             "twitter.com",
+}
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "music.")
+
+
+def host_key(url: str) -> str:
+    """Clé de regroupement par plateforme (hôte normalisé) d'une URL."""
+    host = (urlparse(url).hostname or "").lower()
+    if host in HOST_ALIASES:
+        return HOST_ALIASES[host]
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    return HOST_ALIASES.get(host, host)
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe : `rate` jetons/s, rafale de `capacity`.
+
+    Une demande supérieure au contenu du seau est acceptée à crédit : l'appelant
+    attend simplement le temps nécessaire pour rembourser la dette."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate     = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens  = self.capacity
+        self._stamp   = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def consume(self, amount: float = 1.0, cancel_event=None) -> bool:
+        """Prélève `amount` jetons en bloquant si besoin.
+        Retourne False si `cancel_event` est levé pendant l'attente."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait <= 0:
+            return True
+        if cancel_event is not None:
+            return not cancel_event.wait(wait)
+        time.sleep(wait)
+        return True
+
+
+# ─────────────────────────────────────────────────────────────────
+#  TÉLÉCHARGEMENT SEGMENTÉ (HTTP Range)
+# ─────────────────────────────────────────────────────────────────
+# Connexions parallèles par élément (segments HTTP ou fragments DASH/HLS)
+SEGMENTS_PER_ITEM = 4
+# Connexions segmentées ouvertes au plus, tous éléments confondus
+MAX_CONNECTIONS = 16
+# En dessous de cette taille, une seule connexion (chemin yt-dlp habituel)
+SEGMENT_MIN_SIZE = 8 * 1024 * 1024
+# Unité de travail distribuée aux connexions
+SEGMENT_CHUNK = 4 * 1024 * 1024
+_READ_BLOCK = 256 * 1024
+_CONTENT_RANGE_RE = re.compile(r"bytes \d+-\d+/(\d+)")
+# Réponses à la sonde Range qui signifient seulement « pas de Range ici »
+_RANGE_UNSUPPORTED = (405, 416, 501)
+
+
+class SegmentedDownload:
+    """Télécharge un fichier HTTP unique par plusieurs connexions (Range).
+
+    Le fichier est découpé en blocs de SEGMENT_CHUNK distribués à la demande :
+    une connexion lente ne retarde que son bloc. Chaque connexion occupe une
+    place de `slots` (limite globale) pendant toute sa durée. Les blocs
+    terminés sont notés dans un fichier `.segments` à côté du `.segpart`, ce
+    qui permet la reprise après une interruption.
+
+    Le fichier temporaire n'est pas le `.part` de yt-dlp : un essai suivant
+    sur une seule connexion (yt-dlp, `continuedl`) reprendrait sinon à la fin
+    d'un fichier déjà à sa taille finale mais encore troué.
+
+    `on_progress` reçoit des dictionnaires au format des hooks yt-dlp ; une
+    exception levée par le hook (annulation) interrompt le téléchargement.
+    Le `.segpart` est préalloué à sa taille finale (voir `preallocate`), puis
+    `on_allocated(total)` est appelé et `allocated` passe à vrai ; si la
+    préallocation échoue, un `.segpart` créé par cet essai est supprimé."""
+
+    def __init__(self, ydl, url: str, headers: dict, path: str,
+                 connections: int, slots: threading.Semaphore,
+                 cancel_flag=None, on_progress=None, on_allocated=None):
+        self._ydl      = ydl
+        self._url      = url
+        self._headers  = dict(headers or {})
+        self.path      = path
+        self.part_path = path + ".segpart"
+        self._state_path = path + ".segpart.segments"
+        self._connections = max(1, int(connections))
+        self._slots    = slots
+        self._cancel   = cancel_flag
+        self._on_progress = on_progress
+        self._on_allocated = on_allocated
+        self.allocated = False
+        self._lock     = threading.Lock()
+        self._report_lock = threading.Lock()
+        self._stop     = threading.Event()
+        self._error    = None
+        self._pending  = collections.deque()  # indices des blocs à télécharger
+        self._finished = set()                # indices des blocs terminés
+        self._done     = 0                    # octets écrits
+        self._total    = 0
+        self._started  = 0.0
+        self._resumed  = 0
+
+    @staticmethod
+    def probe_size(ydl, url: str, headers: dict):
+        """Taille totale si le serveur accepte les requêtes Range, sinon None.
+        Les autres échecs (DNS, TLS, 403…) sont propagés : ils concernent
+        aussi le téléchargement sur une seule connexion."""
+        request = yt_dlp.networking.Request(
+            url, headers={**(headers or {}), "Range": "bytes=0-0"})
+        try:
+            response = ydl.urlopen(request)
+        except yt_dlp.networking.exceptions.HTTPError as exc:
+            if exc.status in _RANGE_UNSUPPORTED:
+                exc.close()
+                return None
+            raise
+        except yt_dlp.networking.exceptions.UnsupportedRequest:
+            return None
+        with contextlib.closing(response):
+            if response.status != 206:
+                return None
+            m = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            return int(m.group(1)) if m else None
+
+    def run(self, total: int):
+        self._total = total
+        chunks = range((total + SEGMENT_CHUNK - 1) // SEGMENT_CHUNK)
+        self._load_state(len(chunks))
+        self._pending.extend(i for i in chunks if i not in self._finished)
+        self._resumed = self._done = sum(self._chunk_size(i) for i in self._finished)
+        # .segpart à la taille finale : chaque connexion écrit à son offset
+        mode = "r+b" if os.path.exists(self.part_path) else "w+b"
+        try:
+            with open(self.part_path, mode) as f:
+                preallocate(f, total)
+        except OSError:
+            if mode == "w+b":
+                with contextlib.suppress(OSError):
+                    os.remove(self.part_path)
+            raise
+        self.allocated = True
+        if self._on_allocated is not None:
+            self._on_allocated(total)
+        self._started = time.monotonic()
+        threads = [threading.Thread(target=self._connection_loop, daemon=True)
+                   for _ in range(min(self._connections, len(self._pending)))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self._error is not None:
+            raise self._error
+        if self._pending:
+            raise yt_dlp.utils.DownloadError("Téléchargement annulé par l'utilisateur.")
+        os.replace(self.part_path, self.path)
+        try:
+            os.remove(self._state_path)
+        except OSError:
+            pass
+        self._report({"status": "finished", "filename": self.path,
+                      "total_bytes": total, "downloaded_bytes": total})
+
+    def _chunk_size(self, index: int) -> int:
+        return min(SEGMENT_CHUNK, self._total - index * SEGMENT_CHUNK)
+
+    def _stopped(self) -> bool:
+        return self._stop.is_set() or bool(self._cancel and self._cancel.is_set())
+
+    def _connection_loop(self):
+        # Une place globale par connexion, attendue sans bloquer l'annulation
+        while not self._slots.acquire(timeout=0.2):
+            if self._stopped():
+                return
+        try:
+            with open(self.part_path, "r+b") as f:
+                while not self._stopped():
+                    with self._lock:
+                        if not self._pending:
+                            return
+                        index = self._pending.popleft()
+                    try:
+                        self._fetch(f, index)
+                    except BaseException as exc:
+                        with self._lock:
+                            self._pending.appendleft(index)
+                            if self._error is None:
+                                self._error = exc
+                        self._stop.set()
+                        return
+        finally:
+            self._slots.release()
+
+    def _fetch(self, f, index: int):
+        start = index * SEGMENT_CHUNK
+        end = start + self._chunk_size(index) - 1
+        request = yt_dlp.networking.Request(
+            self._url, headers={**self._headers, "Range": f"bytes={start}-{end}"})
+        size = end - start + 1
+        written = 0
+        with contextlib.closing(self._ydl.urlopen(request)) as response:
+            if response.status != 206:
+                raise yt_dlp.utils.DownloadError(
+                    f"Requête Range refusée (HTTP {response.status})")
+            f.seek(start)
+            while written < size:
+                block = response.read(min(_READ_BLOCK, size - written))
+                if not block:
+                    break
+                f.write(block)
+                written += len(block)
+                with self._lock:
+                    self._done += len(block)
+                    done = self._done
+                self._report_progress(done)
+                if self._stopped():
+                    break
+        if written != size:
+            with self._lock:
+                self._done -= written  # bloc incomplet : repris en entier
+            if self._stopped():
+                raise yt_dlp.utils.DownloadError("Téléchargement annulé par l'utilisateur.")
+            raise yt_dlp.utils.DownloadError(
+                f"Segment incomplet ({written}/{size} octets)")
+        with self._lock:
+            self._finished.add(index)
+            self._save_state()
+
+    def _report_progress(self, done: int):
+        elapsed = time.monotonic() - self._started
+        speed = (done - self._resumed) / elapsed if elapsed > 0 else None
+        eta = (self._total - done) / speed if speed else None
+        self._report({
+            "status":           "downloading",
+            "downloaded_bytes": done,
+            "total_bytes":      self._total,
+            "tmpfilename":      self.part_path,
+            "filename":         self.path,
+            "speed":            speed,
+            "eta":              eta,
+        })
+
+    def _report(self, d: dict):
+        if self._on_progress is not None:
+            with self._report_lock:  # hook non réentrant (limiteur de débit)
+                self._on_progress(d)
+
+    def _load_state(self, chunk_count: int):
+        if not os.path.exists(self.part_path):
+            return
+        try:
+            with open(self._state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("total") == self._total and state.get("chunk") == SEGMENT_CHUNK:
+            self._finished = {i for i in state.get("done", []) if 0 <= i < chunk_count}
+
+    def _save_state(self):
+        tmp = self._state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"total": self._total, "chunk": SEGMENT_CHUNK,
+                           "done": sorted(self._finished)}, f)
+            os.replace(tmp, self._state_path)
+        except OSError:
+            pass  # reprise seulement moins fine
+
+
+# ─────────────────────────────────────────────────────────────────
+#  INSTRUMENTATION DU MOTEUR
+# ─────────────────────────────────────────────────────────────────
+# Bornes des histogrammes : durées d'étape (s) et débits de transfert (o/s)
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+THROUGHPUT_BUCKETS = tuple(2 ** n * 1024 for n in range(6, 17, 2))  # 64 Kio → 64 Mio
+# Chronologies d'éléments conservées (les plus récentes)
+METRICS_RECENT_ITEMS = 200
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (modèle Prometheus)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts  = [0] * (len(self.buckets) + 1)  # dernier = +Inf
+        self.sum     = 0.0
+        self.count   = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum   += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """[(borne, nb d'observations <= borne)], borne "+Inf" incluse."""
+        return list(zip([*self.buckets, "+Inf"], itertools.accumulate(self.counts)))
+
+    def to_dict(self) -> dict:
+        return {"buckets": {str(le): n for le, n in self.cumulative()},
+                "sum": round(self.sum, 3), "count": self.count}
+
+
+class EngineMetrics:
+    """Mesures du moteur : durée de chaque étape par élément (attente en file,
+    extraction, sélection du format, transfert, fusion, post-traitement),
+    octets reçus, nouvelles tentatives, débits et issues.
+
+    Chaque élément garde sa chronologie (`timeline`) ; les étapes alimentent
+    aussi des histogrammes agrégés. Export JSON (`snapshot`) ou format texte
+    Prometheus (`prometheus`). Thread-safe."""
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self._started  = time.time()
+        self.counters  = collections.Counter()
+        self.stages    = collections.defaultdict(lambda: Histogram(STAGE_BUCKETS))
+        self.throughput = Histogram(THROUGHPUT_BUCKETS)
+        self._enqueued = {}                        # item.id -> instant d'entrée en file
+        self._pp_start = {}                        # (item.id, pp) -> instant de début
+        self._recent   = collections.OrderedDict() # item.id -> chronologie
+
+    # ── Enregistrement ──
+    def _timeline(self, item) -> dict:
+        entry = self._recent.get(item.id)
+        if entry is None:
+            entry = self._recent[item.id] = {"url": item.url, "stages": {},
+                                             "bytes": 0, "retries": 0}
+            while len(self._recent) > METRICS_RECENT_ITEMS:
+                self._recent.popitem(last=False)
+        return entry
+
+    def count(self, name: str, amount: int = 1, item=None):
+        with self._lock:
+            self.counters[name] += amount
+            if item is not None and name == "retries":
+                self._timeline(item)["retries"] += amount
+
+    def observe(self, item, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage].observe(seconds)
+            stages = self._timeline(item)["stages"]
+            stages[stage] = round(stages.get(stage, 0.0) + seconds, 3)
+
+    @contextlib.contextmanager
+    def timed(self, item, stage: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(item, stage, time.monotonic() - start)
+
+    def enqueued(self, item):
+        with self._lock:
+            self._enqueued[item.id] = time.monotonic()
+
+    def dequeued(self, item):
+        with self._lock:
+            start = self._enqueued.pop(item.id, None)
+        if start is not None:
+            self.observe(item, "queue_wait", time.monotonic() - start)
+
+    def add_bytes(self, item, amount: int):
+        with self._lock:
+            self.counters["bytes_downloaded"] += amount
+            self._timeline(item)["bytes"] += amount
+
+    def postprocessor_event(self, item, d: dict):
+        """Hook `postprocessor_hooks` de yt-dlp : fusion et corrections
+        exécutées pendant le téléchargement."""
+        key = (item.id, d.get("postprocessor"))
+        if d.get("status") == "started":
+            with self._lock:
+                self._pp_start[key] = time.monotonic()
+        elif d.get("status") == "finished":
+            with self._lock:
+                start = self._pp_start.pop(key, None)
+            if start is not None:
+                stage = "merge" if key[1] == "Merger" else "fixup"
+                self.observe(item, stage, time.monotonic() - start)
+
+    def transferred(self, item, seconds: float):
+        """Durée d'un téléchargement, hors fusion/corrections yt-dlp."""
+        with self._lock:
+            entry = self._timeline(item)
+            inner = sum(entry["stages"].get(s, 0.0) for s in ("merge", "fixup"))
+            seconds = max(0.0, seconds - inner)
+            if seconds > 0 and entry["bytes"]:
+                self.throughput.observe(entry["bytes"] / seconds)
+        self.observe(item, "transfer", seconds)
+
+    def finished(self, item, outcome: str):
+        with self._lock:
+            self.counters[f"items_{outcome}"] += 1
+            self._enqueued.pop(item.id, None)
+            self._timeline(item)["outcome"] = outcome
+
+    def timeline(self, item_id: str) -> dict:
+        with self._lock:
+            entry = self._recent.get(item_id)
+            return copy.deepcopy(entry) if entry is not None else None
+
+    # ── Export ──
+    def snapshot(self, stage_stats: dict = None) -> dict:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self._started, 1),
+                "counters":   dict(self.counters),
+                "stages":     {name: h.to_dict() for name, h in self.stages.items()},
+                "throughput_bytes_per_second": self.throughput.to_dict(),
+                "workers":    stage_stats or {},
+                "recent_items": copy.deepcopy(list(self._recent.values())[-20:]),
+            }
+
+    def prometheus(self, stage_stats: dict = None) -> str:
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP nexus_{name} {help_text}")
+            lines.append(f"# TYPE nexus_{name} {kind}")
+
+        def histogram(name, hist, labels=""):
+            sep = "," if labels else ""
+            for le, n in hist.cumulative():
+                lines.append(f'nexus_{name}_bucket{{{labels}{sep}le="{le}"}} {n}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"nexus_{name}_sum{suffix} {hist.sum:.6f}")
+            lines.append(f"nexus_{name}_count{suffix} {hist.count}")
+
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {name: copy.deepcopy(h) for name, h in self.stages.items()}
+            throughput = copy.deepcopy(self.throughput)
+        metric("items_total", "counter", "Éléments terminés par issue.")
+        for outcome in ("done", "error", "cancelled"):
+            lines.append(f'nexus_items_total{{outcome="{outcome}"}} '
+                         f'{counters.get(f"items_{outcome}", 0)}')
+        metric("bytes_downloaded_total", "counter", "Octets reçus.")
+        lines.append(f"nexus_bytes_downloaded_total {counters.get('bytes_downloaded', 0)}")
+        metric("retries_total", "counter", "Nouvelles tentatives.")
+        lines.append(f"nexus_retries_total {counters.get('retries', 0)}")
+        metric("disk_held_total", "counter",
+               "Éléments mis de côté faute d'espace disque.")
+        lines.append(f"nexus_disk_held_total {counters.get('disk_held', 0)}")
+        metric("failures_total", "counter", "Échecs de téléchargement par catégorie.")
+        for kind in (ERROR_TRANSIENT, ERROR_EXPIRED, ERROR_AUTH, ERROR_GEO, ERROR_PERMANENT):
+            lines.append(f'nexus_failures_total{{kind="{kind}"}} '
+                         f'{counters.get(f"errors_{kind}", 0)}')
+        metric("info_cache_requests_total", "counter", "Consultations du cache.")
+        for result in ("hit", "miss"):
+            lines.append(f'nexus_info_cache_requests_total{{result="{result}"}} '
+                         f'{counters.get(f"info_cache_{result}", 0)}')
+        metric("stage_duration_seconds", "histogram", "Durée des étapes par élément.")
+        for name, hist in sorted(stages.items()):
+            histogram("stage_duration_seconds", hist, f'stage="{name}"')
+        metric("transfer_throughput_bytes_per_second", "histogram",
+               "Débit moyen de chaque transfert.")
+        histogram("transfer_throughput_bytes_per_second", throughput)
+        for field, kind, help_text in (
+                ("workers", "gauge", "Workers de l'étage."),
+                ("busy", "gauge", "Éléments en cours dans l'étage."),
+                ("queued", "gauge", "Éléments en attente de l'étage."),
+                ("busy_seconds", "counter", "Temps d'occupation cumulé.")):
+            name = f"stage_{field}" + ("_total" if kind == "counter" else "")
+            metric(name, kind, help_text)
+            for stage, values in (stage_stats or {}).items():
+                lines.append(f'nexus_{name}{{stage="{stage}"}} {values[field]}')
+        return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────────────────────────────
+#  CLASSIFICATION DES ERREURS ET NOUVELLES TENTATIVES
+# ─────────────────────────────────────────────────────────────────
+ERROR_TRANSIENT = "transient"  # réseau, 5xx, 429 : nouvel essai plus tard
+ERROR_EXPIRED   = "expired"    # URL signée expirée (403/410) : nouvelle extraction
+ERROR_AUTH      = "auth"       # connexion, cookies ou abonnement requis
+ERROR_GEO       = "geo"        # bloqué dans le pays
+ERROR_PERMANENT = "permanent"  # inutile de réessayer
+
+# Préfixe du message d'erreur affiché, par catégorie
+ERROR_LABELS = {
+    ERROR_AUTH: "Connexion requise",
+    ERROR_GEO:  "Indisponible dans votre pays",
+}
+
+# Nouvelles tentatives automatiques (transitoires et URLs expirées)
+MAX_RETRIES      = 4
+RETRY_BASE_DELAY = 2.0   # s, doublé à chaque essai
+RETRY_MAX_DELAY  = 60.0
+
+_GEO_RE = re.compile(r"geo.?restrict|not available (?:in|from) your (?:country|location|region)",
+                     re.I)
+_AUTH_RE = re.compile(r"sign in|log ?in|login required|private video|members.only|"
+                      r"cookies|confirm your age|age.restricted|premium", re.I)
+_EXPIRED_RE = re.compile(r"HTTP (?:Error )?(?:403|410)\b", re.I)
+_TRANSIENT_RE = re.compile(r"timed? ?out|temporar|connection (?:reset|refused|aborted)|"
+                           r"reset by peer|broken pipe|remote end closed|incomplete|"
+                           r"name resolution|unreachable|did not get any data|bytes, expected|"
+                           r"HTTP (?:Error )?(?:5\d\d|429)\b", re.I)
+
+
+def _error_chain(exc):
+    """L'exception puis ses causes (yt-dlp les range dans `exc_info`)."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc_info = getattr(exc, "exc_info", None)
+        cause = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+        exc = cause or exc.__cause__ or exc.__context__
+
+
+def classify_error(exc: BaseException) -> str:
+    """Catégorie d'un échec de téléchargement (ERROR_*)."""
+    for err in _error_chain(exc):
+        if YT_DLP_AVAILABLE and isinstance(err, yt_dlp.utils.GeoRestrictedError):
+            return ERROR_GEO
+        status = getattr(err, "status", None) or getattr(err, "code", None)
+        if isinstance(status, int) and 400 <= status < 600:
+            if status == 401:
+                return ERROR_AUTH
+            if status in (403, 410):
+                return ERROR_EXPIRED
+            if status == 429 or status >= 500:
+                return ERROR_TRANSIENT
+            return ERROR_PERMANENT
+        if isinstance(err, (ConnectionError, TimeoutError)) or (
+                YT_DLP_AVAILABLE and isinstance(
+                    err, (yt_dlp.networking.exceptions.TransportError,
+                          yt_dlp.utils.ContentTooShortError))):
+            return ERROR_TRANSIENT
+    message = str(exc)
+    for pattern, kind in ((_GEO_RE, ERROR_GEO), (_AUTH_RE, ERROR_AUTH),
+                          (_EXPIRED_RE, ERROR_EXPIRED), (_TRANSIENT_RE, ERROR_TRANSIENT)):
+        if pattern.search(message):
+            return kind
+    return ERROR_PERMANENT
+
+
+def retry_delay(attempt: int) -> float:
+    """Attente avant l'essai n° `attempt` (1, 2, …) : exponentielle plafonnée,
+    tirée au hasard dans sa moitié haute pour désynchroniser les workers."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  ESPACE DISQUE
+# ─────────────────────────────────────────────────────────────────
+# Espace laissé libre sur chaque volume de sortie (octets)
+DISK_FREE_MARGIN = 512 * 1024 * 1024
+# Marge ajoutée aux tailles annoncées (filesize_approx, conteneur final)
+DISK_SIZE_SLACK = 1.05
+
+
+def estimate_download_size(info: dict) -> int:
+    """Octets que le format retenu occupera sur le disque, d'après
+    `filesize` ou `filesize_approx` (0 si aucune taille n'est annoncée).
+    Un format fusionné (vidéo + audio) compte double : les flux et le
+    fichier fusionné coexistent jusqu'à la fin de la fusion."""
+    formats = info.get("requested_formats") or [info]
+    total = sum(f.get("filesize") or f.get("filesize_approx") or 0 for f in formats)
+    if len(formats) > 1:
+        total *= 2
+    return int(total * DISK_SIZE_SLACK)
+
+
+def _existing_dir(path: str) -> str:
+    """Le dossier lui-même ou son plus proche parent existant (le dossier de
+    sortie n'est créé par yt-dlp qu'au premier fichier)."""
+    path = os.path.abspath(path or ".")
+    while not os.path.isdir(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def preallocate(f, size: int):
+    """Porte le fichier ouvert `f` à `size` octets en réservant ses blocs
+    (posix_fallocate : moins de fragmentation, et un disque plein est
+    détecté avant le transfert). Sans prise en charge par le système de
+    fichiers, le fichier est seulement agrandi (creux)."""
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as exc:
+            if exc.errno not in (errno.EOPNOTSUPP, errno.EINVAL, errno.ENOSYS):
+                raise
+    f.truncate(size)
+
+
+class DiskBudget:
+    """Réservations d'espace disque des téléchargements, par volume.
+
+    Avant son transfert, un élément réserve la taille estimée de son fichier
+    (`estimate_download_size`) : la réservation est accordée si l'espace
+    libre, moins la part encore à écrire des autres réservations du volume et
+    moins `margin`, la contient. Sinon l'élément est mis de côté (`on_hold`
+    est appelé) et rendu par `release()` à la prochaine fin d'un élément du
+    même volume. S'il ne tient pas alors qu'aucun autre élément n'occupe le
+    volume, OSError(ENOSPC) est levée."""
+
+    def __init__(self, margin: int = DISK_FREE_MARGIN):
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._entries = {}  # item -> [volume, octets réservés, octets préalloués]
+        self._held = collections.defaultdict(list)  # volume -> éléments mis de côté
+
+    @staticmethod
+    def _remaining(item: DownloadItem, entry: list) -> int:
+        return max(0, entry[1] - max(entry[2], item.bytes_done))
+
+    def reserve(self, item: DownloadItem, directory: str, size: int,
+                on_hold=None) -> bool:
+        """Réserve `size` octets sur le volume de `directory`. Retourne False
+        si l'élément est mis de côté (après l'appel de `on_hold`)."""
+        directory = _existing_dir(directory)
+        volume = os.stat(directory).st_dev
+        with self._lock:
+            free = shutil.disk_usage(directory).free
+            others = [(i, e) for i, e in self._entries.items()
+                      if e[0] == volume and i is not item]
+            pending = sum(self._remaining(i, e) for i, e in others)
+            if size + pending + self.margin <= free:
+                self._entries[item] = [volume, size, 0]
+                return True
+            if not others:
+                raise OSError(errno.ENOSPC,
+                              f"Espace disque insuffisant : {format_bytes(size)} "
+                              f"requis, {format_bytes(max(0, free - self.margin))} "
+                              f"disponibles")
+            if on_hold is not None:
+                on_hold(item)
+            self._held[volume].append(item)
+            return False
+
+    def allocated(self, item: DownloadItem, size: int):
+        """Fichier de l'élément préalloué : ces octets sont déjà pris sur le disque."""
+        with self._lock:
+            entry = self._entries.get(item)
+            if entry is not None:
+                entry[2] = size
+
+    def release(self, item: DownloadItem) -> list:
+        """Libère la réservation de l'élément terminé ; retourne les éléments
+        mis de côté sur son volume, à remettre en file."""
+        with self._lock:
+            entry = self._entries.pop(item, None)
+            if entry is None:
+                return []
+            return self._held.pop(entry[0], [])
+
+    def unhold(self, item: DownloadItem) -> bool:
+        """Retire un élément mis de côté (annulation). Vrai s'il l'était."""
+        with self._lock:
+            for volume, held in self._held.items():
+                if item in held:
+                    held.remove(item)
+                    if not held:
+                        del self._held[volume]
+                    return True
+        return False
+
+
+# ─────────────────────────────────────────────────────────────────
+#  MOTEUR DE TÉLÉCHARGEMENT (Thread séparé)
+# ─────────────────────────────────────────────────────────────────
+# Nombre maximal de téléchargements simultanés (taille du pool de workers)
+MAX_CONCURRENT_DOWNLOADS = 3
+# Nombre maximal de téléchargements simultanés vers une même plateforme
+MAX_DOWNLOADS_PER_HOST = 2
+# Intervalle minimal (s) entre deux mises à jour de progression d'un élément
+PROGRESS_INTERVAL = 0.25
+# Entrées de playlist publiées au plus par événement "children_found"
+PLAYLIST_BATCH = 50
+# Taille du pool de post-traitement (conversions ffmpeg, liées au CPU)
+POSTPROCESS_WORKERS = os.cpu_count() or 2
+
+
+# Codes couleurs ANSI du terminal (chaînes de vitesse / ETA de yt-dlp)
+_ANSI_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+
+class DownloadEngine:
+    """Gère les téléchargements en arrière-plan via yt-dlp.
+
+    Les éléments sont placés dans une file à priorité et consommés par un
+    pool fixe de workers : au plus `max_workers` sessions yt-dlp tournent
+    en même temps, quel que soit le nombre d'URLs lancées.
+
+    Par plateforme (voir `host_key`), au plus `per_host_limit` éléments sont
+    traités simultanément ; les suivants sont mis de côté et remis en file dès
+    qu'une place se libère, pour laisser les workers servir les autres hôtes.
+    `requests_per_second` limite les démarrages par hôte et `bytes_per_second`
+    le débit global (None = illimité).
+
+    La progression est regroupée : au plus une mise à jour en attente par
+    élément (espacées d'au moins `progress_interval` s) et un seul événement
+    "progress_batch" par lot ; l'UI récupère le lot via `drain_progress()`.
+
+    Une playlist ou une chaîne n'est pas téléchargée d'un bloc : ses entrées
+    sont découvertes page par page et publiées par lots (événement
+    "children_found", clé `children`) ; c'est à l'UI de les ajouter à sa file
+    et de les placer dans le moteur.
+
+    Les conversions (ffmpeg) ne bloquent pas les workers réseau : un fichier
+    téléchargé est confié à un second pool, dimensionné sur le nombre de
+    cœurs (`post_workers`), pendant que le worker passe à l'élément suivant.
+    `stage_stats()` expose la file et l'occupation de chaque étage.
+
+    Un format retenu qui est un fichier HTTP unique acceptant les requêtes
+    Range est téléchargé en `segments_per_item` connexions parallèles (voir
+    SegmentedDownload), dans la limite globale de `max_connections` ; les
+    formats fragmentés (DASH/HLS) utilisent le même nombre de fragments
+    simultanés via yt-dlp.
+
+    Un échec transitoire (réseau, 5xx) ou une URL de format expirée est
+    réessayé jusqu'à `max_retries` fois après une attente exponentielle (voir
+    `classify_error` et `retry_delay`) ; l'élément repasse en file sans
+    occuper de worker pendant l'attente. Les infos extraites sont gardées
+    pour l'essai suivant, sauf si les URLs ont expiré, et le `.part` (ou les
+    fragments déjà reçus) est repris. Les erreurs d'authentification, de
+    géo-blocage ou permanentes échouent aussitôt.
+
+    Avec un `download_index` (DownloadIndex), une vidéo déjà téléchargée dans
+    le même format (même `video_key` : youtu.be, &t=…, hôte mobile…) n'est
+    pas retéléchargée : le fichier existant est lié (lien dur) dans le dossier
+    de sortie, sans requête réseau. Un doublon d'un élément en cours attend
+    la fin de celui-ci. Un fichier terminé identique à un fichier indexé est
+    remplacé par un lien dur vers ce dernier.
+
+    Avec un `disk_budget` (DiskBudget), chaque élément réserve avant son
+    transfert la taille annoncée du format retenu sur le volume de son
+    dossier de sortie. Un élément qui ne tient pas est mis de côté (sans
+    occuper de worker, infos extraites conservées) et remis en file à la fin
+    d'un autre élément du même volume, plutôt que de remplir le disque et
+    faire échouer tous les téléchargements en cours.
+
+    `metrics` (EngineMetrics) chronomètre chaque étape des éléments ; voir
+    `metrics_snapshot()` et `metrics_prometheus()`."""
+
+    _STOP = float("-inf")  # priorité du signal de fin (passe devant tout)
+
+    def __init__(self, ui_queue: queue.Queue,
+                 max_workers: int = MAX_CONCURRENT_DOWNLOADS,
+                 per_host_limit: int = MAX_DOWNLOADS_PER_HOST,
+                 requests_per_second: float = None,
+                 bytes_per_second: float = None,
+                 progress_interval: float = PROGRESS_INTERVAL,
+                 info_cache: "InfoCache" = None,
+                 post_workers: int = POSTPROCESS_WORKERS,
+                 segments_per_item: int = SEGMENTS_PER_ITEM,
+                 max_connections: int = MAX_CONNECTIONS,
+                 max_retries: int = MAX_RETRIES,
+                 download_index: "DownloadIndex" = None,
+                 disk_budget: "DiskBudget" = None):
+        self._ui_queue   = ui_queue  # Communication vers l'UI
+        self._info_cache = info_cache  # métadonnées déjà extraites (optionnel)
+        self._active     = True
+        self._cancel_flags = {}  # item -> threading.Event()
+        # Nouvelles tentatives
+        self._max_retries = max(0, int(max_retries))
+        self._attempts    = {}  # item -> essais déjà échoués
+        self._retry_info  = {}  # item -> infos extraites, réutilisées à l'essai suivant
+        # Dédoublonnage : (video_key, format) en cours et doublons en attente
+        self._download_index = download_index
+        self._dedup_lock    = threading.Lock()
+        self._inflight      = {}  # clé -> élément en cours
+        self._inflight_keys = {}  # élément en cours -> clé
+        self._dup_waiting   = collections.defaultdict(list)  # clé -> doublons
+        # Réservations d'espace disque (éléments mis de côté faute de place)
+        self._disk_budget = disk_budget
+        self._work_queue = queue.PriorityQueue()  # (priorité, n° d'ordre, item)
+        self._seq        = itertools.count()      # départage FIFO à priorité égale
+        # Limites par hôte
+        self._per_host_limit = max(1, int(per_host_limit))
+        self._host_lock   = threading.Lock()
+        self._host_active = collections.Counter()            # hôte -> nb en cours
+        self._deferred    = collections.defaultdict(collections.deque)  # hôte -> entrées
+        self._requests_per_second = requests_per_second
+        self._host_buckets = {}                              # hôte -> TokenBucket
+        self._byte_bucket = (TokenBucket(bytes_per_second) if bytes_per_second
+                             else None)
+        # Regroupement des événements de progression
+        self._progress_interval = progress_interval
+        self._progress_lock  = threading.Lock()
+        self._progress_dirty = {}  # item -> None (dict ordonné = ensemble)
+        self._progress_last  = {}  # item -> instant du dernier envoi
+        # Téléchargement segmenté : connexions par élément et limite globale
+        self._segments = max(1, int(segments_per_item))
+        self._connection_slots = threading.BoundedSemaphore(max(1, int(max_connections)))
+        self.metrics = EngineMetrics()
+        # Occupation des étages ("download", "postprocess")
+        self._stage_lock = threading.Lock()
+        self._stage_busy = collections.Counter()  # étage -> éléments en cours
+        self._stage_time = collections.Counter()  # étage -> secondes occupées
+        # Étage de post-traitement : (item, info, post-traitements)
+        self._post_queue   = queue.Queue()
+        self._post_workers = [threading.Thread(target=self._post_loop, daemon=True)
+                              for _ in range(max(1, int(post_workers)))]
+        for worker in self._post_workers:
+            worker.start()
+        self._workers_lock = threading.Lock()
+        self._workers    = []
+        self._max_workers = 0
+        self.set_max_workers(max_workers)
+
+    # ── Pool de workers ──
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def set_max_workers(self, count: int):
+        """Ajuste la limite globale de concurrence (agrandit ou réduit le pool)."""
+        count = max(1, int(count))
+        with self._workers_lock:
+            delta = count - self._max_workers
+            self._max_workers = count
+            for _ in range(delta):
+                worker = threading.Thread(target=self._worker_loop, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        # Réduction : un signal de fin par worker en trop ; chacun termine
+        # d'abord le téléchargement en cours avant de le consommer.
+        for _ in range(-delta):
+            self._work_queue.put((self._STOP, next(self._seq), None))
+
+    def _worker_loop(self):
+        try:
+            while True:
+                entry = self._work_queue.get()
+                item = entry[2]
+                if item is None:  # signal de fin
+                    break
+                host = host_key(item.url)
+                if not self._acquire_host(host, entry):
+                    continue  # hôte saturé : l'élément attend une place
+                try:
+                    with self._in_stage("download"):
+                        self._process(item)
+                finally:
+                    self._release_host(host)
+        finally:
+            with self._workers_lock:
+                self._workers.remove(threading.current_thread())
+
+    def _post_loop(self):
+        while True:
+            job = self._post_queue.get()
+            if job is None:  # signal de fin
+                break
+            with self._in_stage("postprocess"):
+                self._postprocess(*job)
+
+    # ── Statistiques des étages ──
+    @contextlib.contextmanager
+    def _in_stage(self, stage: str):
+        start = time.monotonic()
+        with self._stage_lock:
+            self._stage_busy[stage] += 1
+        try:
+            yield
+        finally:
+            with self._stage_lock:
+                self._stage_busy[stage] -= 1
+                self._stage_time[stage] += time.monotonic() - start
+
+    def stage_stats(self) -> dict:
+        """Par étage : workers, éléments en cours, éléments en file et temps
+        d'occupation cumulé (s). Occupation instantanée = busy / workers."""
+        with self._stage_lock:
+            busy, spent = dict(self._stage_busy), dict(self._stage_time)
+        queued = {"download": self.pending_count(),
+                  "postprocess": self._post_queue.qsize()}
+        workers = {"download": self._max_workers,
+                   "postprocess": len(self._post_workers)}
+        return {stage: {"workers":      workers[stage],
+                        "busy":         busy.get(stage, 0),
+                        "queued":       queued[stage],
+                        "busy_seconds": round(spent.get(stage, 0.0), 1)}
+                for stage in ("download", "postprocess")}
+
+    # ── Limites par hôte ──
+    def _acquire_host(self, host: str, entry: tuple) -> bool:
+        with self._host_lock:
+            if self._host_active[host] < self._per_host_limit:
+                self._host_active[host] += 1
+                return True
+            self._deferred[host].append(entry)
+            return False
+
+    def _release_host(self, host: str):
+        with self._host_lock:
+            self._host_active[host] -= 1
+            if self._host_active[host] <= 0:
+                del self._host_active[host]
+            waiting = self._deferred.get(host)
+            if waiting:
+                self._work_queue.put(waiting.popleft())
+                if not waiting:
+                    del self._deferred[host]
+
+    def _host_bucket(self, host: str):
+        if not self._requests_per_second:
+            return None
+        with self._host_lock:
+            bucket = self._host_buckets.get(host)
+            if bucket is None:
+                bucket = self._host_buckets[host] = TokenBucket(
+                    self._requests_per_second)
+            return bucket
+
+    # ── API publique ──
+    def enqueue(self, item: DownloadItem, priority: int = 0):
+        """Place l'élément dans la file (priorité basse = servi en premier)."""
+        if not self._active:
+            return
+        self._cancel_flags[item] = threading.Event()
+        item.status = DownloadItem.STATUS_QUEUED
+        self.metrics.enqueued(item)
+        self._work_queue.put((priority, next(self._seq), item))
+        self._notify("enqueued", item)
+
+    def is_scheduled(self, item: DownloadItem) -> bool:
+        """Vrai si l'élément est en file ou en cours de traitement."""
+        return item in self._cancel_flags
+
+    def pending_count(self) -> int:
+        with self._host_lock:
+            deferred = sum(len(d) for d in self._deferred.values())
+        return self._work_queue.qsize() + deferred
+
+    def cancel_item(self, item: DownloadItem):
+        flag = self._cancel_flags.get(item)
+        if flag is None:
+            return
+        flag.set()
+        # Mis de côté faute d'espace : un worker constatera l'annulation
+        if self._disk_budget is not None and self._disk_budget.unhold(item):
+            self._work_queue.put((0, next(self._seq), item))
+
+    def cancel_all(self):
+        for item in list(self._cancel_flags):
+            self.cancel_item(item)
+
+    def stop(self):
+        """Annule tout et arrête les workers (les éléments en file sont abandonnés)."""
+        self.cancel_all()
+        self._active = False
+        with self._workers_lock:
+            count = len(self._workers)
+        for _ in range(count):
+            self._work_queue.put((self._STOP, next(self._seq), None))  # signal de fin
+        for _ in self._post_workers:
+            self._post_queue.put(None)
+
+    def metrics_snapshot(self) -> dict:
+        return self.metrics.snapshot(self.stage_stats())
+
+    def metrics_prometheus(self) -> str:
+        return self.metrics.prometheus(self.stage_stats())
+
+    def _notify(self, event: str, item: DownloadItem, **kwargs):
+        if event in ("done", "error", "cancelled"):
+            self.metrics.finished(item, event)
+            self._release_duplicates(item)
+            self._release_disk(item)
+        self._ui_queue.put({"event": event, "item": item, **kwargs})
+
+    def _notify_progress(self, item: DownloadItem, force: bool = False):
+        """Marque l'élément comme à rafraîchir, sans inonder la file UI."""
+        now = time.monotonic()
+        with self._progress_lock:
+            if item in self._progress_dirty:
+                return  # une mise à jour est déjà en attente
+            if (not force and now - self._progress_last.get(item, 0.0)
+                    < self._progress_interval):
+                return
+            self._progress_last[item] = now
+            first = not self._progress_dirty
+            self._progress_dirty[item] = None
+        if first:
+            self._ui_queue.put({"event": "progress_batch"})
+
+    def drain_progress(self) -> list:
+        """Retourne (et vide) les éléments dont la progression a changé."""
+        with self._progress_lock:
+            items = list(self._progress_dirty)
+            self._progress_dirty.clear()
+        return items
+
+    def _clean_ansi(self, text: str) -> str:
+        """Supprime les codes couleurs ANSI du terminal renvoyés par yt-dlp."""
+        if not text: return ""
+        if "\x1b" not in text:
+            return text  # cas courant : rien à nettoyer
+        return _ANSI_RE.sub('', text)
+
+    def _handle_progress(self, item: DownloadItem, d: dict,
+                         cancel_flag=None, transferred=None):
+        """Hook de progression yt-dlp (appelé à chaque bloc reçu)."""
+        if cancel_flag and cancel_flag.is_set():
+            raise yt_dlp.utils.DownloadError("Téléchargement annulé par l'utilisateur.")
+        if d["status"] == "downloading":
+            if item.status != DownloadItem.STATUS_DOWNLOADING:
+                item.status = DownloadItem.STATUS_DOWNLOADING
+                self._notify("status_change", item)
+            # Calcul de la progression
+            total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+            downloaded = d.get("downloaded_bytes", 0)
+            if transferred is not None:
+                last = transferred["bytes"]
+                # Nouveau fichier (vidéo puis audio) : le compteur repart de 0
+                delta = downloaded - last if downloaded >= last else downloaded
+                transferred["bytes"] = downloaded
+                if delta > 0:
+                    self.metrics.add_bytes(item, delta)
+                    # Limitation du débit global : bloquer ce worker rembourse la dette
+                    if self._byte_bucket is not None:
+                        self._byte_bucket.consume(delta, cancel_flag)
+            item.bytes_done  = downloaded
+            item.bytes_total = total
+            item.progress    = (downloaded / total) * 100 if total > 0 else 0.0
+            # Valeurs brutes : le texte n'est formaté qu'à l'affichage
+            item.speed = d.get("speed") or 0.0
+            item.eta   = d.get("eta")
+            self._notify_progress(item)
+        elif d["status"] == "finished":
+            item.progress  = 100.0
+            item.filepath  = d.get("filename", "")
+            self._notify_progress(item, force=True)
+
+    def _extract(self, ydl, item: DownloadItem, cancel_flag=None) -> dict:
+        """Extraction unique (sans traitement des formats) : la page, le
+        lecteur JS et les manifestes ne sont résolus qu'une fois."""
+        bucket = self._host_bucket(host_key(item.url))
+        if bucket is not None and not bucket.consume(1, cancel_flag):
+            raise yt_dlp.utils.DownloadError("Téléchargement annulé par l'utilisateur.")
+        with self.metrics.timed(item, "extract"):
+            info = ydl.extract_info(item.url, download=False, process=False)
+        # Redirections (ex. chaîne → onglet Vidéos) suivies dès maintenant
+        # pour reconnaître une playlist avant tout traitement
+        for _ in range(3):
+            if info.get("_type") != "url":
+                break
+            info = ydl.extract_info(info["url"], download=False, process=False,
+                                    ie_key=info.get("ie_key"))
+        if self._info_cache is not None and info.get("_type", "video") == "video":
+            self._info_cache.put(item.url,
+                                 ydl.sanitize_info(info, remove_private_keys=True))
+        return info
+
+    def _expand_playlist(self, ydl, item: DownloadItem, info: dict,
+                         cancel_flag=None) -> int:
+        """Parcourt les entrées d'une playlist au fil de la pagination et les
+        publie par lots : les premières sont téléchargées pendant que les pages
+        suivantes sont encore résolues. Retourne le nombre d'entrées."""
+        batch, count = [], 0
+        last = time.monotonic()
+        entries = yt_dlp.utils.PlaylistEntries(ydl, info)
+        for _, entry in entries.get_requested_items():
+            if cancel_flag and cancel_flag.is_set():
+                break
+            url = entry and (entry.get("webpage_url") or entry.get("url"))
+            if not url or not url.startswith(("http://", "https://")):
+                continue  # entrée indisponible ou simple identifiant
+            child = DownloadItem(url, fmt=item.fmt, output_dir=item.output_dir)
+            if entry.get("title"):
+                child.title = entry["title"][:60]
+            batch.append(child)
+            count += 1
+            now = time.monotonic()
+            # La première entrée part seule : le premier téléchargement
+            # n'attend pas le remplissage d'un lot
+            if (count == 1 or len(batch) >= PLAYLIST_BATCH
+                    or now - last >= self._progress_interval):
+                self._notify("children_found", item, children=batch)
+                batch, last = [], now
+                item.note = f"{count} élément(s)"
+                self._notify_progress(item)
+        if batch:
+            self._notify("children_found", item, children=batch)
+        return count
+
+    def _download(self, ydl, item: DownloadItem, info: dict, cancel_flag=None,
+                  transferred=None) -> dict:
+        """Télécharge l'élément à partir des infos extraites : en segments
+        parallèles si possible, sinon par yt-dlp. Retourne l'info traitée, ou
+        None si l'élément est mis de côté faute d'espace disque."""
+        budget = self._disk_budget
+        if ((self._segments > 1 or budget is not None)
+                and info.get("_type", "video") == "video"):
+            # Sélection du format seule (sur une copie : l'info reste
+            # utilisable telle quelle pour un nouvel essai)
+            with self.metrics.timed(item, "format_selection"):
+                selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+            size = estimate_download_size(selected) if budget is not None else 0
+            if size and not budget.reserve(item, item.output_dir, size,
+                                           lambda i: self._hold_for_disk(i, info)):
+                return None
+            # Taille annoncée sous le seuil : ni sonde Range, ni segments
+            announced = selected.get("filesize") or selected.get("filesize_approx")
+            if (self._segments > 1 and not selected.get("requested_formats")
+                    and selected.get("protocol") in ("http", "https")
+                    and not (announced and announced < SEGMENT_MIN_SIZE)):
+                headers = selected.get("http_headers") or {}
+                path = ydl.prepare_filename(selected)
+                if os.path.exists(path):
+                    item.filepath = selected["filepath"] = path  # déjà téléchargé
+                    return selected
+                total = SegmentedDownload.probe_size(ydl, selected["url"], headers)
+                if total and total >= SEGMENT_MIN_SIZE:
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    start = time.monotonic()
+                    segmented = SegmentedDownload(
+                        ydl, selected["url"], headers, path, self._segments,
+                        self._connection_slots, cancel_flag,
+                        lambda d: self._handle_progress(item, d, cancel_flag,
+                                                        transferred),
+                        on_allocated=(functools.partial(budget.allocated, item)
+                                      if budget is not None else None),
+                    )
+                    try:
+                        segmented.run(total)
+                    except OSError as exc:
+                        # Préallocation refusée pour une autre raison qu'un
+                        # disque plein : la réservation ne couvre plus rien
+                        if not segmented.allocated and exc.errno != errno.ENOSPC:
+                            self._release_disk(item)
+                        raise
+                    self.metrics.transferred(item, time.monotonic() - start)
+                    selected["filepath"] = path
+                    return selected
+            # Format déjà choisi : téléchargé tel quel, sans nouvelle
+            # sélection (comme la boucle de process_video_result)
+            start = time.monotonic()
+            downloaded = dict(selected)
+            ydl.process_info(downloaded)
+            selected["requested_downloads"] = [downloaded]
+            result = ydl.run_all_pps("after_video", selected)
+            self.metrics.transferred(item, time.monotonic() - start)
+            return result
+        start = time.monotonic()
+        result = ydl.process_ie_result(info, download=True)
+        self.metrics.transferred(item, time.monotonic() - start)
+        return result
+
+    def _process(self, item: DownloadItem):
+        self.metrics.dequeued(item)
+        cancel_flag = self._cancel_flags.get(item)
+        if not self._active or (cancel_flag and cancel_flag.is_set()):
+            # Annulé (ou moteur arrêté) avant qu'un worker ne le prenne
+            self._cancel_flags.pop(item, None)
+            self._attempts.pop(item, None)
+            self._retry_info.pop(item, None)
+            item.status = DownloadItem.STATUS_CANCELLED
+            self._notify("cancelled", item)
+            return
+        if not YT_DLP_AVAILABLE:
+            self._cancel_flags.pop(item, None)
+            item.status    = DownloadItem.STATUS_ERROR
+            item.error_msg = "yt-dlp non installé. Lancez : pip install yt-dlp"
+            self._notify("error", item)
+            return
+
+        if self._download_index is not None and self._claim(item):
+            return  # déjà téléchargé, ou doublon d'un élément en cours
+
+        item.status = DownloadItem.STATUS_FETCHING
+        self._notify("status_change", item)
+
+        fmt_opts = fmt_key_to_ytdlp(item.fmt)
+        # Conversions sorties du worker réseau : confiées à l'étage de
+        # post-traitement une fois le fichier téléchargé
+        postprocessors = fmt_opts.pop("postprocessors", [])
+        handed_off = retrying = held = False
+        transferred = {"bytes": 0}  # dernier compteur vu (débit global)
+        info = None
+
+        def progress_hook(d):
+            self._handle_progress(item, d, cancel_flag, transferred)
+
+        def postprocessor_hook(d):
+            self.metrics.postprocessor_event(item, d)
+
+        ydl_opts = {
+            "outtmpl":        os.path.join(item.output_dir, "%(title)s.%(ext)s"),
+            "progress_hooks": [progress_hook],
+            "postprocessor_hooks": [postprocessor_hook],
+            "quiet":          True,
+            "no_warnings":    True,
+            "noprogress":     True,  # progression déjà relayée par le hook
+            "continuedl":     True,  # reprise depuis un .part existant
+            # Fragment manquant = échec (puis nouvel essai qui reprend les
+            # fragments reçus) plutôt qu'un fichier silencieusement tronqué
+            "skip_unavailable_fragments": False,
+            "lazy_playlist":  True,  # entrées lues page par page
+            "concurrent_fragment_downloads": self._segments,  # DASH / HLS
+            **fmt_opts,
+        }
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                # Infos de l'essai précédent, sinon cache : un élément déjà
+                # résolu ne repasse pas par le réseau
+                info = self._retry_info.pop(item, None)
+                if info is None and self._info_cache is not None:
+                    info = self._info_cache.get(item.url)
+                    self.metrics.count("info_cache_hit" if info is not None
+                                       else "info_cache_miss")
+                if info is None:
+                    info = self._extract(ydl, item, cancel_flag)
+                item.title = (info.get("title") or item.url)[:60]
+                self._notify("info_fetched", item)
+                if info.get("_type") == "playlist":
+                    count = self._expand_playlist(ydl, item, info, cancel_flag)
+                    item.note  = ""
+                    item.title = f"{count} × {info.get('title') or item.url}"[:60]
+                else:
+                    # Téléchargement réel à partir des infos déjà extraites
+                    result = self._download(ydl, item, info, cancel_flag,
+                                            transferred)
+                    if result is None:
+                        held = True  # repassera en file (voir _release_disk)
+                    else:
+                        downloaded = (result.get("requested_downloads") or [result])[-1]
+                        # Fichier final (fusionné) : le hook n'a vu que le
+                        # dernier flux terminé (.fNNN, supprimé après fusion)
+                        item.filepath = downloaded.get("filepath") or item.filepath
+                        if postprocessors and not (cancel_flag and cancel_flag.is_set()):
+                            item.status = DownloadItem.STATUS_POSTPROCESSING
+                            self._notify("status_change", item)
+                            self._post_queue.put((item, downloaded, postprocessors))
+                            handed_off = True
+
+            if handed_off or held:
+                return  # fin signalée par le post-traitement, ou élément remis en file
+            if cancel_flag and cancel_flag.is_set():
+                item.status = DownloadItem.STATUS_CANCELLED
+                self._notify("cancelled", item)
+            else:
+                self._index_file(item)
+                item.status   = DownloadItem.STATUS_DONE
+                item.progress = 100.0
+                self._notify("done", item)
+
+        except Exception as exc:
+            if cancel_flag and cancel_flag.is_set():
+                item.status = DownloadItem.STATUS_CANCELLED
+                self._notify("cancelled", item)
+            else:
+                retrying = self._fail(item, exc, info)
+        finally:
+            if not (handed_off or retrying or held):
+                self._cancel_flags.pop(item, None)
+                self._attempts.pop(item, None)
+            with self._progress_lock:
+                self._progress_last.pop(item, None)
+
+    # ── Dédoublonnage ──
+    def _claim(self, item: DownloadItem) -> bool:
+        """Réserve la clé (vidéo, format) de l'élément. Retourne True s'il
+        est déjà traité : fichier existant réutilisé, ou doublon mis en
+        attente de l'élément en cours."""
+        key = (video_key(item.url), item.fmt)
+        existing = self._download_index.find(*key)
+        if existing is not None:
+            self._reuse(item, existing)
+            return True
+        with self._dedup_lock:
+            owner = self._inflight.setdefault(key, item)
+            if owner is not item:
+                # Repris à la fin de l'autre : fichier lié s'il a réussi
+                self._dup_waiting[key].append(item)
+                return True
+            self._inflight_keys[item] = key
+        return False
+
+    def _reuse(self, item: DownloadItem, existing: str):
+        """Termine l'élément avec un fichier déjà téléchargé : lien dur dans
+        son dossier de sortie, sinon référence au fichier existant."""
+        target = os.path.join(item.output_dir, os.path.basename(existing))
+        if os.path.abspath(target) == os.path.abspath(existing):
+            self.metrics.count("dedup_skipped")
+        elif os.path.exists(target):
+            self.metrics.count("dedup_skipped")
+            existing = target  # déjà présent dans le dossier (copie, lien)
+        else:
+            try:
+                os.makedirs(item.output_dir, exist_ok=True)
+                os.link(existing, target)
+                self.metrics.count("dedup_linked")
+                existing = target
+            except OSError:
+                # Lien dur impossible (autre volume, FAT…)
+                self.metrics.count("dedup_skipped")
+        self._cancel_flags.pop(item, None)
+        item.title    = os.path.splitext(os.path.basename(existing))[0][:60]
+        item.filepath = existing
+        item.note     = "Déjà téléchargé"
+        item.status   = DownloadItem.STATUS_DONE
+        item.progress = 100.0
+        self._notify("done", item)
+
+    def _release_duplicates(self, item: DownloadItem):
+        """Élément terminé : remet ses doublons en file (ils retrouveront
+        son fichier dans l'index, ou le téléchargeront s'il a échoué)."""
+        with self._dedup_lock:
+            key = self._inflight_keys.pop(item, None)
+            if key is None:
+                return
+            del self._inflight[key]
+            waiting = self._dup_waiting.pop(key, [])
+        for dup in waiting:
+            self.metrics.enqueued(dup)
+            self._work_queue.put((0, next(self._seq), dup))
+
+    def _index_file(self, item: DownloadItem):
+        """Indexe le fichier terminé ; s'il est identique à un fichier déjà
+        indexé, il est remplacé par un lien dur vers celui-ci."""
+        if self._download_index is None or not os.path.isfile(item.filepath):
+            return
+        key = self._inflight_keys.get(item) or (video_key(item.url), item.fmt)
+        duplicate = self._download_index.add(*key, item.filepath)
+        if duplicate is None or os.path.samefile(duplicate, item.filepath):
+            return
+        tmp = item.filepath + ".link"
+        try:
+            os.link(duplicate, tmp)
+            os.replace(tmp, item.filepath)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            return
+        self.metrics.count("dedup_linked")
+        self.metrics.count("dedup_bytes_saved", os.path.getsize(item.filepath))
+
+    # ── Espace disque ──
+    def _hold_for_disk(self, item: DownloadItem, info: dict):
+        """Élément mis de côté par DiskBudget : il garde ses infos extraites
+        pour son prochain passage."""
+        self._retry_info[item] = info
+        self.metrics.count("disk_held")
+        item.status = DownloadItem.STATUS_QUEUED
+        item.note   = "En attente d'espace disque"
+        item.speed, item.eta = 0.0, None
+        self._notify("status_change", item)
+
+    def _release_disk(self, item: DownloadItem):
+        """Élément terminé : libère sa réservation et remet en file les
+        éléments mis de côté sur le même volume (ils réservent à nouveau)."""
+        if self._disk_budget is None:
+            return
+        for held in self._disk_budget.release(item):
+            held.note = ""
+            self.metrics.enqueued(held)
+            self._work_queue.put((0, next(self._seq), held))
+
+    # ── Nouvelles tentatives ──
+    def _fail(self, item: DownloadItem, exc: Exception, info: dict = None) -> bool:
+        """Classe l'échec : programme un nouvel essai (retourne True) ou
+        marque l'élément en erreur."""
+        kind = classify_error(exc)
+        self.metrics.count(f"errors_{kind}")
+        message = self._clean_ansi(str(exc))
+        attempt = self._attempts.get(item, 0) + 1
+        if (kind in (ERROR_TRANSIENT, ERROR_EXPIRED) and attempt <= self._max_retries
+                and self._active):
+            if kind == ERROR_EXPIRED:
+                # URLs signées périmées : l'essai suivant extrait à nouveau
+                if self._info_cache is not None:
+                    self._info_cache.invalidate(item.url)
+            elif info is not None and info.get("_type", "video") == "video":
+                self._retry_info[item] = info
+            self._attempts[item] = attempt
+            self.metrics.count("retries", item=item)
+            delay = retry_delay(attempt)
+            item.status = DownloadItem.STATUS_QUEUED
+            item.note   = f"Nouvel essai {attempt}/{self._max_retries} dans {delay:.0f} s"
+            item.speed, item.eta = 0.0, None
+            self._notify("status_change", item)
+            threading.Thread(target=self._retry_after, args=(item, delay),
+                             daemon=True).start()
+            return True
+        if kind in (ERROR_TRANSIENT, ERROR_EXPIRED) and attempt > 1:
+            message = f"Échec après {attempt} essais : {message}"
+        elif kind in ERROR_LABELS:
+            message = f"{ERROR_LABELS[kind]} : {message}"
+        item.status    = DownloadItem.STATUS_ERROR
+        item.error_msg = message[:120]
+        self._notify("error", item)
+        return False
+
+    def _retry_after(self, item: DownloadItem, delay: float):
+        """Remet l'élément en file après `delay` s (sans occuper de worker)."""
+        cancel_flag = self._cancel_flags.get(item)
+        if cancel_flag is not None and not cancel_flag.wait(delay) and self._active:
+            item.note = ""
+            self.metrics.enqueued(item)
+            self._work_queue.put((0, next(self._seq), item))
+            return
+        # Annulé pendant l'attente (ou moteur arrêté)
+        self._cancel_flags.pop(item, None)
+        self._attempts.pop(item, None)
+        self._retry_info.pop(item, None)
+        item.status = DownloadItem.STATUS_CANCELLED
+        item.note   = ""
+        self._notify("cancelled", item)
+
+    def _postprocess(self, item: DownloadItem, info: dict, postprocessors: list):
+        """Applique les post-traitements yt-dlp (ffmpeg) au fichier téléchargé.
+        Une conversion déjà lancée n'est pas interrompue par une annulation."""
+        cancel_flag = self._cancel_flags.get(item)
+        try:
+            if cancel_flag and cancel_flag.is_set():
+                raise yt_dlp.utils.DownloadError("Téléchargement annulé par l'utilisateur.")
+            params = {"quiet": True, "no_warnings": True}
+            with yt_dlp.YoutubeDL(params, auto_init=False) as ydl, \
+                    self.metrics.timed(item, "postprocess"):
+                for spec in postprocessors:
+                    options = {k: v for k, v in spec.items() if k not in ("key", "when")}
+                    pp = yt_dlp.postprocessor.get_postprocessor(spec["key"])(ydl, **options)
+                    info = ydl.run_pp(pp, info)
+            item.filepath = info.get("filepath") or item.filepath
+            self._index_file(item)
+            item.status   = DownloadItem.STATUS_DONE
+            item.progress = 100.0
+            self._notify("done", item)
+        except Exception as exc:
+            if cancel_flag and cancel_flag.is_set():
+                item.status = DownloadItem.STATUS_CANCELLED
+                self._notify("cancelled", item)
+            else:
+                item.status    = DownloadItem.STATUS_ERROR
+                item.error_msg = self._clean_ansi(str(exc))[:120]
+                self._notify("error", item)
+        finally:
+            self._cancel_flags.pop(item, None)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  CONCURRENCE ADAPTATIVE (AIMD)
+# ─────────────────────────────────────────────────────────────────
+ADAPTIVE_INTERVAL    = 1.0   # période d'échantillonnage du débit (s)
+ADAPTIVE_SETTLE      = 3     # périodes mesurées par niveau avant décision
+ADAPTIVE_MAX_WORKERS = 8     # plafond du nombre de workers
+ADAPTIVE_GAIN        = 0.05  # gain minimal de débit pour garder un worker ajouté
+ADAPTIVE_BACKOFF     = 0.75  # facteur de réduction multiplicative
+ADAPTIVE_DROP        = 0.25  # chute de débit total considérée comme congestion
+ADAPTIVE_HOLD        = 3     # décisions sans sondage après une saturation
+
+
+class AdaptiveConcurrency:
+    """Ajuste `max_workers` d'un DownloadEngine selon le débit agrégé (AIMD).
+
+    Le débit total (octets comptés par le hook de progression, voir
+    EngineMetrics) est moyenné sur `settle` périodes de `interval` s à
+    chaque niveau de concurrence — la première période après un changement,
+    occupée par la montée en charge, est ignorée — puis comparé au niveau
+    précédent :
+
+      - tous les workers occupés → +1 worker (augmentation additive) ;
+      - worker ajouté sans gain d'au moins `gain` → retour au niveau
+        précédent, puis `ADAPTIVE_HOLD` décisions sans sondage (lien saturé) ;
+      - tous les workers occupés et débit total en chute, ou débit par
+        élément sous `min_item_ratio` du meilleur observé → réduction
+        multiplicative (× `backoff`).
+
+    La décision (`step`) ne dépend que des mesures passées en argument."""
+
+    def __init__(self, engine: "DownloadEngine", min_workers: int = 1,
+                 max_workers: int = ADAPTIVE_MAX_WORKERS,
+                 interval: float = ADAPTIVE_INTERVAL, settle: int = ADAPTIVE_SETTLE,
+                 gain: float = ADAPTIVE_GAIN, backoff: float = ADAPTIVE_BACKOFF,
+                 min_item_ratio: float = 0.5):
+        self.engine = engine
+        self.min_workers = max(1, int(min_workers))
+        self.max_workers = max(self.min_workers, int(max_workers))
+        self.interval = interval
+        self.settle = max(1, int(settle))
+        self.gain = gain
+        self.backoff = backoff
+        self.min_item_ratio = min_item_ratio
+        self._prev_rate = None
+        self._best_item = 0.0   # meilleur débit par élément (décroît lentement)
+        self._probing = False   # la dernière décision était un ajout
+        self._hold = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="nexus-aimd",
+                                        daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        counters = self.engine.metrics.counters
+        last_bytes, last_time = counters.get("bytes_downloaded", 0), time.monotonic()
+        windows = 0
+        level_bytes = level_time = busy_sum = 0.0
+        while not self._stop.wait(self.interval):
+            now, total = time.monotonic(), counters.get("bytes_downloaded", 0)
+            windows += 1
+            if windows > 1:  # première période : montée en charge du niveau
+                level_bytes += total - last_bytes
+                level_time += now - last_time
+                busy_sum += self.engine.stage_stats()["download"]["busy"]
+            last_bytes, last_time = total, now
+            if windows <= self.settle:
+                continue
+            current = self.engine.max_workers
+            target = self.step(level_bytes / level_time, busy_sum / (windows - 1),
+                               current)
+            windows = 0
+            level_bytes = level_time = busy_sum = 0.0
+            if target != current:
+                self.engine.metrics.count("concurrency_increase" if target > current
+                                          else "concurrency_decrease")
+                self.engine.set_max_workers(target)
+
+    def step(self, rate: float, busy: float, current: int) -> int:
+        """Nombre de workers pour le niveau suivant, d'après le débit moyen
+        (octets/s) et le nombre moyen de workers occupés au niveau courant."""
+        if busy == 0 or rate <= 0:
+            # Rien ne transfère : pas de référence exploitable
+            self._prev_rate, self._probing = None, False
+            return current
+        saturated = busy > current - 0.5  # tous les workers ont du travail
+        per_item = rate / busy
+        self._best_item = max(per_item, self._best_item * 0.98)
+        prev, self._prev_rate = self._prev_rate, rate
+        probing, self._probing = self._probing, False
+        if prev is None:
+            return current
+        collapsed = per_item < self.min_item_ratio * self._best_item
+        if (saturated and current > self.min_workers
+                and (rate < prev * (1 - ADAPTIVE_DROP) or collapsed)):
+            self._hold = ADAPTIVE_HOLD
+            self._prev_rate = None  # nouvelle référence après la réduction
+            return max(self.min_workers, int(current * self.backoff))
+        if probing and rate < prev * (1 + self.gain):
+            self._hold = ADAPTIVE_HOLD  # lien saturé : on garde le niveau précédent
+            self._prev_rate = prev
+            return max(self.min_workers, current - 1)
+        if self._hold > 0:
+            self._hold -= 1
+            return current
+        if saturated and current < self.max_workers:
+            self._probing = True
+            return current + 1
+        return current
+
+
+# ─────────────────────────────────────────────────────────────────
+#  HISTORIQUE PERSISTANT
+# ─────────────────────────────────────────────────────────────────
+def app_data_dir() -> str:
+    """Dossier des données locales de l'application (créé si besoin)."""
+    base = (os.environ.get("APPDATA")
+            or os.path.join(os.path.expanduser("~"), ".local", "share"))
+    path = os.path.join(base, "NEXUS Downloader")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class HistoryStore:
+    """Historique des téléchargements persistant (SQLite).
+
+    Indexé par URL, statut et date de fin ; les lectures se font par pages
+    (pagination par clé sur l'id, décroissant) pour ne jamais charger tout
+    l'historique. Utilisable depuis plusieurs threads."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            url         TEXT NOT NULL,
+            title       TEXT,
+            status      TEXT NOT NULL,
+            fmt         TEXT,
+            filepath    TEXT,
+            error       TEXT,
+            finished_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_url      ON history(url);
+        CREATE INDEX IF NOT EXISTS idx_history_status   ON history(status, id);
+        CREATE INDEX IF NOT EXISTS idx_history_finished ON history(finished_at);
+    """
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        try:
+            self.path = path or os.path.join(app_data_dir(), "history.sqlite3")
+            self._db = self._open(self.path)
+        except (OSError, sqlite3.Error):
+            # Dossier non accessible : historique limité à la session
+            self.path = ":memory:"
+            self._db = self._open(self.path)
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(self.SCHEMA)
+        return db
+
+    def add(self, item: DownloadItem) -> int:
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO history (url, title, status, fmt, filepath, error,"
+                " finished_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (item.url, item.title, item.status.label, item.fmt, item.filepath,
+                 item.error_msg, time.time()))
+            return cur.lastrowid
+
+    @staticmethod
+    def _where(url=None, status=None, since=None, until=None, before_id=None):
+        clauses, params = [], []
+        for sql, value in (("url = ?", url), ("status = ?", status),
+                           ("finished_at >= ?", since),
+                           ("finished_at < ?", until), ("id < ?", before_id)):
+            if value is not None:
+                clauses.append(sql)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def page(self, before_id: int = None, limit: int = 50, url: str = None,
+             status: str = None, since: float = None,
+             until: float = None) -> list:
+        """Entrées les plus récentes d'abord, strictement avant `before_id`."""
+        where, params = self._where(url, status, since, until, before_id)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM history{where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, url: str = None, status: str = None,
+              since: float = None, until: float = None) -> int:
+        where, params = self._where(url, status, since, until)
+        with self._lock:
+            return self._db.execute(
+                f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM history")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  JOURNAL DE LA FILE (reprise après crash)
+# ─────────────────────────────────────────────────────────────────
+class QueueJournal:
+    """Journal d'écriture anticipée (JSONL) de l'état de la file.
+
+    Chaque changement d'état ajoute une ligne (« put » avec l'état complet de
+    l'élément, ou « del ») vidée immédiatement vers le système : un crash du
+    processus ne perd au plus que la ligne en cours d'écriture. Au démarrage,
+    `replay()` reconstruit l'état puis réécrit un journal compacté."""
+
+    COMPACT_MIN_OPS = 1000  # compaction quand le journal devient 4× trop long
+
+    def __init__(self, path: str = None):
+        self.path  = path or os.path.join(app_data_dir(), "queue.journal")
+        self._lock = threading.Lock()
+        self._live = {}    # item.id -> dernier état connu
+        self._ops  = 0     # lignes dans le fichier courant
+        self._file = None
+
+    def replay(self) -> list:
+        """Relit le journal et retourne l'état des éléments non retirés,
+        dans leur ordre d'ajout."""
+        entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # ligne tronquée par un crash
+                    if rec.get("op") == "del":
+                        entries.pop(rec.get("id"), None)
+                    elif rec.get("op") == "put":
+                        entries[rec["id"]] = rec
+        except OSError:
+            pass
+        with self._lock:
+            self._live = entries
+            self._compact()
+        return [dict(e) for e in entries.values()]
+
+    def record(self, item: DownloadItem):
+        self.record_many((item,))
+
+    def record_many(self, items):
+        """Enregistre plusieurs éléments en une seule écriture."""
+        entries = [self._entry(item) for item in items]
+        if not entries:
+            return
+        with self._lock:
+            for entry in entries:
+                self._live[entry["id"]] = entry
+            self._write(*entries)
+
+    @staticmethod
+    def _entry(item: DownloadItem) -> dict:
+        return {
+            "op":         "put",
+            "id":         item.id,
+            "url":        item.url,
+            "fmt":        item.fmt,
+            "output_dir": item.output_dir,
+            "status":     item.status.label,
+            "title":      item.title,
+            "filepath":   item.filepath,
+            "added_at":   item.added_at,
+        }
+
+    def remove(self, item: DownloadItem):
+        with self._lock:
+            if self._live.pop(item.id, None) is not None:
+                self._write({"op": "del", "id": item.id})
+
+    @staticmethod
+    def to_item(entry: dict) -> DownloadItem:
+        """Recrée un élément (en attente) à partir d'une entrée rejouée.
+        La reprise ne dépend que du chemin de sortie : yt-dlp y retrouve son
+        .part (continuedl), SegmentedDownload son .segpart et son fichier
+        d'état."""
+        item = DownloadItem(entry["url"], fmt=entry.get("fmt", "video_best"),
+                            output_dir=entry.get("output_dir", ""))
+        item.id    = entry["id"]
+        item.title = entry.get("title") or item.title
+        if isinstance(entry.get("added_at"), (int, float)):
+            item.added_at = entry["added_at"]  # (anciens journaux : texte HH:MM:SS)
+        return item
+
+    def _write(self, *recs: dict):
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(json.dumps(rec, ensure_ascii=False) + "\n"
+                                     for rec in recs))
+            self._file.flush()
+        except OSError:
+            return  # journal indisponible : la file fonctionne sans reprise
+        self._ops += len(recs)
+        if (self._ops > self.COMPACT_MIN_OPS
+                and self._ops > 4 * len(self._live)):
+            self._compact()
+
+    def _compact(self):
+        """Réécrit atomiquement le journal avec les seuls éléments vivants."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in self._live.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self._ops = len(self._live)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  CACHE DES MÉTADONNÉES (extract_info)
+# ─────────────────────────────────────────────────────────────────
+# Durée de vie maximale d'une entrée du cache (s)
+INFO_CACHE_TTL = 6 * 3600
+# Marge avant l'expiration des URLs de formats (temps de téléchargement)
+INFO_CACHE_EXPIRY_MARGIN = 15 * 60
+_EXPIRE_RE = re.compile(r"[/?&](?:expire|expires|Expires|exp)[=/](\d{10})\b")
+
+
+# Extracteurs (ie_key) essayés en premier pour les hôtes courants ; les
+# autres hôtes retiennent ceux qui les ont déjà reconnus
+_EXTRACTOR_HINTS = {
+    "youtube.com":       ("Youtube", "YoutubeTab"),
+    "m.youtube.com":     ("Youtube", "YoutubeTab"),
+    "music.youtube.com": ("Youtube", "YoutubeTab"),
+    "youtu.be":          ("Youtube", "YoutubeYtBe"),
+    "vimeo.com":         ("Vimeo",),
+    "player.vimeo.com":  ("Vimeo",),
+    "dailymotion.com":   ("Dailymotion",),
+    "soundcloud.com":    ("Soundcloud",),
+}
+_HOST_EXTRACTORS_MAX = 1024
+_host_extractors = {}  # hôte -> ie_key appris
+
+
+@functools.lru_cache(maxsize=1)
+def _extractor_classes() -> tuple:
+    from yt_dlp.extractor import gen_extractor_classes
+    return tuple(ie for ie in gen_extractor_classes() if ie.ie_key() != "Generic")
+
+
+@functools.lru_cache(maxsize=1)
+def _extractor_positions() -> dict:
+    return {ie.ie_key(): (pos, ie) for pos, ie in enumerate(_extractor_classes())}
+
+
+def _match_extractor(url: str, extractors):
+    """Premier extracteur de `extractors` qui reconnaît `url`, ou None."""
+    for ie in extractors:
+        try:
+            if ie.suitable(url):
+                return ie
+        except Exception:
+            continue
+    return None
+
+
+def preload_yt_dlp() -> bool:
+    """Importe yt-dlp et prépare la liste des extracteurs, pour que ni le
+    premier téléchargement ni le premier import d'URLs n'en paient le coût.
+    Prévu pour un thread de fond ; faux si yt-dlp ne peut pas être importé."""
+    try:
+        yt_dlp.YoutubeDL
+        _extractor_classes()
+    except ImportError:
+        return False
+    return True
+
+
+def video_key(url: str) -> str:
+    """Clé canonique « extracteur:id » d'une URL, sans requête réseau
+    (youtu.be/X et youtube.com/watch?v=X&t=3 donnent « Youtube:X »). La clé
+    suit l'extracteur que yt-dlp retiendra : watch?v=X&list=P est traitée
+    comme la playlist P (« YoutubeTab:P »). Repli sur l'URL normalisée si
+    aucun extracteur ne la reconnaît. Mise en cache par URL normalisée."""
+    return _video_key(normalize_url(url))
+
+
+@functools.lru_cache(maxsize=4096)
+def _video_key(url: str) -> str:
+    if not YT_DLP_AVAILABLE:
+        return url
+    # Extracteurs probables d'abord (dans l'ordre de yt-dlp), puis tous
+    host = urlsplit(url).hostname or ""
+    positions = _extractor_positions()
+    hinted = sorted(positions[key] for key in
+                    _EXTRACTOR_HINTS.get(host) or _host_extractors.get(host, ())
+                    if key in positions)
+    ie = _match_extractor(url, (cls for _, cls in hinted))
+    if ie is None:
+        ie = _match_extractor(url, _extractor_classes())
+        if ie is None:
+            return url
+        known = _host_extractors.get(host, ())
+        if host not in _EXTRACTOR_HINTS and (
+                known or len(_host_extractors) < _HOST_EXTRACTORS_MAX):
+            _host_extractors[host] = (*known, ie.ie_key())
+    try:
+        video_id = ie.get_temp_id(url)
+    except Exception:
+        video_id = None
+    return f"{ie.ie_key()}:{video_id}" if video_id else url
+
+
+def format_urls_expiry(info: dict):
+    """Instant d'expiration le plus proche des URLs signées des formats
+    (paramètre expire=… des CDN), ou None si aucune n'est datée."""
+    soonest = None
+    for fmt in info.get("formats") or [info]:
+        for field in ("url", "manifest_url", "fragment_base_url"):
+            m = _EXPIRE_RE.search(fmt.get(field) or "")
+            if m:
+                expiry = int(m.group(1))
+                soonest = expiry if soonest is None else min(soonest, expiry)
+    return soonest
+
+
+class InfoCache:
+    """Cache des dictionnaires d'infos extraits, en mémoire (LRU) et sur
+    disque (un fichier JSON par vidéo, évincés du plus ancien accès).
+
+    Les entrées sont indexées par `video_key` et expirent après `ttl` ou
+    avant l'expiration des URLs signées de leurs formats."""
+
+    def __init__(self, directory: str = None, ttl: float = INFO_CACHE_TTL,
+                 max_memory: int = 128, max_disk: int = 2000):
+        self.ttl        = ttl
+        self.max_memory = max_memory
+        self.max_disk   = max_disk
+        self._lock   = threading.Lock()
+        self._memory = collections.OrderedDict()  # clé -> (expire_à, json)
+        try:
+            self.directory = directory or os.path.join(app_data_dir(), "info_cache")
+            os.makedirs(self.directory, exist_ok=True)
+            self._disk_count = sum(1 for name in os.listdir(self.directory)
+                                   if name.endswith(".json"))
+        except OSError:
+            self.directory = None  # cache disque indisponible : mémoire seule
+            self._disk_count = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory,
+                            hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str):
+        """Infos en cache pour cette URL (copie modifiable) ou None."""
+        key, now = video_key(url), time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return json.loads(entry[1])
+                del self._memory[key]
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("key") != key or record.get("expires_at", 0) <= now:
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)  # ordre LRU sur disque
+        except OSError:
+            pass
+        self._remember(key, record["expires_at"], json.dumps(record["info"]))
+        return record["info"]
+
+    def put(self, url: str, info: dict):
+        """Enregistre des infos déjà passées par YoutubeDL.sanitize_info."""
+        key, now = video_key(url), time.time()
+        expires_at = now + self.ttl
+        expiry = format_urls_expiry(info)
+        if expiry is not None:
+            expires_at = min(expires_at, expiry - INFO_CACHE_EXPIRY_MARGIN)
+        if expires_at <= now:
+            return
+        text = json.dumps(info)
+        self._remember(key, expires_at, text)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp = path + ".tmp"
+        try:
+            existed = os.path.exists(path)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(f'{{"key": {json.dumps(key)}, '
+                        f'"expires_at": {expires_at}, "info": {text}}}')
+            os.replace(tmp, path)
+        except OSError:
+            return
+        if not existed:
+            with self._lock:
+                self._disk_count += 1
+                evict = self._disk_count > self.max_disk
+            if evict:
+                self._evict_disk()
+
+    def invalidate(self, url: str):
+        key = video_key(url)
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.directory is not None:
+            self._unlink(self._path(key))
+
+    def _remember(self, key: str, expires_at: float, text: str):
+        with self._lock:
+            self._memory[key] = (expires_at, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+
+    def _unlink(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_count -= 1
+
+    def _evict_disk(self):
+        """Retire les 10 % d'entrées disque les moins récemment utilisées."""
+        try:
+            entries = [e for e in os.scandir(self.directory)
+                       if e.name.endswith(".json")]
+        except OSError:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        excess = len(entries) - self.max_disk + max(1, self.max_disk // 10)
+        for entry in entries[:max(0, excess)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_count = len(entries) - max(0, excess)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  INDEX DES FICHIERS TÉLÉCHARGÉS (dédoublonnage)
+# ─────────────────────────────────────────────────────────────────
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """Empreinte SHA-256 (hexadécimale) du contenu d'un fichier."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DownloadIndex:
+    """Index des fichiers déjà téléchargés (SQLite) : clé vidéo
+    (`video_key`), format, chemin, taille et empreinte SHA-256.
+
+    `find` retrouve sans requête réseau un fichier encore présent pour une
+    vidéo et un format. `add` enregistre un fichier terminé et signale un
+    fichier identique déjà indexé : comparaison des tailles d'abord, puis des
+    empreintes, calculées seulement quand les tailles coïncident. Les entrées
+    dont le fichier a disparu ou changé de taille sont purgées au passage.
+    Utilisable depuis plusieurs threads."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path     TEXT PRIMARY KEY,
+            key      TEXT NOT NULL,
+            fmt      TEXT NOT NULL,
+            size     INTEGER NOT NULL,
+            sha256   TEXT,
+            added_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_key  ON files(key, fmt);
+        CREATE INDEX IF NOT EXISTS idx_files_size ON files(size);
+    """
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        # Ajouts sérialisés : deux fichiers identiques terminés en même
+        # temps doivent se voir l'un l'autre
+        self._add_lock = threading.Lock()
+        try:
+            self.path = path or os.path.join(app_data_dir(), "files.sqlite3")
+            self._db = self._open(self.path)
+        except (OSError, sqlite3.Error):
+            # Dossier non accessible : index limité à la session
+            self.path = ":memory:"
+            self._db = self._open(self.path)
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(self.SCHEMA)
+        return db
+
+    def _valid(self, row) -> bool:
+        """Vrai si le fichier de l'entrée existe encore avec la même taille
+        (sinon l'entrée est supprimée)."""
+        try:
+            if os.path.getsize(row["path"]) == row["size"]:
+                return True
+        except OSError:
+            pass
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM files WHERE path = ?", (row["path"],))
+        return False
+
+    def find(self, key: str, fmt: str):
+        """Chemin d'un fichier présent pour cette vidéo et ce format, ou None."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, size FROM files WHERE key = ? AND fmt = ?"
+                " ORDER BY added_at DESC", (key, fmt)).fetchall()
+        for row in rows:
+            if self._valid(row):
+                return row["path"]
+        return None
+
+    def add(self, key: str, fmt: str, path: str):
+        """Indexe un fichier terminé ; retourne le chemin d'un fichier déjà
+        indexé au contenu identique, ou None."""
+        with self._add_lock:
+            return self._add(key, fmt, path)
+
+    def _add(self, key: str, fmt: str, path: str):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, size, sha256 FROM files WHERE size = ? AND path != ?",
+                (size, path)).fetchall()
+        digest = duplicate = None
+        for row in rows:
+            if not self._valid(row):
+                continue
+            try:
+                other = row["sha256"] or self._store_digest(row["path"])
+                digest = digest or file_digest(path)
+            except OSError:
+                continue
+            if other == digest:
+                duplicate = row["path"]
+                break
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (path, key, fmt, size, sha256, added_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (path, key, fmt, size, digest, time.time()))
+        return duplicate
+
+    def _store_digest(self, path: str) -> str:
+        digest = file_digest(path)
+        with self._lock, self._db:
+            self._db.execute("UPDATE files SET sha256 = ? WHERE path = ?",
+                             (digest, path))
+        return digest
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  INGESTION DES LISTES D'URLS (fichiers, stdin, presse-papiers)
+# ─────────────────────────────────────────────────────────────────
+_URL_RE = re.compile(r"^https?://", re.I)
+# Éléments par lot publié, et lots prêts d'avance au plus
+INGEST_CHUNK   = 1000
+INGEST_BACKLOG = 2
+
+
+def iter_urls(lines):
+    """URLs valides d'un flux de lignes (lignes vides et « # » ignorées)."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#") and _URL_RE.match(line):
+            yield line
+
+
+class UrlIngestor:
+    """Lit une liste d'URLs dans un thread d'arrière-plan et la livre par lots.
+
+    Source : chemin de fichier, "-" (entrée standard) ou texte déjà lu
+    (`text=`, presse-papiers ou zone de saisie). Les lignes sont validées et
+    dédoublonnées (URL normalisée) au fil de la lecture, puis converties en
+    DownloadItem par lots de `chunk` paires (URL normalisée, élément),
+    récupérés par `next_batch()`. Au plus
+    INGEST_BACKLOG lots attendent : la lecture avance au rythme du
+    consommateur (l'UI en prend un par tick).
+
+    `label` nomme la source dans les messages (par défaut son chemin).
+    `progress` (0–1, None si la taille est inconnue), `count`, `invalid`,
+    `duplicates` et `error` sont lisibles à tout moment."""
+
+    def __init__(self, source: str = None, text: str = None,
+                 fmt: str = "video_best", output_dir: str = "",
+                 chunk: int = INGEST_CHUNK, label: str = ""):
+        self.source     = source
+        self.label      = label or source or ""
+        self.fmt        = fmt
+        self.output_dir = output_dir
+        self.chunk      = max(1, int(chunk))
+        self.progress   = None if source == "-" else 0.0
+        self.count      = 0    # URLs valides et uniques lues
+        self.invalid    = 0
+        self.duplicates = 0
+        self.first_invalid = ""
+        self.error      = None
+        self._text      = text
+        self._done      = threading.Event()
+        self._cancel    = threading.Event()
+        self._batches   = queue.Queue(maxsize=INGEST_BACKLOG)
+        self._thread    = threading.Thread(target=self._run, name="nexus-ingest",
+                                           daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def next_batch(self):
+        """Lot suivant (liste de paires (clé, DownloadItem)), ou None si
+        aucun n'est prêt."""
+        try:
+            return self._batches.get_nowait()
+        except queue.Empty:
+            return None
+
+    @property
+    def finished(self) -> bool:
+        """Lecture terminée et tous les lots récupérés."""
+        return self._done.is_set() and self._batches.empty()
+
+    def _lines(self):
+        if self._text is not None:
+            total, pos = len(self._text) or 1, 0
+            for line in self._text.splitlines():
+                pos += len(line) + 1
+                self.progress = min(1.0, pos / total)
+                yield line
+        elif self.source == "-":
+            yield from sys.stdin
+        else:
+            with open(self.source, "rb") as f:
+                total, pos = os.fstat(f.fileno()).st_size or 1, 0
+                for raw in f:
+                    pos += len(raw)
+                    self.progress = min(1.0, pos / total)
+                    yield raw.decode("utf-8", "replace")
+
+    def _run(self):
+        seen, batch = set(), []
+        try:
+            for line in self._lines():
+                if self._cancel.is_set():
+                    break
+                line = line.strip().lstrip("\ufeff")
+                if not line or line.startswith("#"):
+                    continue
+                if not _URL_RE.match(line):
+                    self.invalid += 1
+                    self.first_invalid = self.first_invalid or line
+                    continue
+                key = normalize_url(line)
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+                self.count += 1
+                batch.append((key, DownloadItem(line, fmt=self.fmt,
+                                                output_dir=self.output_dir)))
+                if len(batch) >= self.chunk:
+                    self._put(batch)
+                    batch = []
+            if batch:
+                self._put(batch)
+        except (OSError, ValueError) as exc:
+            self.error = str(exc)
+        finally:
+            self.progress = 1.0
+            self._done.set()
+
+    def _put(self, batch: list):
+        while not self._cancel.is_set():
+            try:
+                self._batches.put(batch, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+
+# ─────────────────────────────────────────────────────────────────
+#  MODE SANS INTERFACE (CLI / daemon)
+# ─────────────────────────────────────────────────────────────────
+# Période de scrutation du dossier d'entrée en mode daemon (s)
+INBOX_POLL_INTERVAL = 2.0
+# Période d'écriture du fichier de mesures (--metrics-file) (s)
+METRICS_FILE_INTERVAL = 10.0
+
+
+# Éléments terminés gardés en mémoire pour être consultés (GET /jobs/<id>)
+RUNNER_RECENT_JOBS = 1000
+
+
+class HeadlessRunner:
+    """Pilote DownloadEngine sans interface graphique.
+
+    Joue le rôle de _poll_ui_queue de l'application : consomme les événements
+    du moteur, tient l'historique et journalise les fins de téléchargement.
+    Des écouteurs (`add_listener`) reçoivent chaque événement ; les lots de
+    progression leur sont transmis sous forme d'événements "progress".
+
+    `queue` ne contient que les éléments non terminés : une URL terminée,
+    en erreur ou annulée peut être soumise à nouveau. Les RUNNER_RECENT_JOBS
+    derniers éléments terminés restent accessibles par `get()`."""
+
+    def __init__(self, history: HistoryStore = None, info_cache: InfoCache = None,
+                 log=print, **engine_options):
+        self.events  = queue.Queue()
+        self.engine  = DownloadEngine(self.events, info_cache=info_cache,
+                                      **engine_options)
+        self.queue   = QueueModel()
+        self.history = history if history is not None else HistoryStore()
+        self.stats   = collections.Counter()
+        self._log    = log
+        self._lock   = threading.Lock()
+        self._active = set()  # ids des éléments non terminés
+        self._recent = collections.OrderedDict()  # id -> élément terminé
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    @property
+    def idle(self) -> bool:
+        return not self._active
+
+    def submit(self, urls, fmt: str = "video_best", output_dir: str = "",
+               priority: int = 0) -> list:
+        """Ajoute et lance les URLs (doublons des éléments en cours ignorés)."""
+        return self._schedule((DownloadItem(url, fmt=fmt, output_dir=output_dir)
+                               for url in urls), priority)
+
+    def _schedule(self, items, priority: int = 0) -> list:
+        added = []
+        for item in items:
+            with self._lock:
+                if not self.queue.add(item):
+                    continue
+                self._active.add(item.id)
+            self.engine.enqueue(item, priority)
+            added.append(item)
+        return added
+
+    def items(self) -> list:
+        """Éléments terminés récents puis éléments en cours."""
+        with self._lock:
+            return [*self._recent.values(), *self.queue]
+
+    def page(self, before: str = None, limit: int = 50) -> list:
+        """Page d'éléments, du plus récent au plus ancien (en cours d'abord,
+        puis terminés récents), qui suit l'élément `before`. KeyError si
+        `before` n'est plus connu."""
+        with self._lock:
+            items = [*self._recent.values(), *self.queue]
+        items.reverse()
+        start = 0
+        if before is not None:
+            start = next((i + 1 for i, item in enumerate(items)
+                          if item.id == before), None)
+            if start is None:
+                raise KeyError(before)
+        return items[start:start + limit]
+
+    def get(self, item_id: str):
+        """Élément en cours ou terminé récemment, sinon None."""
+        with self._lock:
+            return self.queue.get(item_id) or self._recent.get(item_id)
+
+    def cancel(self, item_id: str) -> bool:
+        with self._lock:
+            item = self.queue.get(item_id)
+        if item is None:
+            return False
+        self.engine.cancel_item(item)
+        return True
+
+    def pump(self, timeout: float = 0.1):
+        """Traite les événements disponibles (attend au plus `timeout` s)."""
+        try:
+            msg = self.events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while True:
+            self._handle(msg)
+            try:
+                msg = self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def run_until_idle(self):
+        while not self.idle:
+            self.pump(0.2)
+
+    def stop(self):
+        self.engine.stop()
+
+    def write_metrics(self, path: str):
+        """Écrit atomiquement les mesures du moteur (JSON)."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.engine.metrics_snapshot(), f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+    def _handle(self, msg: dict):
+        if msg["event"] == "progress_batch":
+            for item in self.engine.drain_progress():
+                self._emit({"event": "progress", "item": item})
+            return
+        item, event = msg["item"], msg["event"]
+        if event == "children_found":
+            self._schedule(msg["children"])
+        elif event in ("done", "error", "cancelled"):
+            with self._lock:
+                self._active.discard(item.id)
+                # L'historique garde la trace ; l'URL peut être soumise à nouveau
+                self.queue.remove(item)
+                self._recent[item.id] = item
+                if len(self._recent) > RUNNER_RECENT_JOBS:
+                    self._recent.popitem(last=False)
+            self.stats[event] += 1
+            if event == "done":
+                self.history.add(item)
+                self._log(f"[OK]      {item.title}"
+                          + (f"  →  {item.filepath}" if item.filepath else ""))
+            elif event == "error":
+                self.history.add(item)
+                self._log(f"[ERREUR]  {item.url}  —  {item.error_msg}")
+            else:
+                self._log(f"[ANNULÉ]  {item.url}")
+        self._emit(msg)
+
+    def _emit(self, msg: dict):
+        for callback in self._listeners:
+            callback(msg)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  API DE CONTRÔLE HTTP/JSON (localhost)
+# ─────────────────────────────────────────────────────────────────
+API_DEFAULT_PORT = 8765
+API_MAX_BODY     = 16 * 1024 * 1024  # taille maximale d'une requête (octets)
+API_HISTORY_MAX  = 500               # entrées maximales par page d'historique
+API_JOBS_MAX     = 500               # éléments maximaux par page de la file
+SSE_KEEPALIVE    = 15.0              # commentaire périodique du flux SSE (s)
+SSE_BACKLOG      = 10_000            # événements en attente par client SSE
+_LOCAL_HOSTS     = {"127.0.0.1", "localhost", "[::1]"}
+
+
+def item_to_dict(item: DownloadItem) -> dict:
+    """Représentation JSON d'un élément de la file."""
+    return {
+        "id":         item.id,
+        "url":        item.url,
+        "fmt":        item.fmt,
+        "output_dir": item.output_dir,
+        "status":     item.status.label,
+        "title":      item.title,
+        "progress":   round(item.progress, 1),
+        "bytes_done": item.bytes_done,
+        "bytes_total": item.bytes_total,
+        "speed":      round(item.speed),
+        "eta":        item.eta if item.eta is None else round(item.eta),
+        "note":       item.note,
+        "error":      item.error_msg,
+        "filepath":   item.filepath,
+        "added_at":   item.added_at,
+    }
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Routes de l'API :
+
+        POST   /jobs          {"urls": [...], "format": ..., "output_dir": ...,
+                               "priority": 0}
+        GET    /jobs          ?limit=&before= état de la file (par pages)
+        GET    /jobs/<id>     état d'un élément
+        DELETE /jobs/<id>     annulation
+        GET    /events        flux Server-Sent Events des événements du moteur
+        GET    /history       ?limit=&before=&status=&url= (par pages)
+        GET    /stats         mesures du moteur (JSON)
+        GET    /metrics       mesures du moteur (format texte Prometheus)
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version   = "NEXUS"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def _route(self):
+        """Retourne (chemin, paramètres), ou None si l'hôte n'est pas local
+        (protection contre le DNS rebinding depuis un navigateur)."""
+        host = self.headers.get("Host", "").rsplit(":", 1)[0]
+        if host not in _LOCAL_HOSTS:
+            self._error(403, "hôte non autorisé")
+            return None
+        parts = urlsplit(self.path)
+        return parts.path.rstrip("/") or "/", parse_qs(parts.query)
+
+    def do_GET(self):
+        route = self._route()
+        if route is None:
+            return
+        path, query = route
+        runner = self.server.api.runner
+        if path == "/jobs":
+            self._jobs(runner, query)
+        elif path.startswith("/jobs/"):
+            item = runner.get(path[len("/jobs/"):])
+            if item is None:
+                self._error(404, "élément inconnu")
+            else:
+                timings = runner.engine.metrics.timeline(item.id)
+                self._send_json(200, {**item_to_dict(item), "timings": timings})
+        elif path == "/history":
+            self._history(runner.history, query)
+        elif path == "/events":
+            self._stream_events()
+        elif path == "/stats":
+            self._send_json(200, runner.engine.metrics_snapshot())
+        elif path == "/metrics":
+            body = runner.engine.metrics_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._error(404, "route inconnue")
+
+    def do_POST(self):
+        route = self._route()
+        if route is None:
+            return
+        if route[0] != "/jobs":
+            self._error(404, "route inconnue")
+            return
+        # application/json obligatoire : un formulaire d'une page web ne
+        # peut pas soumettre de travaux sans requête CORS préalable
+        if not self.headers.get("Content-Type", "").startswith("application/json"):
+            self._error(415, "Content-Type application/json attendu")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if not 0 < length <= API_MAX_BODY:
+                raise ValueError("taille de requête invalide")
+            body = json.loads(self.rfile.read(length))
+            urls = body["urls"]
+            if isinstance(urls, str):
+                urls = [urls]
+            if (not isinstance(urls, list)
+                    or not all(isinstance(u, str) for u in urls)):
+                raise ValueError("« urls » doit être une liste de chaînes")
+            fmt = body.get("format", "video_best")
+            if fmt not in FORMATS.values():
+                raise ValueError(f"format inconnu : {fmt}")
+            output_dir = body.get("output_dir") or self.server.api.output_dir
+            priority = int(body.get("priority", 0))
+        except (ValueError, KeyError, TypeError) as exc:
+            self.close_connection = True
+            self._error(400, str(exc) or "requête invalide")
+            return
+        valid = list(iter_urls(urls))
+        added = self.server.api.runner.submit(valid, fmt, output_dir, priority)
+        self._send_json(201, {
+            "added":   [item_to_dict(i) for i in added],
+            "skipped": len(urls) - len(added),
+        })
+
+    def do_DELETE(self):
+        route = self._route()
+        if route is None:
+            return
+        path = route[0]
+        if not path.startswith("/jobs/"):
+            self._error(404, "route inconnue")
+        elif self.server.api.runner.cancel(path[len("/jobs/"):]):
+            self._send_json(202, {"cancelled": True})
+        else:
+            self._error(404, "élément inconnu ou déjà terminé")
+
+    def _jobs(self, runner: HeadlessRunner, query: dict):
+        try:
+            limit = min(int(query["limit"][0]) if "limit" in query else 50,
+                        API_JOBS_MAX)
+            if limit < 1:
+                raise ValueError(limit)
+            items = runner.page(before=query.get("before", [None])[0], limit=limit)
+        except (ValueError, KeyError):
+            self._error(400, "paramètre invalide")
+            return
+        self._send_json(200, {
+            "jobs":   [item_to_dict(i) for i in items],
+            "next":   items[-1].id if len(items) == limit else None,
+            "stats":  dict(runner.stats),
+            "stages": runner.engine.stage_stats(),
+        })
+
+    def _history(self, history: HistoryStore, query: dict):
+        def arg(name, cast=str):
+            return cast(query[name][0]) if name in query else None
+        try:
+            limit = min(arg("limit", int) or 50, API_HISTORY_MAX)
+            entries = history.page(before_id=arg("before", int), limit=limit,
+                                   url=arg("url"), status=arg("status"),
+                                   since=arg("since", float),
+                                   until=arg("until", float))
+        except ValueError:
+            self._error(400, "paramètre invalide")
+            return
+        self._send_json(200, {
+            "entries": entries,
+            "next":    entries[-1]["id"] if len(entries) == limit else None,
+        })
+
+    def _stream_events(self):
+        api = self.server.api
+        events = api.subscribe()
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.flush()
+            while True:
+                try:
+                    chunk = events.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    if not api.is_subscribed(events):
+                        return  # client trop lent, abonnement retiré
+                    chunk = b": keepalive\n\n"
+                if chunk is None:
+                    return  # arrêt du serveur
+                self.wfile.write(chunk)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            api.unsubscribe(events)
+
+
+class ControlServer:
+    """API HTTP/JSON locale au-dessus d'un HeadlessRunner.
+
+    N'écoute que sur l'interface de bouclage. Les événements du moteur sont
+    sérialisés une seule fois (dans le thread qui pompe le runner) puis
+    diffusés à chaque client SSE par une file bornée : un client qui ne suit
+    pas est déconnecté plutôt que de faire grossir la mémoire."""
+
+    def __init__(self, runner: HeadlessRunner, port: int = API_DEFAULT_PORT,
+                 host: str = "127.0.0.1", output_dir: str = ""):
+        if host not in ("127.0.0.1", "localhost"):
+            raise ValueError("l'API de contrôle n'écoute que sur localhost")
+        self.runner     = runner
+        self.output_dir = output_dir
+        self._subscribers = set()
+        self._sub_lock  = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _ApiHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.api = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name="nexus-api", daemon=True)
+        runner.add_listener(self._publish)
+
+    @property
+    def address(self) -> tuple:
+        return self._httpd.server_address[:2]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        with self._sub_lock:
+            subscribers, self._subscribers = self._subscribers, set()
+        for events in subscribers:
+            try:
+                events.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def subscribe(self) -> queue.Queue:
+        events = queue.Queue(maxsize=SSE_BACKLOG)
+        with self._sub_lock:
+            self._subscribers.add(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue):
+        with self._sub_lock:
+            self._subscribers.discard(events)
+
+    def is_subscribed(self, events: queue.Queue) -> bool:
+        return events in self._subscribers
+
+    def _publish(self, msg: dict):
+        if not self._subscribers:
+            return
+        data = json.dumps(item_to_dict(msg["item"]), ensure_ascii=False)
+        chunk = f"event: {msg['event']}\ndata: {data}\n\n".encode("utf-8")
+        with self._sub_lock:
+            for events in list(self._subscribers):
+                try:
+                    events.put_nowait(chunk)
+                except queue.Full:
+                    self._subscribers.discard(events)
+
+
+def _read_sources(sources) -> list:
+    urls = []
+    for source in sources:
+        if source == "-":
+            urls.extend(iter_urls(sys.stdin))
+        elif _URL_RE.match(source):
+            urls.append(source)
+        else:
+            with open(source, encoding="utf-8") as f:
+                urls.extend(iter_urls(f))
+    return urls
+
+
+def _scan_inbox(runner: HeadlessRunner, inbox: str, fmt: str, output_dir: str):
+    """Ingère les fichiers *.txt déposés dans le dossier d'entrée, renommés
+    ensuite en *.txt.done."""
+    for name in sorted(os.listdir(inbox)):
+        if not name.endswith(".txt"):
+            continue
+        path = os.path.join(inbox, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                urls = list(iter_urls(f))
+            os.replace(path, path + ".done")
+        except OSError:
+            continue
+        added = runner.submit(urls, fmt, output_dir)
+        print(f"[INBOX]   {name} : {len(added)} URL(s) ajoutée(s)")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="downloader.py --headless",
+        description="NEXUS Downloader — mode sans interface (même moteur, "
+                    "mêmes formats et même historique que l'application).")
+    parser.add_argument("sources", nargs="*",
+                        help="fichiers d'URLs (une par ligne, « - » pour l'entrée "
+                             "standard) ou URLs directement")
+    parser.add_argument("-f", "--format", default="video_best",
+                        choices=list(FORMATS.values()),
+                        help="format de sortie (défaut : video_best)")
+    parser.add_argument("-o", "--output",
+                        default=os.path.join(os.path.expanduser("~"), "Downloads"),
+                        help="dossier de sortie")
+    parser.add_argument("-j", "--jobs", type=int, default=MAX_CONCURRENT_DOWNLOADS,
+                        help="téléchargements simultanés")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="ajuste le nombre de téléchargements simultanés au "
+                             "débit mesuré (de 1 à --max-jobs, départ à --jobs)")
+    parser.add_argument("--max-jobs", type=int, default=ADAPTIVE_MAX_WORKERS,
+                        help="plafond du mode --adaptive")
+    parser.add_argument("--per-host", type=int, default=MAX_DOWNLOADS_PER_HOST,
+                        help="téléchargements simultanés par plateforme")
+    parser.add_argument("--connections", type=int, default=SEGMENTS_PER_ITEM,
+                        help="connexions parallèles par fichier (segments HTTP)")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS,
+                        help="connexions segmentées au total")
+    parser.add_argument("--requests-per-second", type=float, default=None,
+                        help="démarrages par seconde et par plateforme")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="débit global maximal (octets/s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="désactive le cache des métadonnées")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="retélécharge même les vidéos déjà présentes "
+                             "(pas d'index des fichiers)")
+    parser.add_argument("--min-free", type=float, default=DISK_FREE_MARGIN / 2**20,
+                        metavar="MIO",
+                        help="espace à laisser libre sur le disque de sortie ; "
+                             "les téléchargements qui ne tiennent pas attendent")
+    parser.add_argument("--no-disk-check", action="store_true",
+                        help="lance les téléchargements sans vérifier l'espace disque")
+    parser.add_argument("--daemon", action="store_true",
+                        help="reste actif et ingère les fichiers déposés dans "
+                             "le dossier d'entrée (--inbox)")
+    parser.add_argument("--inbox", default=None,
+                        help="dossier d'entrée du daemon (défaut : <données>/inbox)")
+    parser.add_argument("--metrics-file", default=None, metavar="FICHIER",
+                        help="écrit les mesures du moteur (JSON) dans ce fichier, "
+                             f"toutes les {METRICS_FILE_INTERVAL:.0f} s et à la fin")
+    parser.add_argument("--serve", nargs="?", type=int, const=API_DEFAULT_PORT,
+                        default=None, metavar="PORT",
+                        help="démarre l'API HTTP/JSON locale (127.0.0.1, port "
+                             f"{API_DEFAULT_PORT} par défaut) et reste actif")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    if not YT_DLP_AVAILABLE:
+        print("yt-dlp non installé. Lancez : pip install yt-dlp", file=sys.stderr)
+        return 2
+    if not args.sources and not args.daemon and args.serve is None:
+        build_arg_parser().print_usage(sys.stderr)
+        return 2
+
+    runner = HeadlessRunner(
+        info_cache=None if args.no_cache else InfoCache(),
+        download_index=None if args.no_dedup else DownloadIndex(),
+        disk_budget=(None if args.no_disk_check
+                     else DiskBudget(margin=int(args.min_free * 2**20))),
+        max_workers=args.jobs,
+        per_host_limit=args.per_host,
+        requests_per_second=args.requests_per_second,
+        bytes_per_second=args.rate_limit,
+        segments_per_item=args.connections,
+        max_connections=args.max_connections,
+    )
+    inbox = server = None
+    controller = (AdaptiveConcurrency(runner.engine, max_workers=args.max_jobs).start()
+                  if args.adaptive else None)
+    if args.daemon:
+        inbox = args.inbox or os.path.join(app_data_dir(), "inbox")
+        os.makedirs(inbox, exist_ok=True)
+        print(f"[DAEMON]  dossier d'entrée : {inbox}")
+    try:
+        if args.serve is not None:
+            server = ControlServer(runner, args.serve, output_dir=args.output).start()
+            host, port = server.address
+            print(f"[API]     http://{host}:{port}/")
+        added = runner.submit(_read_sources(args.sources), args.format, args.output)
+        if args.sources:
+            print(f"[FILE]    {len(added)} URL(s) planifiée(s), "
+                  f"{runner.engine.max_workers} simultanée(s) max")
+        keep_running = inbox is not None or server is not None
+        next_scan = next_metrics = 0.0
+        while keep_running or not runner.idle:
+            now = time.monotonic()
+            if inbox is not None and now >= next_scan:
+                _scan_inbox(runner, inbox, args.format, args.output)
+                next_scan = now + INBOX_POLL_INTERVAL
+            if args.metrics_file and now >= next_metrics:
+                runner.write_metrics(args.metrics_file)
+                next_metrics = now + METRICS_FILE_INTERVAL
+            runner.pump(0.2)
+    except KeyboardInterrupt:
+        return 130
+    except OSError as exc:
+        print(f"Erreur : {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if controller is not None:
+            controller.stop()
+        if server is not None:
+            server.close()
+        runner.stop()
+        if args.metrics_file:
+            try:
+                runner.write_metrics(args.metrics_file)
+            except OSError:
+                pass
+    print(f"[FIN]     {runner.stats['done']} terminé(s), "
+          f"{runner.stats['error']} erreur(s), {runner.stats['cancelled']} annulé(s)")
+    return 1 if runner.stats["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+Configuration pytest : les tests importent nexus_core depuis la racine du
+dépôt et réutilisent les outils hors ligne des benchmarks (serveur média
+local, extracteur yt-dlp factice).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,73 @@
+"""API de contrôle : nouvelle soumission d'une URL en erreur, pagination de
+GET /jobs."""
+
+import http.client
+import json
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import nexus_core as core
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor)
+
+
+@pytest.fixture
+def api(tmp_path):
+    with LocalMediaServer() as srv, install_fake_extractor(make_fake_extractor(srv)):
+        runner = core.HeadlessRunner(history=core.HistoryStore(":memory:"),
+                                     log=lambda *a: None, max_workers=2)
+        server = core.ControlServer(runner, port=0, output_dir=str(tmp_path)).start()
+        yield runner, server
+        server.close()
+        runner.stop()
+
+
+def _call(server, method, path, payload=None):
+    conn = http.client.HTTPConnection(*server.address, timeout=10)
+    body = json.dumps(payload) if payload is not None else None
+    conn.request(method, path, body, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = json.loads(response.read())
+    conn.close()
+    return response.status, data
+
+
+def test_failed_url_is_not_skipped_on_resubmit(api, monkeypatch):
+    runner, server = api
+    url = bench_url("flaky")
+    # Premier essai en échec définitif (aucun nouvel essai)
+    real = core.DownloadEngine._download
+    def fail_once(*args, **kwargs):
+        monkeypatch.setattr(core.DownloadEngine, "_download", real)
+        raise core.yt_dlp.utils.DownloadError("ERROR: Unsupported URL: " + url)
+    monkeypatch.setattr(core.DownloadEngine, "_download", fail_once)
+
+    status, data = _call(server, "POST", "/jobs", {"urls": [url]})
+    assert status == 201 and len(data["added"]) == 1
+    runner.run_until_idle()
+    assert runner.stats["error"] == 1
+
+    status, data = _call(server, "POST", "/jobs", {"urls": [url]})
+    assert (len(data["added"]), data["skipped"]) == (1, 0)
+    runner.run_until_idle()
+    assert runner.stats["done"] == 1
+
+
+def test_jobs_are_paged(api):
+    runner, server = api
+    _call(server, "POST", "/jobs", {"urls": [bench_url(f"p{i}") for i in range(5)]})
+    runner.run_until_idle()
+
+    seen, before = [], None
+    while True:
+        query = "/jobs?limit=2" + (f"&before={before}" if before else "")
+        status, data = _call(server, "GET", query)
+        assert status == 200 and len(data["jobs"]) <= 2
+        seen += [job["id"] for job in data["jobs"]]
+        before = data["next"]
+        if before is None:
+            break
+    assert len(seen) == len(set(seen)) == 5
+    assert _call(server, "GET", "/jobs?before=inconnu")[0] == 400
@@ -0,0 +1,116 @@
+"""DiskBudget : réservation, mise de côté, libération, et préallocation."""
+
+import errno
+import os
+import queue
+import types
+
+import pytest
+
+import nexus_core as core
+
+MIB = 1024 * 1024
+
+
+@pytest.fixture
+def free_space(monkeypatch):
+    """Espace libre simulé (octets), modifiable par le test."""
+    state = {"free": 100 * MIB}
+    monkeypatch.setattr(core.shutil, "disk_usage",
+                        lambda path: types.SimpleNamespace(free=state["free"]))
+    return state
+
+
+def test_reserve_holds_then_release_returns_held(tmp_path, free_space):
+    budget = core.DiskBudget(margin=10 * MIB)
+    a, b, c = (core.DownloadItem(f"https://example.com/{n}") for n in "abc")
+    held = []
+    assert budget.reserve(a, str(tmp_path), 50 * MIB, held.append)
+    assert not budget.reserve(b, str(tmp_path), 50 * MIB, held.append)
+    assert held == [b]
+    # Octets déjà écrits : ils ne comptent plus dans la part restante
+    a.bytes_done = 40 * MIB
+    free_space["free"] -= 40 * MIB
+    assert budget.reserve(c, str(tmp_path), 5 * MIB, held.append)
+    assert budget.release(a) == [b]
+    assert budget.release(a) == []
+
+
+def test_reserve_alone_too_large_raises_enospc(tmp_path, free_space):
+    budget = core.DiskBudget(margin=10 * MIB)
+    item = core.DownloadItem("https://example.com/big")
+    with pytest.raises(OSError) as info:
+        budget.reserve(item, str(tmp_path / "pas" / "encore" / "créé"), 95 * MIB)
+    assert info.value.errno == errno.ENOSPC
+    assert core.classify_error(info.value) == core.ERROR_PERMANENT
+
+
+def test_preallocated_bytes_are_not_counted_twice(tmp_path, free_space):
+    budget = core.DiskBudget(margin=0)
+    a, b = core.DownloadItem("https://example.com/a"), core.DownloadItem("https://example.com/b")
+    assert budget.reserve(a, str(tmp_path), 60 * MIB)
+    budget.allocated(a, 60 * MIB)
+    free_space["free"] -= 60 * MIB
+    assert budget.reserve(b, str(tmp_path), 40 * MIB)
+
+
+def test_unhold(tmp_path, free_space):
+    budget = core.DiskBudget(margin=0)
+    a, b = core.DownloadItem("https://example.com/a"), core.DownloadItem("https://example.com/b")
+    assert budget.reserve(a, str(tmp_path), 80 * MIB)
+    assert not budget.reserve(b, str(tmp_path), 80 * MIB)
+    assert budget.unhold(b)
+    assert not budget.unhold(b)
+    assert budget.release(a) == []
+
+
+def test_estimate_download_size():
+    assert core.estimate_download_size({"filesize": 100}) == 105
+    merged = {"requested_formats": [{"filesize": 100}, {"filesize_approx": 50}]}
+    assert core.estimate_download_size(merged) == 315
+    assert core.estimate_download_size({}) == 0
+
+
+def test_preallocate_sets_final_size(tmp_path):
+    path = tmp_path / "f.segpart"
+    with open(path, "w+b") as f:
+        core.preallocate(f, 3 * MIB)
+    assert os.path.getsize(path) == 3 * MIB
+
+
+def test_failed_preallocation_releases_reservation(tmp_path, monkeypatch):
+    pytest.importorskip("yt_dlp")
+    from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                        make_fake_extractor, media_bytes)
+    real = core.preallocate
+    calls = []
+
+    def flaky(f, size):
+        calls.append(size)
+        if len(calls) == 1:
+            raise OSError(errno.EIO, "Resource temporarily unavailable")
+        real(f, size)
+
+    monkeypatch.setattr(core, "preallocate", flaky)
+    monkeypatch.setattr(core, "RETRY_BASE_DELAY", 0.2)
+    size = 2 * core.SEGMENT_MIN_SIZE
+    budget = core.DiskBudget(margin=0)
+    with LocalMediaServer() as server, install_fake_extractor(make_fake_extractor(server)):
+        events = queue.Queue()
+        engine = core.DownloadEngine(events, max_workers=1, disk_budget=budget)
+        item = core.DownloadItem(bench_url("prealloc", size), output_dir=str(tmp_path))
+        engine.enqueue(item)
+        released_during_retry = None
+        while True:
+            msg = events.get(timeout=30)
+            if msg["event"] == "status_change" and item.note.startswith("Nouvel essai"):
+                released_during_retry = item not in budget._entries
+            if msg["event"] in ("done", "error", "cancelled"):
+                break
+        engine.stop()
+    assert released_during_retry is True
+    assert item.status == core.Status.DONE, item.error_msg
+    assert not os.path.exists(item.filepath + ".segpart")
+    with open(item.filepath, "rb") as f:
+        assert f.read() == media_bytes(size)
+    assert len(calls) == 2
@@ -0,0 +1,40 @@
+"""DownloadEngine : fichier final retenu après fusion des flux."""
+
+import os
+import queue
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import nexus_core as core
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor, wait_for_events)
+
+
+def test_final_file_is_indexed_not_last_stream(tmp_path, monkeypatch):
+    real = core.DownloadEngine._download
+
+    def merged(engine, ydl, item, *args, **kwargs):
+        # Simule une fusion ffmpeg : le flux signalé par le hook (.f137)
+        # disparaît au profit du fichier fusionné
+        result = real(engine, ydl, item, *args, **kwargs)
+        stream = item.filepath
+        final = os.path.join(os.path.dirname(stream), "merged.mp4")
+        os.replace(stream, final)
+        return {**result, "requested_downloads": [{"filepath": final}]}
+
+    monkeypatch.setattr(core.DownloadEngine, "_download", merged)
+    index = core.DownloadIndex(str(tmp_path / "index.sqlite3"))
+    events = queue.Queue()
+    with LocalMediaServer() as srv, install_fake_extractor(make_fake_extractor(srv)):
+        engine = core.DownloadEngine(events, max_workers=1, download_index=index)
+        item = core.DownloadItem(bench_url("merge"), output_dir=str(tmp_path / "out"))
+        engine.enqueue(item)
+        wait_for_events(events, [item])
+        engine.stop()
+
+    final = str(tmp_path / "out" / "merged.mp4")
+    assert item.status == core.Status.DONE
+    assert item.filepath == final
+    assert index.find(core.video_key(item.url), item.fmt) == final
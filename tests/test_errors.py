@@ -0,0 +1,68 @@
+"""classify_error : catégorie d'un échec selon le statut HTTP, le type
+d'exception (causes comprises) ou, à défaut, le message."""
+
+import io
+import urllib.error
+
+import pytest
+
+import nexus_core as core
+
+
+def _http(code):
+    return urllib.error.HTTPError("https://example.com/v", code, "err", {},
+                                  io.BytesIO())
+
+
+@pytest.mark.parametrize("code, kind", [
+    (401, core.ERROR_AUTH),
+    (403, core.ERROR_EXPIRED),
+    (410, core.ERROR_EXPIRED),
+    (429, core.ERROR_TRANSIENT),
+    (503, core.ERROR_TRANSIENT),
+    (404, core.ERROR_PERMANENT),
+])
+def test_http_status(code, kind):
+    assert core.classify_error(_http(code)) == kind
+
+
+@pytest.mark.parametrize("exc", [
+    ConnectionResetError("reset"),
+    TimeoutError(),
+])
+def test_network_errors_are_transient(exc):
+    assert core.classify_error(exc) == core.ERROR_TRANSIENT
+
+
+def test_cause_is_inspected():
+    try:
+        try:
+            raise _http(503)
+        except urllib.error.HTTPError as exc:
+            raise RuntimeError("échec du téléchargement") from exc
+    except RuntimeError as exc:
+        assert core.classify_error(exc) == core.ERROR_TRANSIENT
+
+
+def test_yt_dlp_exc_info_is_inspected():
+    yt_dlp = pytest.importorskip("yt_dlp")
+    cause = _http(410)
+    err = yt_dlp.utils.DownloadError("ERROR: unable to download",
+                                     exc_info=(type(cause), cause, None))
+    assert core.classify_error(err) == core.ERROR_EXPIRED
+
+
+@pytest.mark.parametrize("message, kind", [
+    ("ERROR: Video unavailable. The uploader has not made this video "
+     "available in your country (geo restricted)", core.ERROR_GEO),
+    ("ERROR: Sign in to confirm your age", core.ERROR_AUTH),
+    ("ERROR: Private video", core.ERROR_AUTH),
+    ("ERROR: unable to download video data: HTTP Error 403: Forbidden",
+     core.ERROR_EXPIRED),
+    ("ERROR: Read timed out", core.ERROR_TRANSIENT),
+    ("ERROR: Did not get any data blocks", core.ERROR_TRANSIENT),
+    ("ERROR: Unsupported URL: https://example.com", core.ERROR_PERMANENT),
+])
+def test_message_patterns(message, kind):
+    assert core.classify_error(Exception(message)) == kind
+
@@ -0,0 +1,48 @@
+"""QueueJournal : rejeu des éléments vivants, ligne tronquée, compaction."""
+
+import json
+
+import nexus_core as core
+
+
+def _item(url, status=core.Status.PENDING):
+    item = core.DownloadItem(url, fmt="audio_mp3", output_dir="/tmp/out")
+    item.status = status
+    return item
+
+
+def test_journal_replays_live_items_in_order(tmp_path):
+    path = str(tmp_path / "queue.journal")
+    journal = core.QueueJournal(path)
+    a, b, c = (_item(f"https://example.com/v/{n}") for n in "abc")
+    journal.record_many((a, b, c))
+    b.status = core.Status.DOWNLOADING
+    journal.record(b)
+    journal.remove(a)
+
+    entries = core.QueueJournal(path).replay()
+    assert [e["id"] for e in entries] == [b.id, c.id]
+    assert core.Status.from_label(entries[0]["status"]) == core.Status.DOWNLOADING
+    restored = core.QueueJournal.to_item(entries[0])
+    assert (restored.id, restored.url, restored.fmt, restored.output_dir,
+            restored.added_at) == (b.id, b.url, "audio_mp3", "/tmp/out", b.added_at)
+    assert restored.status == core.Status.PENDING
+
+
+def test_journal_ignores_truncated_line_and_compacts(tmp_path):
+    path = tmp_path / "queue.journal"
+    journal = core.QueueJournal(str(path))
+    item = _item("https://example.com/v/1")
+    journal.record(item)
+    journal.record(item)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "id": "tronq')  # crash en cours d'écriture
+
+    entries = core.QueueJournal(str(path)).replay()
+    assert [e["id"] for e in entries] == [item.id]
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [item.id]
+
+
+def test_missing_journal_replays_empty(tmp_path):
+    assert core.QueueJournal(str(tmp_path / "absent.journal")).replay() == []
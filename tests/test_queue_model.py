@@ -0,0 +1,38 @@
+"""QueueModel : dédoublonnage par URL normalisée, index synchronisés."""
+
+import nexus_core as core
+
+
+def test_queue_dedups_on_normalized_url():
+    model = core.QueueModel()
+    first = core.DownloadItem("https://www.example.com/v/1/")
+    assert model.add(first)
+    assert not model.add(core.DownloadItem("HTTPS://example.com/v/1#t=3"))
+    assert not model.add(first)
+    assert len(model) == 1
+    assert model.find_url("https://example.com/v/1") is first
+
+
+def test_queue_accepts_url_again_after_removal():
+    model = core.QueueModel()
+    item = core.DownloadItem("https://example.com/v/1")
+    model.add(item)
+    model.remove(item)
+    model.remove(item)  # sans effet
+    assert item not in model and model.find_url(item.url) is None
+    again = core.DownloadItem(item.url)
+    assert model.add(again)
+    assert model.get(again.id) is again and list(model) == [again]
+
+
+def test_remove_where_keeps_indexes_in_sync():
+    model = core.QueueModel()
+    items = [core.DownloadItem(f"https://example.com/v/{i}") for i in range(6)]
+    for item in items:
+        model.add(item)
+    removed = model.remove_where(lambda item: items.index(item) % 2)
+    assert removed == items[1::2] and list(model) == items[::2]
+    assert all(model.get(i.id) is None and model.find_url(i.url) is None
+               for i in removed)
+    assert model.add(core.DownloadItem(items[1].url))
+
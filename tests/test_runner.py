@@ -0,0 +1,53 @@
+"""HeadlessRunner : dédoublonnage limité aux éléments en cours, et nouvelle
+soumission d'une URL terminée."""
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import nexus_core as core
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor)
+
+
+@pytest.fixture
+def runner(tmp_path):
+    with LocalMediaServer() as srv, install_fake_extractor(make_fake_extractor(srv)):
+        runner = core.HeadlessRunner(history=core.HistoryStore(":memory:"),
+                                     log=lambda *a: None, max_workers=2)
+        yield runner
+        runner.stop()
+
+
+def test_active_duplicates_are_skipped(runner, tmp_path):
+    url = bench_url("dup")
+    first = runner.submit([url, url], output_dir=str(tmp_path))
+    assert len(first) == 1
+    assert runner.submit([url], output_dir=str(tmp_path)) == []
+    runner.run_until_idle()
+    assert first[0].status == core.Status.DONE
+
+
+def test_finished_items_leave_queue_and_can_be_resubmitted(runner, tmp_path):
+    url = bench_url("again")
+    (item,) = runner.submit([url], output_dir=str(tmp_path))
+    runner.run_until_idle()
+    assert item.status == core.Status.DONE
+    assert len(runner.queue) == 0
+    assert runner.get(item.id) is item  # toujours consultable
+
+    (again,) = runner.submit([url], output_dir=str(tmp_path))
+    assert again.id != item.id
+    runner.run_until_idle()
+    assert again.status == core.Status.DONE
+    assert len(runner.queue) == 0
+    assert runner.stats["done"] == 2
+
+
+def test_recent_items_are_bounded(runner, tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "RUNNER_RECENT_JOBS", 2)
+    items = runner.submit([bench_url(f"r{i}") for i in range(4)],
+                          output_dir=str(tmp_path))
+    runner.run_until_idle()
+    assert len(runner.items()) == 2
+    assert sum(runner.get(i.id) is not None for i in items) == 2
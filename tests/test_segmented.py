@@ -0,0 +1,113 @@
+"""Téléchargement segmenté : reprise depuis le fichier d'état, et reprise
+d'un essai interrompu par le chemin yt-dlp sur une seule connexion."""
+
+import json
+import os
+import queue
+import time
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import nexus_core as core
+from common import (LocalMediaServer, bench_url, install_fake_extractor,
+                    make_fake_extractor, media_bytes, wait_for_events)
+
+MIB = 1024 * 1024
+SIZE = 4 * core.SEGMENT_CHUNK  # 16 Mio, au-dessus de SEGMENT_MIN_SIZE
+
+
+@pytest.fixture
+def server():
+    # 4 Mio/s par connexion : un bloc met ~1 s, le temps d'interrompre
+    with LocalMediaServer(rate=4 * MIB) as srv, \
+            install_fake_extractor(make_fake_extractor(srv)):
+        yield srv
+
+
+def _run(item, **options):
+    events = queue.Queue()
+    engine = core.DownloadEngine(events, max_workers=1, **options)
+    engine.enqueue(item)
+    return engine, events
+
+
+def _interrupt(url, output_dir):
+    """Lance un téléchargement en 2 segments et l'annule dès qu'au moins un
+    bloc est noté dans le fichier d'état. Retourne le chemin final prévu."""
+    item = core.DownloadItem(url, output_dir=output_dir)
+    engine, events = _run(item, segments_per_item=2)
+    path = os.path.join(output_dir, f"Bench {url.rsplit('/', 1)[1].split('?')[0]}.mp4")
+    deadline = time.monotonic() + 30
+    while not os.path.exists(path + ".segpart.segments"):
+        assert time.monotonic() < deadline, "aucun bloc terminé"
+        time.sleep(0.01)
+    engine.cancel_item(item)
+    wait_for_events(events, [item])
+    engine.stop()
+    assert item.status == core.Status.CANCELLED
+    return path
+
+
+def test_interrupted_segmented_download_resumes_on_single_connection(server, tmp_path):
+    url = bench_url("single", SIZE)
+    path = _interrupt(url, str(tmp_path))
+    assert os.path.getsize(path + ".segpart") == SIZE
+    assert not os.path.exists(path + ".part")  # yt-dlp repart de zéro
+
+    item = core.DownloadItem(url, output_dir=str(tmp_path))
+    engine, events = _run(item, segments_per_item=1)
+    wait_for_events(events, [item])
+    engine.stop()
+
+    assert item.status == core.Status.DONE, item.error_msg
+    with open(path, "rb") as f:
+        assert f.read() == media_bytes(SIZE)
+
+
+def test_segmented_download_resumes_from_sidecar(server, tmp_path):
+    url = bench_url("resume", SIZE)
+    path = _interrupt(url, str(tmp_path))
+    with open(path + ".segpart.segments", encoding="utf-8") as f:
+        done = json.load(f)["done"]
+    assert 0 < len(done) < SIZE // core.SEGMENT_CHUNK
+
+    before = server.stats["requests"]
+    item = core.DownloadItem(url, output_dir=str(tmp_path))
+    engine, events = _run(item, segments_per_item=2)
+    wait_for_events(events, [item])
+    engine.stop()
+
+    assert item.status == core.Status.DONE, item.error_msg
+    # Sonde Range + blocs manquants seulement
+    chunks = SIZE // core.SEGMENT_CHUNK
+    assert server.stats["requests"] - before == 1 + chunks - len(done)
+    with open(path, "rb") as f:
+        assert f.read() == media_bytes(SIZE)
+    assert not os.path.exists(path + ".segpart")
+    assert not os.path.exists(path + ".segpart.segments")
+
+
+def test_small_file_takes_one_request_and_one_format_selection(server, tmp_path,
+                                                                monkeypatch):
+    import yt_dlp
+    selections = []
+    real = yt_dlp.YoutubeDL.process_video_result
+
+    def counting(ydl, info, download=True):
+        selections.append(download)
+        return real(ydl, info, download=download)
+
+    monkeypatch.setattr(yt_dlp.YoutubeDL, "process_video_result", counting)
+    size = 256 * 1024  # annoncée (filesize) sous SEGMENT_MIN_SIZE
+    item = core.DownloadItem(bench_url("small", size), output_dir=str(tmp_path))
+    engine, events = _run(item)  # segments_per_item par défaut
+    wait_for_events(events, [item])
+    engine.stop()
+
+    assert item.status == core.Status.DONE, item.error_msg
+    assert server.stats["requests"] == 1  # ni sonde Range, ni seconde requête
+    assert selections == [False]          # format choisi une seule fois
+    with open(item.filepath, "rb") as f:
+        assert f.read() == media_bytes(size)
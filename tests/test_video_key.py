@@ -0,0 +1,68 @@
+"""video_key : clés canoniques sans réseau, cache par URL normalisée."""
+
+import queue
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import nexus_core as core
+
+VIDEO = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url", [
+    f"https://www.youtube.com/watch?v={VIDEO}",
+    f"https://youtu.be/{VIDEO}?t=3",
+    f"https://WWW.YouTube.com/watch?v={VIDEO}#t=10",
+])
+def test_same_video_same_key(url):
+    assert core.video_key(url) == f"Youtube:{VIDEO}"
+
+
+def test_playlist_keeps_playlist_key():
+    assert core.video_key("https://www.youtube.com/playlist?list=PLx") == "YoutubeTab:PLx"
+
+
+@pytest.mark.parametrize("url", [
+    f"https://www.youtube.com/watch?v={VIDEO}&list=PLx",
+    f"https://www.youtube.com/watch?v={VIDEO}&list=PLx&index=2",
+])
+def test_video_in_playlist_keys_as_playlist(url):
+    # yt-dlp (sans noplaylist) télécharge alors toute la playlist
+    assert core.video_key(url) == "YoutubeTab:PLx"
+
+
+def test_unknown_url_falls_back_to_normalized_url():
+    assert core.video_key("https://WWW.Example.com/x.mp4/") == "https://example.com/x.mp4"
+
+
+def test_key_is_cached_per_normalized_url():
+    core.video_key("https://vimeo.com/76979871")
+    hits = core._video_key.cache_info().hits
+    assert core.video_key("https://www.vimeo.com/76979871/#top") == "Vimeo:76979871"
+    assert core._video_key.cache_info().hits == hits + 1
+
+
+def test_host_learns_its_extractor(monkeypatch):
+    monkeypatch.setattr(core, "_host_extractors", {})
+    core._video_key.cache_clear()
+    core.video_key("https://www.twitch.tv/videos/123456")
+    assert core._host_extractors == {"twitch.tv": ("TwitchVod",)}
+    assert core.video_key("https://www.twitch.tv/videos/654321") == "TwitchVod:654321"
+
+
+def test_indexed_video_does_not_claim_its_playlist_url(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"x" * 16)
+    index = core.DownloadIndex(str(tmp_path / "index.sqlite3"))
+    index.add(f"Youtube:{VIDEO}", "video_best", str(path))
+    engine = core.DownloadEngine(queue.Queue(), max_workers=1, download_index=index)
+    try:
+        playlist = core.DownloadItem(f"https://www.youtube.com/watch?v={VIDEO}&list=PLx")
+        assert not engine._claim(playlist)  # la playlist sera développée
+        video = core.DownloadItem(f"https://youtu.be/{VIDEO}")
+        assert engine._claim(video)
+        assert video.filepath == str(path)
+    finally:
+        engine.stop()